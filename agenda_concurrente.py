@@ -0,0 +1,341 @@
+"""
+Agenda de contactos para muchos hilos lectores y un proceso de sincronización.
+
+Los lectores nunca toman un cerrojo: leen la instantánea publicada en ese
+momento, que no se modifica jamás. Los contactos de una instantánea son
+registros inmutables, así que un lector nunca ve un contacto a medio
+actualizar.
+
+Los escritores se serializan con un cerrojo y acumulan sus cambios en un
+lote. Al publicar el lote se copian solo los fragmentos afectados de los
+índices (los contactos se reparten en `fragmentos` diccionarios por el hash
+del nombre normalizado), se construye una instantánea nueva que comparte el
+resto con la anterior y se sustituye la referencia publicada, una
+asignación atómica. Los cambios de un lote no son visibles hasta que se
+publica, al llenarse o al llamar a publicar().
+"""
+import threading
+from collections import namedtuple
+
+from agenda_contactos import Contacto, normalizar_nombre
+from trie_telefonos import normalizar_telefono
+
+RegistroContacto = namedtuple('RegistroContacto', 'nombre telefono email')
+RegistroContacto.__doc__ = """
+Contacto inmutable de una instantánea de AgendaConcurrente.
+"""
+RegistroContacto.__str__ = Contacto.__str__
+
+# Marca de un contacto borrado dentro de un lote pendiente
+_BORRADO = None
+
+
+class Instantanea:
+    """
+    Versión publicada de una AgendaConcurrente; no cambia nunca.
+    """
+
+    __slots__ = ('version', '_nombres', '_telefonos', '_tamano')
+
+    def __init__(self, version, nombres, telefonos, tamano):
+        """
+        Inicializa la instantánea.
+
+        Args:
+            version (int): Número de publicación
+            nombres (tuple): Fragmentos {nombre normalizado: RegistroContacto}
+            telefonos (tuple): Fragmentos {teléfono normalizado: tupla de nombres normalizados}
+            tamano (int): Número de contactos
+        """
+        self.version = version
+        self._nombres = nombres
+        self._telefonos = telefonos
+        self._tamano = tamano
+
+    def __len__(self):
+        """
+        Número de contactos de la instantánea.
+
+        Returns:
+            int: Contactos
+        """
+        return self._tamano
+
+    def __iter__(self):
+        """
+        Recorre los contactos de la instantánea (sin un orden definido).
+
+        Yields:
+            RegistroContacto: Cada contacto
+        """
+        for fragmento in self._nombres:
+            yield from fragmento.values()
+
+    def buscar_contacto(self, nombre):
+        """
+        Busca un contacto por su nombre, sin distinguir mayúsculas ni acentos.
+
+        Args:
+            nombre (str): El nombre del contacto a buscar
+
+        Returns:
+            RegistroContacto o None: El contacto o None si no existe
+        """
+        clave = normalizar_nombre(nombre)
+        return self._nombres[hash(clave) % len(self._nombres)].get(clave)
+
+    def buscar_por_telefono(self, telefono):
+        """
+        Identifica a quién pertenece un número de teléfono.
+
+        Args:
+            telefono (str): Número a buscar, en cualquier formato
+
+        Returns:
+            list: Contactos con ese teléfono, en orden de llegada
+        """
+        numero = normalizar_telefono(telefono)
+        if numero is None:
+            return []
+        claves = self._telefonos[hash(numero) % len(self._telefonos)].get(numero, ())
+        nombres = self._nombres
+        return [nombres[hash(clave) % len(nombres)][clave] for clave in claves]
+
+
+class AgendaConcurrente:
+    """
+    Agenda con lecturas sin cerrojos sobre instantáneas inmutables y
+    escrituras por lotes que publican versiones nuevas (copia en escritura).
+    """
+
+    def __init__(self, contactos=(), tam_lote=100, fragmentos=256):
+        """
+        Inicializa la agenda.
+
+        Args:
+            contactos (iterable, opcional): Contactos iniciales (se copian; los
+                cambios posteriores en esos objetos no afectan a la agenda)
+            tam_lote (int, opcional): Cambios acumulados que provocan una publicación
+            fragmentos (int, opcional): Número de fragmentos de cada índice
+        """
+        self.tam_lote = tam_lote
+        self.publicaciones = 0
+        self._cerrojo = threading.Lock()  # Serializa a los escritores
+        self._pendientes = {}  # nombre normalizado -> RegistroContacto o _BORRADO
+        self._actual = Instantanea(0, tuple({} for _ in range(fragmentos)),
+                                   tuple({} for _ in range(fragmentos)), 0)
+        for contacto in contactos:
+            self._agregar(contacto.nombre, contacto.telefono, contacto.email)
+        self.publicar()
+
+    def instantanea(self):
+        """
+        Devuelve la versión publicada en este momento.
+
+        Sirve para hacer varias consultas coherentes entre sí: la instantánea
+        no cambia aunque se publiquen versiones nuevas.
+
+        Returns:
+            Instantanea: Versión actual de la agenda
+        """
+        return self._actual
+
+    def __len__(self):
+        """
+        Número de contactos publicados.
+
+        Returns:
+            int: Contactos de la versión actual
+        """
+        return len(self._actual)
+
+    def __iter__(self):
+        """
+        Recorre los contactos de la versión actual.
+
+        Yields:
+            RegistroContacto: Cada contacto
+        """
+        return iter(self._actual)
+
+    def buscar_contacto(self, nombre):
+        """
+        Busca un contacto por su nombre en la versión publicada.
+
+        Args:
+            nombre (str): El nombre del contacto a buscar
+
+        Returns:
+            RegistroContacto o None: El contacto o None si no existe
+        """
+        return self._actual.buscar_contacto(nombre)
+
+    def buscar_por_telefono(self, telefono):
+        """
+        Identifica a quién pertenece un número de teléfono en la versión publicada.
+
+        Args:
+            telefono (str): Número a buscar, en cualquier formato
+
+        Returns:
+            list: Contactos con ese teléfono
+        """
+        return self._actual.buscar_por_telefono(telefono)
+
+    def _vigente(self, clave):
+        """
+        Contacto de un nombre normalizado teniendo en cuenta el lote pendiente.
+        Debe llamarse con el cerrojo adquirido.
+        """
+        if clave in self._pendientes:
+            return self._pendientes[clave]
+        return self._actual._nombres[hash(clave) % len(self._actual._nombres)].get(clave)
+
+    def _agregar(self, nombre, telefono, email):
+        """
+        Añade un contacto al lote pendiente. Debe llamarse con el cerrojo adquirido.
+
+        Returns:
+            bool: False si ya existe un contacto con ese nombre
+        """
+        clave = normalizar_nombre(nombre)
+        if self._vigente(clave) is not None:
+            return False
+        self._pendientes[clave] = RegistroContacto(nombre, telefono, email)
+        return True
+
+    def _publicar_si_lleno(self):
+        """
+        Publica el lote si ya está lleno. Debe llamarse con el cerrojo adquirido.
+        """
+        if len(self._pendientes) >= self.tam_lote:
+            self._publicar()
+
+    def agregar_contacto(self, contacto):
+        """
+        Agrega un contacto (visible para los lectores cuando se publique el lote).
+
+        Args:
+            contacto (Contacto): El contacto a agregar
+
+        Returns:
+            bool: True si se agregó, False si ya existe un contacto con ese nombre
+        """
+        with self._cerrojo:
+            if not self._agregar(contacto.nombre, contacto.telefono, contacto.email):
+                print(f"Error: Ya existe un contacto con el nombre '{contacto.nombre}'.")
+                return False
+            self._publicar_si_lleno()
+        return True
+
+    def actualizar_contacto(self, nombre, telefono=None, email=None):
+        """
+        Cambia el teléfono o el email de un contacto sustituyéndolo por otro registro.
+
+        Args:
+            nombre (str): Nombre del contacto
+            telefono (str, opcional): Nuevo número de teléfono
+            email (str, opcional): Nuevo correo electrónico
+
+        Returns:
+            bool: True si se actualizó, False si no existe el contacto
+        """
+        clave = normalizar_nombre(nombre)
+        with self._cerrojo:
+            registro = self._vigente(clave)
+            if registro is None:
+                print(f"Error: No se encontró un contacto con el nombre '{nombre}'.")
+                return False
+            if telefono is not None:
+                registro = registro._replace(telefono=telefono)
+            if email is not None:
+                registro = registro._replace(email=email)
+            self._pendientes[clave] = registro
+            self._publicar_si_lleno()
+        return True
+
+    def eliminar_contacto(self, nombre):
+        """
+        Elimina un contacto por su nombre.
+
+        Args:
+            nombre (str): El nombre del contacto a eliminar
+
+        Returns:
+            bool: True si se eliminó, False si no existe el contacto
+        """
+        clave = normalizar_nombre(nombre)
+        with self._cerrojo:
+            if self._vigente(clave) is None:
+                print(f"Error: No se encontró un contacto con el nombre '{nombre}'.")
+                return False
+            self._pendientes[clave] = _BORRADO
+            self._publicar_si_lleno()
+        return True
+
+    def publicar(self):
+        """
+        Publica los cambios pendientes como una versión nueva.
+
+        Returns:
+            int: Número de la versión publicada
+        """
+        with self._cerrojo:
+            return self._publicar()
+
+    def _publicar(self):
+        """
+        Construye y publica la instantánea nueva. Debe llamarse con el cerrojo adquirido.
+        """
+        actual = self._actual
+        if not self._pendientes:
+            return actual.version
+
+        nombres = list(actual._nombres)
+        telefonos = list(actual._telefonos)
+        copiados = set()   # fragmentos de nombres ya copiados en esta publicación
+        copiados_tel = set()
+        tamano = actual._tamano
+
+        def fragmento_tel(numero):
+            i = hash(numero) % len(telefonos)
+            if i not in copiados_tel:
+                telefonos[i] = dict(telefonos[i])
+                copiados_tel.add(i)
+            return telefonos[i]
+
+        for clave, registro in self._pendientes.items():
+            i = hash(clave) % len(nombres)
+            if i not in copiados:
+                nombres[i] = dict(nombres[i])
+                copiados.add(i)
+            anterior = nombres[i].get(clave)
+
+            numero_anterior = anterior and normalizar_telefono(anterior.telefono)
+            numero = registro and normalizar_telefono(registro.telefono)
+            if numero_anterior != numero:
+                if numero_anterior is not None:
+                    fragmento = fragmento_tel(numero_anterior)
+                    claves = tuple(c for c in fragmento[numero_anterior] if c != clave)
+                    if claves:
+                        fragmento[numero_anterior] = claves
+                    else:
+                        del fragmento[numero_anterior]
+                if numero is not None:
+                    fragmento = fragmento_tel(numero)
+                    fragmento[numero] = fragmento.get(numero, ()) + (clave,)
+
+            if registro is _BORRADO:
+                # Puede no estar publicado si se agregó y se borró en el mismo lote
+                if anterior is not None:
+                    del nombres[i][clave]
+                    tamano -= 1
+            else:
+                if anterior is None:
+                    tamano += 1
+                nombres[i][clave] = registro
+
+        self._pendientes = {}
+        self._actual = Instantanea(actual.version + 1, tuple(nombres), tuple(telefonos), tamano)
+        self.publicaciones += 1
+        return self._actual.version
@@ -1,8 +1,112 @@
+import itertools
+import sys
+import time
+import unicodedata
+
+from busqueda_aproximada import IndiceBorrados, mejores_coincidencias
+from cache_consultas import CacheConsultas
+from lista_ordenada import ListaOrdenada
+from trie_telefonos import TrieTelefonos, normalizar_telefono
+
+
+class _TablaPlegado(dict):
+    """
+    Tabla para str.translate que quita los acentos carácter a carácter.
+    
+    Cada carácter se calcula la primera vez que aparece y queda guardado.
+    """
+    
+    def __missing__(self, codigo):
+        caracter = chr(codigo)
+        if caracter in 'ñÑ':
+            plegado = caracter
+        else:
+            plegado = ''.join(c for c in unicodedata.normalize('NFD', caracter)
+                              if not unicodedata.combining(c))
+        self[codigo] = plegado
+        return plegado
+
+
+_PLEGADO = _TablaPlegado()
+
+# Distancia de edición máxima de la búsqueda aproximada de nombres
+DISTANCIA_APROXIMADA_MAXIMA = 2
+
+# Mayor que cualquier carácter: "prefijo + FIN_PREFIJO" queda detrás de todo lo que empieza por prefijo
+FIN_PREFIJO = '\U0010ffff'
+
+# Búsquedas por término con pausas: identificadores que se revisan seguidos
+# sin pausa, y coincidencias a partir de las cuales se dejan de cruzar las
+# listas del índice de trigramas para recorrer los identificadores en orden
+BLOQUE_IDENTIFICADORES = 256
+LIMITE_ORDENACION = 4096
+
+
+def normalizar_nombre(nombre):
+    """
+    Normaliza un nombre para compararlo sin distinguir mayúsculas ni acentos.
+    
+    Se conserva la ñ, que en español es una letra distinta de la n, y se
+    unifican los espacios.
+    
+    Args:
+        nombre (str): Nombre a normalizar
+        
+    Returns:
+        str: Clave normalizada del nombre
+    """
+    nombre = ' '.join(nombre.split())
+    if nombre.isascii():
+        return nombre.casefold()
+    
+    # Componemos primero para que una "n" seguida de virgulilla se convierta en "ñ"
+    if not unicodedata.is_normalized('NFC', nombre):
+        nombre = unicodedata.normalize('NFC', nombre)
+    return nombre.translate(_PLEGADO).casefold()
+
+
+def clave_alfabetica(nombre):
+    """
+    Obtiene la clave para ordenar nombres alfabéticamente en español.
+    
+    No distingue mayúsculas ni acentos y coloca la ñ entre la n y la o.
+    La ch y la ll se ordenan como dos letras, según la ortografía actual.
+    
+    Args:
+        nombre (str): Nombre o principio de un nombre
+        
+    Returns:
+        str: Clave que se ordena con la comparación normal de cadenas
+    """
+    return normalizar_nombre(nombre).replace('ñ', 'n\uffff')
+
+
+def _empaquetar_telefono(telefono):
+    """
+    Guarda como entero un teléfono que solo tiene cifras y no empieza por cero.
+    
+    Un entero ocupa la mitad que la cadena y se recupera idéntico con str();
+    el resto de teléfonos ("+34 666...", "091") y lo que no es una cadena
+    (None, un número) se guardan tal cual.
+    """
+    if isinstance(telefono, str) and telefono.isascii() and telefono.isdigit() and telefono[0] != '0' and len(telefono) <= 18:
+        return int(telefono)
+    return telefono
+
+
 class Contacto:
     """
     Clase que representa un contacto en la agenda.
+    
+    Usa __slots__ para no reservar un __dict__ por contacto. Los teléfonos que
+    solo tienen cifras se guardan como enteros y el email se guarda partido:
+    el usuario en UTF-8 y el dominio internado, porque miles de contactos
+    comparten "gmail.com". `telefono` y `email` se siguen leyendo y
+    asignando como cadenas.
     """
     
+    __slots__ = ('nombre', '_telefono', '_usuario', '_dominio', '_agendas', '__weakref__')
+    
     def __init__(self, nombre, telefono, email=""):
         """
         Inicializa un nuevo contacto.
@@ -15,19 +119,62 @@ class Contacto:
         self.nombre = nombre
         self.telefono = telefono
         self.email = email
+        self._agendas = ()  # Agendas que contienen el contacto y mantienen sus índices
+    
+    @property
+    def telefono(self):
+        """
+        Número de teléfono del contacto, tal como se escribió.
+        
+        Returns:
+            str: Teléfono
+        """
+        telefono = self._telefono
+        return str(telefono) if type(telefono) is int else telefono
+    
+    @telefono.setter
+    def telefono(self, telefono):
+        self._telefono = _empaquetar_telefono(telefono)
+    
+    @property
+    def email(self):
+        """
+        Correo electrónico del contacto.
+        
+        Returns:
+            str: Email (cadena vacía si no tiene)
+        """
+        usuario = self._usuario.decode()
+        if self._dominio is None:
+            return usuario
+        return f"{usuario}@{self._dominio}"
+    
+    @email.setter
+    def email(self, email):
+        usuario, arroba, dominio = email.rpartition('@')
+        if arroba:
+            self._usuario = usuario.encode()
+            self._dominio = sys.intern(dominio)
+        else:
+            self._usuario = email.encode()
+            self._dominio = None
     
     def actualizar(self, telefono=None, email=None):
         """
-        Actualiza la información del contacto.
+        Actualiza la información del contacto y avisa a las agendas que lo contienen.
         
         Args:
             telefono (str, opcional): Nuevo número de teléfono
             email (str, opcional): Nuevo correo electrónico
         """
+        telefono_anterior, email_anterior = self.telefono, self.email
         if telefono is not None:
             self.telefono = telefono
         if email is not None:
             self.email = email
+        
+        for agenda in self._agendas:
+            agenda._contacto_actualizado(self, telefono_anterior, email_anterior)
     
     def __str__(self):
         """
@@ -39,16 +186,181 @@ class Contacto:
         return f"Nombre: {self.nombre}\nTeléfono: {self.telefono}\nEmail: {self.email}"
 
 
+def trigramas(texto):
+    """
+    Obtiene los trigramas (subcadenas de 3 caracteres) de un texto.
+    
+    Args:
+        texto (str): Texto ya pasado a minúsculas
+        
+    Returns:
+        set: Trigramas distintos del texto
+    """
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def contiene_termino(contacto, termino):
+    """
+    Comprueba si alguno de los campos de un contacto contiene un término.
+    
+    Args:
+        contacto (Contacto): Contacto a comprobar
+        termino (str): Término ya pasado a minúsculas
+        
+    Returns:
+        bool: True si el nombre, el teléfono o el email contienen el término
+    """
+    return (termino in contacto.nombre.lower() or
+            termino in contacto.telefono.lower() or
+            termino in contacto.email.lower())
+
+
 class Agenda:
     """
     Clase que gestiona una colección de contactos.
+    
+    Cada contacto recibe un identificador creciente al agregarse, de modo que
+    ordenar por identificador equivale a ordenar por orden de inserción.
     """
     
-    def __init__(self):
+    def __init__(self, capacidad_cache=10_000):
         """
         Inicializa una nueva agenda vacía.
+        
+        Args:
+            capacidad_cache (int, opcional): Búsquedas cuyo resultado se recuerda (0 desactiva la caché)
+        """
+        self._por_id = {}       # identificador -> contacto, en orden de inserción
+        self._por_nombre = {}   # nombre normalizado -> identificador
+        self._siguiente_id = 0
+        # Índice invertido de trigramas de nombre, teléfono y email -> identificadores
+        self._trigramas = {}
+        # Teléfonos normalizados -> identificadores, para identificar llamadas
+        self._telefonos = TrieTelefonos()
+        # Palabras de los nombres normalizados -> identificadores, y su vocabulario
+        # para la búsqueda aproximada
+        self._palabras = {}
+        self._vocabulario = IndiceBorrados(DISTANCIA_APROXIMADA_MAXIMA)
+        # Pares (clave alfabética, identificador) en orden alfabético
+        self._orden = ListaOrdenada()
+        # Resultados de buscar_contacto y buscar_por_termino
+        self.cache_consultas = CacheConsultas(capacidad_cache)
+    
+    @property
+    def contactos(self):
+        """
+        Contactos de la agenda en orden de inserción.
+        
+        Returns:
+            list: Lista de contactos
+        """
+        return list(self._por_id.values())
+    
+    def __len__(self):
+        """
+        Número de contactos de la agenda.
+        
+        Returns:
+            int: Número de contactos
+        """
+        return len(self._por_id)
+    
+    def __iter__(self):
+        """
+        Recorre los contactos en orden de inserción sin copiarlos a una lista.
+        
+        Yields:
+            Contacto: Contactos de la agenda
+        """
+        return iter(self._por_id.values())
+    
+    def _indexar_texto(self, ident, *campos):
+        """
+        Añade los trigramas de los campos al índice invertido.
         """
-        self.contactos = []
+        indice = self._trigramas
+        for campo in campos:
+            for trigrama in trigramas(campo.lower()):
+                ids = indice.get(trigrama)
+                if ids is None:
+                    indice[trigrama] = {ident}
+                else:
+                    ids.add(ident)
+    
+    def _desindexar_texto(self, ident, *campos):
+        """
+        Quita los trigramas de los campos del índice invertido.
+        """
+        indice = self._trigramas
+        for campo in campos:
+            for trigrama in trigramas(campo.lower()):
+                ids = indice.get(trigrama)
+                if ids is not None:
+                    ids.discard(ident)
+                    if not ids:
+                        del indice[trigrama]
+    
+    def _indexar_telefono(self, ident, telefono):
+        """
+        Añade el teléfono normalizado de un contacto al árbol de teléfonos.
+        """
+        numero = normalizar_telefono(telefono)
+        if numero is not None:
+            self._telefonos.insertar(numero, ident)
+    
+    def _desindexar_telefono(self, ident, telefono):
+        """
+        Quita el teléfono normalizado de un contacto del árbol de teléfonos.
+        """
+        numero = normalizar_telefono(telefono)
+        if numero is not None:
+            self._telefonos.eliminar(numero, ident)
+    
+    def _indexar_palabras(self, ident, clave):
+        """
+        Añade las palabras de un nombre normalizado al índice de palabras.
+        
+        Los números (como el 2 de "Ana García 2") solo se buscan de forma
+        exacta y no entran en el vocabulario de la búsqueda aproximada.
+        """
+        for palabra in set(clave.split()):
+            ids = self._palabras.get(palabra)
+            if ids is None:
+                self._palabras[palabra] = {ident}
+                if not palabra.isdigit():
+                    self._vocabulario.agregar(palabra)
+            else:
+                ids.add(ident)
+    
+    def _desindexar_palabras(self, ident, clave):
+        """
+        Quita las palabras de un nombre normalizado del índice de palabras.
+        """
+        for palabra in set(clave.split()):
+            ids = self._palabras.get(palabra)
+            if ids is not None:
+                ids.discard(ident)
+                if not ids:
+                    del self._palabras[palabra]
+                    self._vocabulario.quitar(palabra)
+    
+    def _contacto_actualizado(self, contacto, telefono_anterior, email_anterior):
+        """
+        Actualiza los índices cuando cambia el teléfono o el email de un contacto.
+        
+        Args:
+            contacto (Contacto): Contacto modificado
+            telefono_anterior (str): Teléfono antes del cambio
+            email_anterior (str): Email antes del cambio
+        """
+        ident = self._por_nombre[normalizar_nombre(contacto.nombre)]
+        self.cache_consultas.invalidar_textos(telefono_anterior, email_anterior,
+                                              contacto.telefono, contacto.email)
+        self._desindexar_texto(ident, contacto.nombre, telefono_anterior, email_anterior)
+        self._indexar_texto(ident, contacto.nombre, contacto.telefono, contacto.email)
+        if contacto.telefono != telefono_anterior:
+            self._desindexar_telefono(ident, telefono_anterior)
+            self._indexar_telefono(ident, contacto.telefono)
     
     def agregar_contacto(self, contacto):
         """
@@ -61,18 +373,90 @@ class Agenda:
             bool: True si se agregó correctamente, False si ya existe un contacto con ese nombre
         """
         # Verificamos si ya existe un contacto con el mismo nombre
-        if self.buscar_contacto(contacto.nombre) is not None:
+        clave = normalizar_nombre(contacto.nombre)
+        if clave in self._por_nombre:
             print(f"Error: Ya existe un contacto con el nombre '{contacto.nombre}'.")
             return False
         
-        # Agregamos el contacto a la lista
-        self.contactos.append(contacto)
+        # Agregamos el contacto a los índices
+        ident = self._siguiente_id
+        self._siguiente_id += 1
+        self._por_id[ident] = contacto
+        self._por_nombre[clave] = ident
+        self._indexar_texto(ident, contacto.nombre, contacto.telefono, contacto.email)
+        self._indexar_telefono(ident, contacto.telefono)
+        self._indexar_palabras(ident, clave)
+        self._orden.agregar((clave_alfabetica(contacto.nombre), ident))
+        self.cache_consultas.invalidar_nombre(clave)
+        self.cache_consultas.invalidar_textos(contacto.nombre, contacto.telefono, contacto.email)
+        contacto._agendas += (self,)
+        
         print(f"Contacto '{contacto.nombre}' agregado correctamente.")
         return True
     
+    def importar(self, contactos, informe=None):
+        """
+        Agrega muchos contactos de una vez, construyendo los índices al final.
+        
+        Los contactos se van guardando por nombre a medida que se recorren
+        (así se detectan los duplicados) y los índices de búsqueda se
+        construyen en una sola pasada cuando se han leído todos. No se
+        imprime un mensaje por contacto.
+        
+        Args:
+            contactos (iterable): Contactos a agregar (puede ser un generador)
+            informe (InformeImportacion, opcional): Informe donde anotar
+                agregados y duplicados
+            
+        Returns:
+            int: Número de contactos agregados
+        """
+        primero = self._siguiente_id
+        por_id = self._por_id
+        por_nombre = self._por_nombre
+        try:
+            for contacto in contactos:
+                clave = normalizar_nombre(contacto.nombre)
+                if clave in por_nombre:
+                    if informe is not None:
+                        informe.registrar_duplicado(contacto)
+                    continue
+                ident = self._siguiente_id
+                self._siguiente_id += 1
+                por_id[ident] = contacto
+                por_nombre[clave] = ident
+                contacto._agendas += (self,)
+        finally:
+            # Aunque la lectura falle a medias, los contactos ya agregados quedan indexados
+            self._indexar_lote(primero)
+            if self._siguiente_id > primero:
+                self.cache_consultas.invalidar_todo()
+        
+        agregados = self._siguiente_id - primero
+        if informe is not None:
+            informe.agregados += agregados
+        print(f"Se importaron {agregados} contacto(s).")
+        return agregados
+    
+    def _indexar_lote(self, primero):
+        """
+        Indexa en una sola pasada los contactos con identificador desde primero.
+        """
+        nuevos = range(primero, self._siguiente_id)
+        for ident in nuevos:
+            contacto = self._por_id[ident]
+            self._indexar_texto(ident, contacto.nombre, contacto.telefono, contacto.email)
+            self._indexar_telefono(ident, contacto.telefono)
+            self._indexar_palabras(ident, normalizar_nombre(contacto.nombre))
+        self._orden.actualizar((clave_alfabetica(self._por_id[ident].nombre), ident)
+                               for ident in nuevos)
+    
     def buscar_contacto(self, nombre):
         """
-        Busca un contacto por su nombre.
+        Busca un contacto por su nombre, sin distinguir mayúsculas ni acentos.
+        
+        El resultado se guarda en cache_consultas hasta que se agregue o se
+        elimine un contacto con ese nombre.
         
         Args:
             nombre (str): El nombre del contacto a buscar
@@ -80,10 +464,105 @@ class Agenda:
         Returns:
             Contacto o None: El contacto encontrado o None si no existe
         """
-        for contacto in self.contactos:
-            if contacto.nombre.lower() == nombre.lower():
-                return contacto
-        return None
+        cache = self.cache_consultas
+        resultado = cache.obtener('nombre', nombre)
+        if resultado is None:
+            version = cache.version
+            clave = normalizar_nombre(nombre)
+            ident = self._por_nombre.get(clave)
+            resultado = () if ident is None else (self._por_id[ident],)
+            cache.guardar('nombre', nombre, resultado, version, clave)
+        return resultado[0] if resultado else None
+    
+    def buscar_aproximado(self, nombre, max_distancia=DISTANCIA_APROXIMADA_MAXIMA, k=5):
+        """
+        Busca contactos por nombre tolerando errores de escritura.
+        
+        La distancia de un contacto es la suma, para cada palabra buscada, de
+        la distancia de edición a la palabra más parecida de su nombre, sin
+        tener en cuenta mayúsculas ni acentos. Así "peres" encuentra a
+        "Luis Pérez" a distancia 1 y "sanchez" a "María Sánchez" a distancia 0.
+        
+        Args:
+            nombre (str): Nombre o palabras del nombre a buscar
+            max_distancia (int, opcional): Distancia máxima admitida (como mucho 2)
+            k (int, opcional): Número máximo de resultados
+            
+        Returns:
+            list: Tuplas (contacto, distancia) ordenadas por distancia y, a igual
+                  distancia, por orden de inserción
+        """
+        if max_distancia > DISTANCIA_APROXIMADA_MAXIMA:
+            print(f"Error: La distancia máxima admitida es {DISTANCIA_APROXIMADA_MAXIMA}.")
+            return []
+        
+        consulta = normalizar_nombre(nombre).split()
+        if not consulta or k <= 0:
+            return []
+        
+        def buscar_palabra(palabra):
+            if palabra.isdigit():
+                return {palabra: 0} if palabra in self._palabras else {}
+            return self._vocabulario.buscar(palabra, max_distancia)
+        
+        encontrados = mejores_coincidencias(consulta, buscar_palabra, self._palabras.__getitem__,
+                                            max_distancia, k)
+        return [(self._por_id[ident], distancia) for ident, distancia in encontrados]
+    
+    def buscar_por_telefono(self, telefono):
+        """
+        Identifica a quién pertenece un número de teléfono (identificación de llamadas).
+        
+        El número se normaliza, así que '666 11 12 22', '666111222' y
+        '+34 666 111 222' encuentran el mismo contacto.
+        
+        Args:
+            telefono (str): Número a buscar
+            
+        Returns:
+            list: Contactos con ese teléfono, en orden de inserción
+        """
+        numero = normalizar_telefono(telefono)
+        if numero is None:
+            return []
+        return [self._por_id[ident] for ident in self._telefonos.buscar(numero)]
+    
+    def contactos_con_prefijo(self, prefijo):
+        """
+        Recorre de forma perezosa los contactos cuyo teléfono empieza por un prefijo.
+        
+        Args:
+            prefijo (str): Primeros dígitos del teléfono (por ejemplo '666 11')
+            
+        Yields:
+            Contacto: Contactos en orden numérico de teléfono
+        """
+        numero = normalizar_telefono(prefijo)
+        if numero is None:
+            return
+        for _, ident in self._telefonos.con_prefijo(numero):
+            yield self._por_id[ident]
+    
+    def _quitar(self, nombre):
+        """
+        Quita un contacto de la agenda y de todos los índices sin mostrar mensajes.
+        
+        Returns:
+            bool: True si el contacto existía
+        """
+        clave = normalizar_nombre(nombre)
+        ident = self._por_nombre.pop(clave, None)
+        if ident is None:
+            return False
+        contacto = self._por_id.pop(ident)
+        self._desindexar_texto(ident, contacto.nombre, contacto.telefono, contacto.email)
+        self._desindexar_telefono(ident, contacto.telefono)
+        self._desindexar_palabras(ident, clave)
+        self._orden.quitar((clave_alfabetica(contacto.nombre), ident))
+        self.cache_consultas.invalidar_nombre(clave)
+        self.cache_consultas.invalidar_textos(contacto.nombre, contacto.telefono, contacto.email)
+        contacto._agendas = tuple(a for a in contacto._agendas if a is not self)
+        return True
     
     def eliminar_contacto(self, nombre):
         """
@@ -95,15 +574,104 @@ class Agenda:
         Returns:
             bool: True si se eliminó correctamente, False si no se encontró el contacto
         """
-        contacto = self.buscar_contacto(nombre)
-        if contacto is not None:
-            self.contactos.remove(contacto)
+        if self._quitar(nombre):
             print(f"Contacto '{nombre}' eliminado correctamente.")
             return True
         else:
             print(f"Error: No se encontró un contacto con el nombre '{nombre}'.")
             return False
     
+    def aplicar_fusiones(self, plan):
+        """
+        Aplica de una vez las fusiones de contactos duplicados.
+        
+        Para cada fusión se eliminan los contactos absorbidos y el contacto
+        conservado se actualiza con el teléfono y el email finales. Las
+        fusiones cuyo contacto conservado ya no existe se saltan.
+        
+        Args:
+            plan (iterable): Fusiones, por ejemplo un PlanFusion de detectar_duplicados
+            
+        Returns:
+            int: Número de contactos eliminados al fusionar
+        """
+        eliminados = 0
+        saltadas = 0
+        for fusion in plan:
+            conservado = self.buscar_contacto(fusion.conservar)
+            if conservado is None:
+                saltadas += 1
+                continue
+            for nombre in fusion.eliminar:
+                if self._quitar(nombre):
+                    eliminados += 1
+            if (fusion.telefono, fusion.email) != (conservado.telefono, conservado.email):
+                conservado.actualizar(telefono=fusion.telefono, email=fusion.email)
+        
+        mensaje = f"Se fusionaron {eliminados} contacto(s) duplicado(s)."
+        if saltadas:
+            mensaje += f" {saltadas} fusión(es) saltada(s) porque el contacto ya no existe."
+        print(mensaje)
+        return eliminados
+    
+    def _recorrer_desde(self, clave, inverso=False, inclusivo=True):
+        """
+        Recorre el índice alfabético desde una clave alfabética.
+        
+        Yields:
+            tuple: (clave alfabética, contacto)
+        """
+        if clave is None:
+            posicion = None
+        elif inverso == inclusivo:
+            # Detrás de cualquier identificador con esa clave
+            posicion = (clave, float('inf'))
+        else:
+            posicion = (clave,)
+        for clave_contacto, ident in self._orden.iterar(posicion, inverso):
+            yield clave_contacto, self._por_id[ident]
+    
+    def recorrer_alfabetico(self, desde=None, hasta=None, inverso=False):
+        """
+        Recorre de forma perezosa los contactos en orden alfabético.
+        
+        Los límites son principios de nombre y ambos se incluyen: desde='Ma'
+        y hasta='Me' devuelve de "Macarena" a "Mercedes", pero no "Mi...".
+        
+        Args:
+            desde (str, opcional): Primer nombre o prefijo del rango
+            hasta (str, opcional): Último prefijo del rango
+            inverso (bool, opcional): Recorrer el rango de la Z a la A
+            
+        Yields:
+            Contacto: Contactos del rango
+        """
+        minimo = clave_alfabetica(desde) if desde else None
+        maximo = clave_alfabetica(hasta) + FIN_PREFIJO if hasta else None
+        if inverso:
+            for clave, contacto in self._recorrer_desde(maximo, inverso=True, inclusivo=False):
+                if minimo is not None and clave < minimo:
+                    return
+                yield contacto
+        else:
+            for clave, contacto in self._recorrer_desde(minimo):
+                if maximo is not None and clave >= maximo:
+                    return
+                yield contacto
+    
+    def paginador(self, desde=None, tam_pagina=20):
+        """
+        Crea un paginador para hojear la agenda en orden alfabético.
+        
+        Args:
+            desde (str, opcional): Nombre o letras donde empieza la primera página
+            tam_pagina (int, opcional): Contactos por página
+            
+        Returns:
+            Paginador: Paginador situado antes de la primera página
+        """
+        return Paginador(self, desde, tam_pagina)
+    
     def mostrar_contactos(self):
         """
         Muestra todos los contactos de la agenda.
@@ -111,41 +679,431 @@ class Agenda:
         Returns:
             int: El número de contactos mostrados
         """
-        if not self.contactos:
+        if not self._por_id:
             print("La agenda está vacía.")
             return 0
         
         print("\n=== AGENDA DE CONTACTOS ===")
-        print(f"Total de contactos: {len(self.contactos)}")
+        print(f"Total de contactos: {len(self._por_id)}")
         print("---------------------------")
         
-        for i, contacto in enumerate(self.contactos, 1):
+        for i, contacto in enumerate(self._por_id.values(), 1):
             print(f"\nContacto #{i}:")
             print(contacto)
             print("---------------------------")
         
-        return len(self.contactos)
+        return len(self._por_id)
     
     def buscar_por_termino(self, termino):
         """
         Busca contactos que contengan un término específico en cualquier campo.
         
+        Con términos de 3 o más caracteres se cruzan las listas del índice de
+        trigramas y solo se comprueban los candidatos que sobreviven; los
+        términos más cortos recorren la agenda completa. El resultado se
+        guarda en cache_consultas hasta que cambie un contacto que contenga
+        el término.
+        
         Args:
             termino (str): El término a buscar
             
         Returns:
-            list: Lista de contactos que coinciden con el término
+            list: Lista de contactos que coinciden con el término, en orden de inserción
         """
         termino = termino.lower()
-        resultados = []
+        cache = self.cache_consultas
+        guardado = cache.obtener('termino', termino)
+        if guardado is not None:
+            return list(guardado)
+        version = cache.version
+        resultados = [contacto for _, contacto in self._contienen(termino)]
+        cache.guardar('termino', termino, tuple(resultados), version)
+        return resultados
+    
+    def _contienen(self, termino, desde=-1, pausas=False):
+        """
+        Recorre de forma perezosa los contactos que contienen un término.
         
-        for contacto in self.contactos:
-            if (termino in contacto.nombre.lower() or
-                termino in contacto.telefono.lower() or
-                termino in contacto.email.lower()):
-                resultados.append(contacto)
+        Con pausas=True no se hace ningún trabajo grande de una vez: las
+        listas del índice se cruzan por partes (véase _por_partes) y se
+        produce None tras cada parte y cada candidato descartado para que
+        quien consume pueda parar y seguir más tarde.
         
-        return resultados
+        Args:
+            termino (str): Término ya pasado a minúsculas
+            desde (int, opcional): Solo se recorren los identificadores mayores
+            pausas (bool, opcional): Producir None en los puntos donde se puede parar
+            
+        Yields:
+            tuple: (identificador, contacto) en orden de inserción, o None en las pausas
+        """
+        if len(termino) < 3:
+            candidatos = ((i, c) for i, c in self._por_id.items() if i > desde)
+        else:
+            listas = self._listas_trigramas(termino)
+            if not listas:
+                return
+            if pausas:
+                candidatos = self._por_partes(listas, desde)
+            else:
+                ids = listas[0].intersection(*listas[1:])
+                candidatos = ((i, self._por_id[i]) for i in sorted(ids) if i > desde)
+        
+        for candidato in candidatos:
+            if candidato is None:
+                yield None
+            elif contiene_termino(candidato[1], termino):
+                yield candidato
+            elif pausas:
+                yield None
+    
+    def _listas_trigramas(self, termino):
+        """
+        Listas del índice de trigramas para un término de 3 o más caracteres.
+        
+        Returns:
+            list: Conjuntos de identificadores de la más corta a la más larga
+                  (vacía si algún trigrama no está en el índice)
+        """
+        listas = []
+        for trigrama in trigramas(termino):
+            ids = self._trigramas.get(trigrama)
+            if ids is None:
+                return []
+            listas.append(ids)
+        # Empezamos por la lista más corta para que la intersección sea barata
+        listas.sort(key=len)
+        return listas
+    
+    def _por_partes(self, listas, desde):
+        """
+        Cruza las listas del índice de BLOQUE_IDENTIFICADORES en
+        BLOQUE_IDENTIFICADORES identificadores de la más corta, con una pausa
+        (None) tras cada bloque, y produce los comunes en orden.
+        
+        Si por la proporción de comunes vista hasta ahora van a salir más de
+        LIMITE_ORDENACION, el término es frecuente: se deja de cruzar y se
+        recorren los identificadores en orden por bloques, donde pronto
+        aparecen coincidencias.
+        """
+        menor, otras = listas[0], listas[1:]
+        pendientes = iter(menor)
+        comunes = []
+        revisados = 0
+        while True:
+            bloque = list(itertools.islice(pendientes, BLOQUE_IDENTIFICADORES))
+            if not bloque:
+                break
+            revisados += len(bloque)
+            if otras:
+                bloque = otras[0].intersection(bloque, *otras[1:])
+            comunes.extend(filter(desde.__lt__, bloque))
+            if len(comunes) * len(menor) > LIMITE_ORDENACION * revisados:
+                yield from self._por_bloques(menor, otras, desde)
+                return
+            yield None
+        
+        por_id = self._por_id
+        comunes.sort()
+        for ident in comunes:
+            yield ident, por_id[ident]
+    
+    def _por_bloques(self, menor, otras, desde):
+        """
+        Recorre en orden los identificadores que están en todas las listas,
+        produciendo None al terminar cada bloque de identificadores.
+        """
+        por_id = self._por_id
+        fin = self._siguiente_id
+        for inicio in range(desde + 1, fin, BLOQUE_IDENTIFICADORES):
+            bloque = filter(menor.__contains__, range(inicio, min(inicio + BLOQUE_IDENTIFICADORES, fin)))
+            for ids in otras:
+                bloque = filter(ids.__contains__, bloque)
+            for ident in bloque:
+                yield ident, por_id[ident]
+            yield None
+    
+    def autocompletar(self, k=10):
+        """
+        Abre una sesión de búsqueda mientras se escribe.
+        
+        Args:
+            k (int, opcional): Número de sugerencias por pulsación
+            
+        Returns:
+            SesionAutocompletado: Sesión vacía
+        """
+        return SesionAutocompletado(self, k)
+
+
+class Paginador:
+    """
+    Recorre una agenda en orden alfabético página a página, hacia delante y hacia atrás.
+    
+    La posición se recuerda por nombre y no por número de página, así que
+    agregar o eliminar contactos entre una página y la siguiente no hace que
+    se salten ni se repitan contactos.
+    """
+    
+    def __init__(self, agenda, desde=None, tam_pagina=20):
+        """
+        Inicializa el paginador.
+        
+        Args:
+            agenda (Agenda): Agenda a recorrer
+            desde (str, opcional): Nombre o letras donde empieza la primera página
+            tam_pagina (int, opcional): Contactos por página
+        """
+        self.agenda = agenda
+        self.tam_pagina = tam_pagina
+        self._desde = clave_alfabetica(desde) if desde else None
+        self._primera = None  # clave del primer contacto de la página actual
+        self._ultima = None   # clave del último contacto de la página actual
+    
+    def _leer(self, entradas):
+        """
+        Toma una página de entradas (clave, contacto) y guarda sus límites.
+        """
+        pagina = list(itertools.islice(entradas, self.tam_pagina))
+        if pagina:
+            self._primera = min(pagina[0][0], pagina[-1][0])
+            self._ultima = max(pagina[0][0], pagina[-1][0])
+        return pagina
+    
+    def siguiente(self):
+        """
+        Avanza a la página siguiente.
+        
+        Returns:
+            list: Contactos de la página (vacía si no hay más)
+        """
+        if self._ultima is None:
+            entradas = self.agenda._recorrer_desde(self._desde)
+        else:
+            entradas = self.agenda._recorrer_desde(self._ultima, inclusivo=False)
+        return [contacto for _, contacto in self._leer(entradas)]
+    
+    def anterior(self):
+        """
+        Retrocede a la página anterior.
+        
+        Returns:
+            list: Contactos de la página en orden alfabético (vacía si no hay más)
+        """
+        posicion = self._desde if self._primera is None else self._primera
+        entradas = self.agenda._recorrer_desde(posicion, inverso=True, inclusivo=False)
+        return [contacto for _, contacto in reversed(self._leer(entradas))]
+
+
+# Candidatos seguidos que puede descartar una sesión de autocompletado al
+# filtrar los del texto anterior antes de pasar al índice de trigramas
+PRESUPUESTO_FILTRADO = 500
+
+# Segundos que puede dedicar como mucho cada pulsación de una sesión de
+# autocompletado a buscar candidatos
+PRESUPUESTO_PULSACION = 0.0005
+
+# Lista más corta del índice de trigramas que una sesión de autocompletado
+# cruza directamente en lugar de filtrar los candidatos del texto anterior
+LIMITE_INTERSECCION = 8192
+
+
+class _Memorizado:
+    """
+    Iterador perezoso que recuerda lo que ya ha producido y se puede recorrer varias veces.
+    
+    Las pausas de la fuente (None) se dejan pasar pero no se recuerdan.
+    """
+    
+    def __init__(self, fuente):
+        self._fuente = iter(fuente)
+        self.producidos = []
+    
+    @property
+    def completo(self):
+        """
+        Indica si la fuente ya se ha agotado y `producidos` tiene todos los elementos.
+        """
+        return self._fuente is None
+    
+    def __iter__(self):
+        i = 0
+        while True:
+            if i < len(self.producidos):
+                yield self.producidos[i]
+            elif self._fuente is None:
+                return
+            else:
+                try:
+                    elemento = next(self._fuente)
+                except StopIteration:
+                    self._fuente = None
+                    return
+                if elemento is None:
+                    yield None
+                    continue
+                self.producidos.append(elemento)
+                yield elemento
+            i += 1
+
+
+class SesionAutocompletado:
+    """
+    Búsqueda por término mientras el usuario escribe, pulsación a pulsación.
+    
+    Las sugerencias son primero los contactos cuyo nombre empieza por el
+    texto (en orden alfabético, sin distinguir acentos) y después el resto de
+    contactos que lo contienen en algún campo, como buscar_por_termino.
+    
+    Cada texto que contiene al anterior ("mar" -> "mari") filtra los
+    candidatos del anterior en lugar de volver a buscar, salvo que el índice
+    de trigramas se haya vuelto más selectivo con el texto nuevo. Los
+    candidatos se calculan de forma perezosa, solo hasta completar k
+    sugerencias, y se recuerdan, así que al borrar una letra se vuelve a los
+    del texto anterior.
+    Si al filtrar se descartan más de PRESUPUESTO_FILTRADO candidatos
+    seguidos, el resto se pide al índice de trigramas, que descarta antes a
+    los que no coinciden. Cualquier cambio en la agenda descarta lo recordado.
+    
+    Cada pulsación busca candidatos durante PRESUPUESTO_PULSACION segundos
+    como mucho. Si se agota el tiempo antes de completar las k sugerencias,
+    se devuelven las encontradas y la pulsación siguiente continúa donde se
+    quedó esta.
+    """
+    
+    # Fuente de tiempo; se puede sustituir para simular el paso del tiempo
+    reloj = staticmethod(time.perf_counter)
+    
+    def __init__(self, agenda, k=10):
+        """
+        Inicializa la sesión.
+        
+        Args:
+            agenda (Agenda): Agenda donde se busca
+            k (int, opcional): Número de sugerencias por pulsación
+        """
+        self.agenda = agenda
+        self.k = k
+        self._version = agenda.cache_consultas.version
+        # [(término, _Memorizado de (texto, id, contacto))]; cada término contiene al anterior
+        self._historial = []
+    
+    def _del_indice(self, termino, desde=-1):
+        """
+        Candidatos sacados del índice, con sus campos en minúsculas para que
+        filtrarlos después sea una sola búsqueda en una cadena.
+        """
+        for candidato in self.agenda._contienen(termino, desde, pausas=True):
+            if candidato is None:
+                yield None
+            else:
+                ident, c = candidato
+                yield f"{c.nombre.lower()}\0{c.telefono.lower()}\0{c.email.lower()}", ident, c
+    
+    def _mas_selectivo(self, termino, anterior):
+        """
+        Indica si conviene buscar el término en el índice en lugar de filtrar
+        los candidatos del texto anterior: su lista más corta del índice de
+        trigramas es más corta que la del texto anterior y no pasa de
+        LIMITE_INTERSECCION, así que se cruza en pocas pulsaciones.
+        """
+        if len(termino) < 3:
+            return False
+        listas = self.agenda._listas_trigramas(termino)
+        if not listas:
+            return True
+        if len(listas[0]) > LIMITE_INTERSECCION:
+            return False
+        anteriores = self.agenda._listas_trigramas(anterior) if len(anterior) >= 3 else None
+        return not anteriores or len(listas[0]) < len(anteriores[0])
+    
+    def _filtrar(self, anteriores, termino):
+        """
+        Filtra los candidatos de un texto anterior y, si casi ninguno sirve,
+        continúa con el índice desde el último revisado. Cada candidato
+        descartado produce una pausa (None).
+        """
+        descartados = 0
+        ultimo = -1
+        for candidato in anteriores:
+            if candidato is None:
+                yield None
+                continue
+            if termino in candidato[0]:
+                descartados = 0
+                yield candidato
+            else:
+                descartados += 1
+                if descartados > PRESUPUESTO_FILTRADO and len(termino) >= 3:
+                    break
+                yield None
+            ultimo = candidato[1]
+        else:
+            return
+        yield from self._del_indice(termino, ultimo)
+    
+    def _candidatos(self, termino):
+        """
+        Contactos que contienen el término, aprovechando los textos anteriores.
+        """
+        if self._version != self.agenda.cache_consultas.version:
+            self._version = self.agenda.cache_consultas.version
+            self._historial = []
+        
+        historial = self._historial
+        while historial and historial[-1][0] not in termino:
+            historial.pop()
+        if historial and historial[-1][0] == termino:
+            return historial[-1][1]
+        
+        if historial and not self._mas_selectivo(termino, historial[-1][0]):
+            anteriores = historial[-1][1]
+            if anteriores.completo:
+                anteriores = anteriores.producidos
+            candidatos = _Memorizado(self._filtrar(anteriores, termino))
+        else:
+            candidatos = _Memorizado(self._del_indice(termino))
+        historial.append((termino, candidatos))
+        return candidatos
+    
+    def buscar(self, texto, k=None):
+        """
+        Obtiene las sugerencias para el texto escrito hasta ahora.
+        
+        Args:
+            texto (str): Texto escrito
+            k (int, opcional): Número de sugerencias; por defecto el de la sesión
+            
+        Returns:
+            list: Hasta k contactos, primero los que empiezan por el texto
+                  (menos si se agota PRESUPUESTO_PULSACION)
+        """
+        k = self.k if k is None else k
+        limite = self.reloj() + PRESUPUESTO_PULSACION
+        prefijo = clave_alfabetica(texto)
+        termino = texto.lower()
+        if not prefijo or not termino:
+            return []
+        
+        sugerencias = []
+        for clave, contacto in self.agenda._recorrer_desde(prefijo):
+            if not clave.startswith(prefijo) or len(sugerencias) == k:
+                break
+            sugerencias.append(contacto)
+        if len(sugerencias) == k:
+            return sugerencias
+        
+        # Ya están todos los que empiezan por el texto; completamos con el resto
+        for candidato in self._candidatos(termino):
+            if candidato is not None:
+                contacto = candidato[2]
+                if not clave_alfabetica(contacto.nombre).startswith(prefijo):
+                    sugerencias.append(contacto)
+                    if len(sugerencias) == k:
+                        break
+            if self.reloj() > limite:
+                break
+        return sugerencias
 
 
 def mostrar_menu():
@@ -161,7 +1119,12 @@ def mostrar_menu():
     print("3. Buscar por término")
     print("4. Actualizar contacto")
     print("5. Eliminar contacto")
-    print("6. Mostrar todos los contactos")
+    print("6. Mostrar contactos en orden alfabético")
+    print("7. Buscar por teléfono")
+    print("8. Búsqueda aproximada por nombre")
+    print("9. Importar contactos (vCard o CSV)")
+    print("10. Exportar contactos (vCard o CSV)")
+    print("11. Buscar y fusionar duplicados")
     print("0. Salir")
     
     try:
@@ -174,13 +1137,25 @@ def mostrar_menu():
 def main():
     """
     Función principal que ejecuta la aplicación de agenda de contactos.
+    
+    Si se indica un fichero como argumento (python agenda_contactos.py agenda.db)
+    la agenda se guarda en él; si no, se trabaja en memoria.
     """
-    agenda = Agenda()
+    # Se importan aquí porque estos módulos dependen de este
+    from agenda_persistente import AgendaPersistente
+    from duplicados_agenda import detectar_duplicados
+    from intercambio_contactos import exportar_fichero, importar_fichero
+    
+    if len(sys.argv) > 1:
+        agenda = AgendaPersistente(sys.argv[1])
+    else:
+        agenda = Agenda()
     
-    # Agregamos algunos contactos de ejemplo
-    agenda.agregar_contacto(Contacto("Ana García", "666111222", "ana@example.com"))
-    agenda.agregar_contacto(Contacto("Luis Pérez", "644555666", "luis@example.com"))
-    agenda.agregar_contacto(Contacto("María Sánchez", "677888999"))
+    # Agregamos algunos contactos de ejemplo si la agenda está vacía
+    if not len(agenda):
+        agenda.agregar_contacto(Contacto("Ana García", "666111222", "ana@example.com"))
+        agenda.agregar_contacto(Contacto("Luis Pérez", "644555666", "luis@example.com"))
+        agenda.agregar_contacto(Contacto("María Sánchez", "677888999"))
     
     print("¡Bienvenido a tu Agenda de Contactos!")
     
@@ -188,6 +1163,8 @@ def main():
         opcion = mostrar_menu()
         
         if opcion == 0:
+            if isinstance(agenda, AgendaPersistente):
+                agenda.cerrar()
             print("¡Gracias por usar la Agenda de Contactos!")
             break
             
@@ -267,8 +1244,88 @@ def main():
             agenda.eliminar_contacto(nombre)
         
         elif opcion == 6:
-            # Mostrar todos los contactos
-            agenda.mostrar_contactos()
+            # Hojear los contactos en orden alfabético, página a página
+            desde = input("Empezar por (letras iniciales, en blanco para el principio): ")
+            paginador = agenda.paginador(desde or None, tam_pagina=10)
+            pagina = paginador.siguiente()
+            if not pagina:
+                print("No hay contactos a partir de ahí.")
+            while pagina:
+                print("\n---------------------------")
+                for contacto in pagina:
+                    print(contacto)
+                    print("---------------------------")
+                
+                accion = input("[S]iguiente, [A]nterior o Enter para volver: ").strip().lower()
+                if accion == 's':
+                    nueva = paginador.siguiente()
+                elif accion == 'a':
+                    nueva = paginador.anterior()
+                else:
+                    break
+                if nueva:
+                    pagina = nueva
+                else:
+                    print("No hay más contactos en esa dirección.")
+        
+        elif opcion == 7:
+            # Identificar un número o listar los que empiezan por unos dígitos
+            print("\n-- BUSCAR POR TELÉFONO --")
+            telefono = input("Teléfono o primeros dígitos: ")
+            resultados = agenda.buscar_por_telefono(telefono)
+            
+            if not resultados:
+                resultados = list(itertools.islice(agenda.contactos_con_prefijo(telefono), 20))
+            
+            if resultados:
+                print(f"\nSe encontraron {len(resultados)} contacto(s):")
+                print("---------------------------")
+                for contacto in resultados:
+                    print(contacto)
+                    print("---------------------------")
+            else:
+                print(f"No se encontraron contactos con el teléfono '{telefono}'.")
+        
+        elif opcion == 8:
+            # Buscar por nombre tolerando errores de escritura
+            print("\n-- BÚSQUEDA APROXIMADA --")
+            nombre = input("Nombre (aunque esté mal escrito): ")
+            resultados = agenda.buscar_aproximado(nombre)
+            
+            if resultados:
+                print(f"\nContactos más parecidos a '{nombre}':")
+                print("---------------------------")
+                for contacto, distancia in resultados:
+                    print(contacto)
+                    print(f"Diferencias: {distancia}")
+                    print("---------------------------")
+            else:
+                print(f"No se encontraron contactos parecidos a '{nombre}'.")
+        
+        elif opcion == 9:
+            # Importar contactos de un fichero
+            print("\n-- IMPORTAR CONTACTOS --")
+            ruta = input("Fichero (.vcf o .csv): ")
+            informe = importar_fichero(agenda, ruta)
+            if informe is not None:
+                informe.mostrar()
+        
+        elif opcion == 10:
+            # Exportar contactos a un fichero
+            print("\n-- EXPORTAR CONTACTOS --")
+            ruta = input("Fichero (.vcf o .csv): ")
+            exportados = exportar_fichero(agenda, ruta)
+            if exportados is not None:
+                print(f"Se exportaron {exportados} contacto(s) a '{ruta}'.")
+        
+        elif opcion == 11:
+            # Detectar contactos duplicados y fusionarlos tras confirmarlo
+            plan = detectar_duplicados(agenda)
+            plan.mostrar()
+            if len(plan):
+                respuesta = input("\n¿Aplicar estas fusiones? (s/n): ").strip().lower()
+                if respuesta == 's':
+                    agenda.aplicar_fusiones(plan)
         
         else:
             if opcion != -1:  # No mostramos este mensaje si ya se mostró un error de formato
@@ -0,0 +1,529 @@
+"""
+Agenda de contactos guardada en disco con SQLite.
+
+Los contactos viven en una tabla con índices por nombre normalizado y por
+teléfono normalizado, y un índice de texto completo FTS5 de trigramas
+sustituye al índice de trigramas en memoria de Agenda. Abrir la agenda no
+carga nada: los objetos Contacto se crean solo cuando una búsqueda los
+devuelve, y un mismo contacto se devuelve siempre como el mismo objeto
+mientras siga en uso.
+
+Las escrituras (agregar, actualizar y eliminar) se aplican al momento en la
+base de datos dentro de una transacción que se confirma cada `tam_lote`
+escrituras, al llamar a confirmar() y al cerrar la agenda.
+"""
+import sqlite3
+import weakref
+
+from agenda_contactos import (DISTANCIA_APROXIMADA_MAXIMA, Agenda, Contacto,
+                              clave_alfabetica, normalizar_nombre)
+from busqueda_aproximada import IndiceBorrados, mejores_coincidencias
+from trie_telefonos import normalizar_telefono
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS contactos (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    clave TEXT NOT NULL UNIQUE,
+    telefono TEXT NOT NULL,
+    telefono_normalizado TEXT,
+    email TEXT NOT NULL DEFAULT '',
+    orden TEXT
+);
+CREATE INDEX IF NOT EXISTS contactos_telefono ON contactos (telefono_normalizado, id);
+CREATE TABLE IF NOT EXISTS palabras (
+    palabra TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    PRIMARY KEY (palabra, id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS contactos_fts USING fts5 (
+    nombre, telefono, email,
+    content='contactos', content_rowid='id', tokenize='trigram'
+);
+"""
+
+COLUMNAS = "id, nombre, telefono, email"
+
+# Filas que se piden a SQLite de cada vez al recorrer resultados
+FILAS_POR_LECTURA = 1000
+
+
+class AgendaPersistente:
+    """
+    Agenda de contactos respaldada por una base de datos SQLite.
+
+    Ofrece las mismas operaciones que Agenda y se puede usar como gestor de
+    contexto para cerrarla (y confirmar las escrituras pendientes) al salir.
+    """
+
+    def __init__(self, ruta, tam_lote=1000):
+        """
+        Abre la agenda guardada en un fichero, creándola si no existe.
+
+        Args:
+            ruta (str): Fichero de la base de datos
+            tam_lote (int, opcional): Escrituras que se agrupan en cada transacción
+        """
+        self.ruta = ruta
+        self.tam_lote = tam_lote
+        self._conexion = sqlite3.connect(ruta)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(ESQUEMA)
+        self._migrar()
+        self._pendientes = 0
+        # Contactos ya creados, para devolver siempre el mismo objeto
+        self._cargados = weakref.WeakValueDictionary()
+        # Vocabulario de la búsqueda aproximada; se construye al usarla por primera vez
+        self._vocabulario = None
+
+    def _migrar(self):
+        """
+        Añade a las bases de datos antiguas la columna de orden alfabético.
+        """
+        columnas = {fila[1] for fila in self._conexion.execute("PRAGMA table_info(contactos)")}
+        if 'orden' not in columnas:
+            self._conexion.execute("ALTER TABLE contactos ADD COLUMN orden TEXT")
+            filas = self._conexion.execute("SELECT id, nombre FROM contactos").fetchall()
+            self._conexion.executemany("UPDATE contactos SET orden = ? WHERE id = ?",
+                                       ((clave_alfabetica(nombre), ident) for ident, nombre in filas))
+        self._conexion.execute("CREATE INDEX IF NOT EXISTS contactos_orden ON contactos (orden)")
+        self._conexion.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def confirmar(self):
+        """
+        Confirma en disco las escrituras pendientes.
+        """
+        self._conexion.commit()
+        self._pendientes = 0
+
+    def cerrar(self):
+        """
+        Confirma las escrituras pendientes y cierra la base de datos.
+        """
+        if self._conexion is not None:
+            self.confirmar()
+            self._conexion.close()
+            self._conexion = None
+
+    def _escritura(self):
+        """
+        Cuenta una escritura y confirma la transacción al completar un lote.
+        """
+        self._pendientes += 1
+        if self._pendientes >= self.tam_lote:
+            self.confirmar()
+
+    def _contacto(self, fila):
+        """
+        Convierte una fila (id, nombre, telefono, email) en un Contacto.
+        """
+        ident, nombre, telefono, email = fila
+        contacto = self._cargados.get(ident)
+        if contacto is None:
+            contacto = Contacto(nombre, telefono, email)
+            contacto._agendas = (self,)
+            self._cargados[ident] = contacto
+        return contacto
+
+    def _contactos(self, cursor):
+        """
+        Recorre un cursor creando los contactos por tandas.
+        """
+        while True:
+            filas = cursor.fetchmany(FILAS_POR_LECTURA)
+            if not filas:
+                return
+            for fila in filas:
+                yield self._contacto(fila)
+
+    @property
+    def contactos(self):
+        """
+        Contactos de la agenda en orden de inserción.
+
+        Returns:
+            list: Lista de contactos
+        """
+        return list(self)
+
+    def __iter__(self):
+        """
+        Recorre los contactos en orden de inserción, leyéndolos por tandas.
+
+        Yields:
+            Contacto: Contactos de la agenda
+        """
+        return self._contactos(self._conexion.execute(
+            f"SELECT {COLUMNAS} FROM contactos ORDER BY id"))
+
+    def __len__(self):
+        """
+        Número de contactos de la agenda.
+
+        Returns:
+            int: Número de contactos
+        """
+        return self._conexion.execute("SELECT count(*) FROM contactos").fetchone()[0]
+
+    def _insertar(self, contacto):
+        """
+        Inserta un contacto en la tabla principal.
+
+        Returns:
+            int o None: Identificador asignado o None si el nombre ya existe
+        """
+        cursor = self._conexion.execute(
+            "INSERT INTO contactos (nombre, clave, telefono, telefono_normalizado, email, orden) "
+            "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (clave) DO NOTHING",
+            (contacto.nombre, normalizar_nombre(contacto.nombre), contacto.telefono,
+             normalizar_telefono(contacto.telefono), contacto.email,
+             clave_alfabetica(contacto.nombre)))
+        return cursor.lastrowid if cursor.rowcount else None
+
+    def _indexar(self, ident, nombre, telefono, email):
+        """
+        Añade un contacto al índice de texto y al de palabras.
+        """
+        self._conexion.execute(
+            "INSERT INTO contactos_fts (rowid, nombre, telefono, email) VALUES (?, ?, ?, ?)",
+            (ident, nombre, telefono, email))
+        palabras = set(normalizar_nombre(nombre).split())
+        self._conexion.executemany("INSERT OR IGNORE INTO palabras (palabra, id) VALUES (?, ?)",
+                                   ((palabra, ident) for palabra in palabras))
+        if self._vocabulario is not None:
+            for palabra in palabras:
+                if not palabra.isdigit():
+                    self._vocabulario.agregar(palabra)
+
+    def _desindexar(self, ident, nombre, telefono, email):
+        """
+        Quita un contacto del índice de texto y del de palabras.
+        """
+        self._conexion.execute(
+            "INSERT INTO contactos_fts (contactos_fts, rowid, nombre, telefono, email) "
+            "VALUES ('delete', ?, ?, ?, ?)", (ident, nombre, telefono, email))
+        for palabra in set(normalizar_nombre(nombre).split()):
+            self._conexion.execute("DELETE FROM palabras WHERE palabra = ? AND id = ?",
+                                   (palabra, ident))
+            if self._vocabulario is not None and self._conexion.execute(
+                    "SELECT 1 FROM palabras WHERE palabra = ? LIMIT 1", (palabra,)).fetchone() is None:
+                self._vocabulario.quitar(palabra)
+
+    def _contacto_actualizado(self, contacto, telefono_anterior, email_anterior):
+        """
+        Escribe en disco el nuevo teléfono o email de un contacto.
+
+        Args:
+            contacto (Contacto): Contacto modificado
+            telefono_anterior (str): Teléfono antes del cambio
+            email_anterior (str): Email antes del cambio
+        """
+        fila = self._conexion.execute("SELECT id FROM contactos WHERE clave = ?",
+                                      (normalizar_nombre(contacto.nombre),)).fetchone()
+        if fila is None:
+            return
+        ident = fila[0]
+        self._conexion.execute(
+            "INSERT INTO contactos_fts (contactos_fts, rowid, nombre, telefono, email) "
+            "VALUES ('delete', ?, ?, ?, ?)", (ident, contacto.nombre, telefono_anterior, email_anterior))
+        self._conexion.execute(
+            "UPDATE contactos SET telefono = ?, telefono_normalizado = ?, email = ? WHERE id = ?",
+            (contacto.telefono, normalizar_telefono(contacto.telefono), contacto.email, ident))
+        self._conexion.execute(
+            "INSERT INTO contactos_fts (rowid, nombre, telefono, email) VALUES (?, ?, ?, ?)",
+            (ident, contacto.nombre, contacto.telefono, contacto.email))
+        self._escritura()
+
+    def agregar_contacto(self, contacto):
+        """
+        Agrega un nuevo contacto a la agenda.
+
+        Args:
+            contacto (Contacto): El contacto a agregar
+
+        Returns:
+            bool: True si se agregó correctamente, False si ya existe un contacto con ese nombre
+        """
+        ident = self._insertar(contacto)
+        if ident is None:
+            print(f"Error: Ya existe un contacto con el nombre '{contacto.nombre}'.")
+            return False
+
+        self._indexar(ident, contacto.nombre, contacto.telefono, contacto.email)
+        self._cargados[ident] = contacto
+        contacto._agendas += (self,)
+        self._escritura()
+
+        print(f"Contacto '{contacto.nombre}' agregado correctamente.")
+        return True
+
+    def importar(self, contactos, informe=None):
+        """
+        Agrega muchos contactos en una sola transacción, indexándolos al final.
+
+        Args:
+            contactos (iterable): Contactos a agregar (puede ser un generador)
+            informe (InformeImportacion, opcional): Informe donde anotar
+                agregados y duplicados
+
+        Returns:
+            int: Número de contactos agregados
+        """
+        self.confirmar()
+        conexion = self._conexion
+        primero = conexion.execute("SELECT coalesce(max(id), 0) + 1 FROM contactos").fetchone()[0]
+        agregados = 0
+        try:
+            for contacto in contactos:
+                if self._insertar(contacto) is None:
+                    if informe is not None:
+                        informe.registrar_duplicado(contacto)
+                else:
+                    agregados += 1
+        finally:
+            # Índices de los contactos nuevos, en bloque
+            conexion.execute(
+                "INSERT INTO contactos_fts (rowid, nombre, telefono, email) "
+                "SELECT id, nombre, telefono, email FROM contactos WHERE id >= ?", (primero,))
+            claves = conexion.execute("SELECT id, clave FROM contactos WHERE id >= ?", (primero,))
+            conexion.executemany(
+                "INSERT OR IGNORE INTO palabras (palabra, id) VALUES (?, ?)",
+                ((palabra, ident) for ident, clave in claves for palabra in set(clave.split())))
+            self._vocabulario = None
+            self.confirmar()
+
+        if informe is not None:
+            informe.agregados += agregados
+        print(f"Se importaron {agregados} contacto(s).")
+        return agregados
+
+    def buscar_contacto(self, nombre):
+        """
+        Busca un contacto por su nombre, sin distinguir mayúsculas ni acentos.
+
+        Args:
+            nombre (str): El nombre del contacto a buscar
+
+        Returns:
+            Contacto o None: El contacto encontrado o None si no existe
+        """
+        fila = self._conexion.execute(f"SELECT {COLUMNAS} FROM contactos WHERE clave = ?",
+                                      (normalizar_nombre(nombre),)).fetchone()
+        return None if fila is None else self._contacto(fila)
+
+    def buscar_por_telefono(self, telefono):
+        """
+        Identifica a quién pertenece un número de teléfono.
+
+        Args:
+            telefono (str): Número a buscar, en cualquier formato
+
+        Returns:
+            list: Contactos con ese teléfono, en orden de inserción
+        """
+        numero = normalizar_telefono(telefono)
+        if numero is None:
+            return []
+        return list(self._contactos(self._conexion.execute(
+            f"SELECT {COLUMNAS} FROM contactos WHERE telefono_normalizado = ? ORDER BY id",
+            (numero,))))
+
+    def contactos_con_prefijo(self, prefijo):
+        """
+        Recorre de forma perezosa los contactos cuyo teléfono empieza por un prefijo.
+
+        Args:
+            prefijo (str): Primeros dígitos del teléfono
+
+        Yields:
+            Contacto: Contactos en orden numérico de teléfono
+        """
+        numero = normalizar_telefono(prefijo)
+        if numero is None:
+            return iter(())
+        # ':' es el carácter siguiente a '9', así que el rango abarca todo el prefijo
+        return self._contactos(self._conexion.execute(
+            f"SELECT {COLUMNAS} FROM contactos "
+            "WHERE telefono_normalizado >= ? AND telefono_normalizado < ? "
+            "ORDER BY telefono_normalizado, id", (numero, numero + ':')))
+
+    def buscar_por_termino(self, termino):
+        """
+        Busca contactos que contengan un término específico en cualquier campo.
+
+        Con términos de 3 o más caracteres se consulta el índice FTS5 de
+        trigramas; los más cortos recorren la tabla completa. En ambos casos
+        se comprueba cada candidato igual que en Agenda.
+
+        Args:
+            termino (str): El término a buscar
+
+        Returns:
+            list: Lista de contactos que coinciden con el término, en orden de inserción
+        """
+        termino = termino.lower()
+        if len(termino) < 3:
+            cursor = self._conexion.execute(f"SELECT {COLUMNAS} FROM contactos ORDER BY id")
+        else:
+            frase = '"' + termino.replace('"', '""') + '"'
+            cursor = self._conexion.execute(
+                f"SELECT {COLUMNAS} FROM contactos WHERE id IN "
+                "(SELECT rowid FROM contactos_fts WHERE contactos_fts MATCH ?) ORDER BY id",
+                (frase,))
+
+        resultados = []
+        while True:
+            filas = cursor.fetchmany(FILAS_POR_LECTURA)
+            if not filas:
+                break
+            for fila in filas:
+                _, nombre, telefono, email = fila
+                if (termino in nombre.lower() or
+                    termino in telefono.lower() or
+                    termino in email.lower()):
+                    resultados.append(self._contacto(fila))
+        return resultados
+
+    def buscar_aproximado(self, nombre, max_distancia=DISTANCIA_APROXIMADA_MAXIMA, k=5):
+        """
+        Busca contactos por nombre tolerando errores de escritura (ver Agenda.buscar_aproximado).
+
+        Args:
+            nombre (str): Nombre o palabras del nombre a buscar
+            max_distancia (int, opcional): Distancia máxima admitida (como mucho 2)
+            k (int, opcional): Número máximo de resultados
+
+        Returns:
+            list: Tuplas (contacto, distancia) ordenadas por distancia y por orden de inserción
+        """
+        if max_distancia > DISTANCIA_APROXIMADA_MAXIMA:
+            print(f"Error: La distancia máxima admitida es {DISTANCIA_APROXIMADA_MAXIMA}.")
+            return []
+
+        consulta = normalizar_nombre(nombre).split()
+        if not consulta or k <= 0:
+            return []
+
+        conexion = self._conexion
+        if self._vocabulario is None:
+            self._vocabulario = IndiceBorrados(DISTANCIA_APROXIMADA_MAXIMA)
+            for (palabra,) in conexion.execute(
+                    "SELECT DISTINCT palabra FROM palabras WHERE palabra GLOB '*[^0-9]*'"):
+                self._vocabulario.agregar(palabra)
+
+        def buscar_palabra(palabra):
+            if palabra.isdigit():
+                existe = conexion.execute("SELECT 1 FROM palabras WHERE palabra = ? LIMIT 1",
+                                          (palabra,)).fetchone()
+                return {palabra: 0} if existe else {}
+            return self._vocabulario.buscar(palabra, max_distancia)
+
+        def ids_con_palabra(palabra):
+            return {ident for (ident,) in conexion.execute(
+                "SELECT id FROM palabras WHERE palabra = ?", (palabra,))}
+
+        encontrados = mejores_coincidencias(consulta, buscar_palabra, ids_con_palabra,
+                                            max_distancia, k)
+        resultados = []
+        for ident, distancia in encontrados:
+            fila = conexion.execute(f"SELECT {COLUMNAS} FROM contactos WHERE id = ?",
+                                    (ident,)).fetchone()
+            resultados.append((self._contacto(fila), distancia))
+        return resultados
+
+    def _quitar(self, nombre):
+        """
+        Borra un contacto de la base de datos sin mostrar mensajes.
+
+        Returns:
+            bool: True si el contacto existía
+        """
+        fila = self._conexion.execute(f"SELECT {COLUMNAS} FROM contactos WHERE clave = ?",
+                                      (normalizar_nombre(nombre),)).fetchone()
+        if fila is None:
+            return False
+
+        ident = fila[0]
+        self._desindexar(*fila)
+        self._conexion.execute("DELETE FROM contactos WHERE id = ?", (ident,))
+        contacto = self._cargados.pop(ident, None)
+        if contacto is not None:
+            contacto._agendas = tuple(a for a in contacto._agendas if a is not self)
+        self._escritura()
+        return True
+
+    def eliminar_contacto(self, nombre):
+        """
+        Elimina un contacto de la agenda por su nombre.
+
+        Args:
+            nombre (str): El nombre del contacto a eliminar
+
+        Returns:
+            bool: True si se eliminó correctamente, False si no se encontró el contacto
+        """
+        if not self._quitar(nombre):
+            print(f"Error: No se encontró un contacto con el nombre '{nombre}'.")
+            return False
+
+        print(f"Contacto '{nombre}' eliminado correctamente.")
+        return True
+
+    def _recorrer_desde(self, clave, inverso=False, inclusivo=True):
+        """
+        Recorre el índice alfabético desde una clave alfabética.
+
+        Yields:
+            tuple: (clave alfabética, contacto)
+        """
+        condicion = ""
+        parametros = ()
+        if clave is not None:
+            operador = ('<' if inverso else '>') + ('=' if inclusivo else '')
+            condicion = f"WHERE orden {operador} ?"
+            parametros = (clave,)
+        sentido = 'DESC' if inverso else 'ASC'
+        cursor = self._conexion.execute(
+            f"SELECT orden, {COLUMNAS} FROM contactos {condicion} ORDER BY orden {sentido}",
+            parametros)
+        while True:
+            filas = cursor.fetchmany(FILAS_POR_LECTURA)
+            if not filas:
+                return
+            for fila in filas:
+                yield fila[0], self._contacto(fila[1:])
+
+    # Solo dependen de _recorrer_desde, así que se comparten con Agenda
+    recorrer_alfabetico = Agenda.recorrer_alfabetico
+    paginador = Agenda.paginador
+    aplicar_fusiones = Agenda.aplicar_fusiones
+
+    def mostrar_contactos(self):
+        """
+        Muestra todos los contactos de la agenda.
+
+        Returns:
+            int: El número de contactos mostrados
+        """
+        total = len(self)
+        if not total:
+            print("La agenda está vacía.")
+            return 0
+
+        print("\n=== AGENDA DE CONTACTOS ===")
+        print(f"Total de contactos: {total}")
+        print("---------------------------")
+
+        for i, contacto in enumerate(self, 1):
+            print(f"\nContacto #{i}:")
+            print(contacto)
+            print("---------------------------")
+
+        return total
@@ -0,0 +1,391 @@
+"""
+Análisis incremental de un documento que se edita.
+
+El documento se guarda en bloques de texto de como mucho 2 * TAM_BLOQUE
+caracteres, que son los nodos de un treap (árbol binario de búsqueda
+equilibrado con prioridades aleatorias) ordenado por posición. Cada nodo
+guarda el resumen de su bloque y el de todo su subárbol, y los resúmenes se
+combinan en O(1): así, tras una edición solo se recalculan el bloque tocado
+y sus antecesores, O(log n + tamaño del bloque + tamaño de la edición).
+
+Como un bloque puede cortar una palabra, el resumen guarda además el trozo
+de palabra con que empieza y con el que termina; al combinar dos resúmenes
+esos trozos se unen en una palabra completa.
+"""
+import random
+from collections import namedtuple
+
+from analizador_texto import analizar_texto, normalizar_palabras
+
+# Tamaño de referencia de los bloques
+TAM_BLOQUE = 1024
+
+Resumen = namedtuple('Resumen', 'palabras vocales consonantes empieza termina sin_espacios '
+                                'prefijo letras_prefijo interior letras_interior '
+                                'sufijo letras_sufijo')
+Resumen.__doc__ = """
+Estadísticas combinables de un trozo de texto.
+
+empieza/termina indican si el trozo empieza o termina dentro de una
+palabra. prefijo y sufijo son el trozo de palabra (tal cual, sin limpiar)
+antes del primer espacio y después del último; si no hay ningún espacio
+(sin_espacios) todo el trozo está en prefijo. interior es la primera
+palabra con más letras entre los dos, ya limpia y en minúsculas.
+"""
+
+
+def _limpiar(palabra):
+    """
+    Palabra sin lo que no son letras y en minúsculas, como en analizar_texto.
+    """
+    return ''.join(normalizar_palabras(palabra))
+
+
+def _resumir(bloque):
+    """
+    Calcula el resumen de un bloque de texto no vacío.
+    """
+    empieza = not bloque[0].isspace()
+    termina = not bloque[-1].isspace()
+    prefijo = bloque.split(maxsplit=1)[0] if empieza else ""
+    if len(prefijo) == len(bloque):
+        palabras, vocales, consonantes, _ = analizar_texto(bloque)
+        return Resumen(palabras, vocales, consonantes, True, True, True,
+                       bloque, vocales + consonantes, "", 0, "", 0)
+
+    sufijo = bloque.rsplit(maxsplit=1)[-1] if termina else ""
+    # Lo de en medio empieza y termina con espacio: sus palabras están completas
+    palabras, vocales, consonantes, interior = analizar_texto(bloque[len(prefijo):len(bloque) - len(sufijo)])
+    _, vocales_prefijo, consonantes_prefijo, _ = analizar_texto(prefijo)
+    _, vocales_sufijo, consonantes_sufijo, _ = analizar_texto(sufijo)
+    return Resumen(palabras + bool(prefijo) + bool(sufijo),
+                   vocales + vocales_prefijo + vocales_sufijo,
+                   consonantes + consonantes_prefijo + consonantes_sufijo,
+                   empieza, termina, False,
+                   prefijo, vocales_prefijo + consonantes_prefijo,
+                   interior, len(interior),
+                   sufijo, vocales_sufijo + consonantes_sufijo)
+
+
+def _combinar(a, b):
+    """
+    Resumen del texto de `a` seguido del de `b` (cualquiera puede ser None).
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+
+    palabras = a.palabras + b.palabras - (a.termina and b.empieza)
+    vocales = a.vocales + b.vocales
+    consonantes = a.consonantes + b.consonantes
+
+    if a.sin_espacios and b.sin_espacios:
+        return Resumen(palabras, vocales, consonantes, True, True, True,
+                       a.prefijo + b.prefijo, a.letras_prefijo + b.letras_prefijo, "", 0, "", 0)
+    if a.sin_espacios:
+        return b._replace(palabras=palabras, vocales=vocales, consonantes=consonantes,
+                          empieza=True, prefijo=a.prefijo + b.prefijo,
+                          letras_prefijo=a.letras_prefijo + b.letras_prefijo)
+    if b.sin_espacios:
+        return a._replace(palabras=palabras, vocales=vocales, consonantes=consonantes,
+                          termina=True, sufijo=a.sufijo + b.prefijo,
+                          letras_sufijo=a.letras_sufijo + b.letras_prefijo)
+
+    # El final de `a` y el principio de `b` forman una palabra completa.
+    # A igual número de letras se queda la primera, como en analizar_texto
+    interior, letras = a.interior, a.letras_interior
+    if a.letras_sufijo + b.letras_prefijo > letras:
+        letras = a.letras_sufijo + b.letras_prefijo
+        interior = _limpiar(a.sufijo + b.prefijo)
+    if b.letras_interior > letras:
+        interior, letras = b.interior, b.letras_interior
+    return Resumen(palabras, vocales, consonantes, a.empieza, b.termina, False,
+                   a.prefijo, a.letras_prefijo, interior, letras, b.sufijo, b.letras_sufijo)
+
+
+class _Nodo:
+    """
+    Bloque del documento dentro del treap.
+    """
+
+    __slots__ = ('bloque', 'resumen', 'prioridad', 'izquierdo', 'derecho', 'longitud', 'total')
+
+    def __init__(self, bloque):
+        self.bloque = bloque
+        self.resumen = _resumir(bloque)
+        self.prioridad = random.random()
+        self.izquierdo = None
+        self.derecho = None
+        self.longitud = len(bloque)  # caracteres del subárbol
+        self.total = self.resumen    # resumen del subárbol
+
+    def actualizar(self):
+        """
+        Recalcula la longitud y el resumen del subárbol a partir de los hijos.
+        """
+        izquierdo, derecho = self.izquierdo, self.derecho
+        self.longitud = len(self.bloque)
+        self.total = self.resumen
+        if izquierdo is not None:
+            self.longitud += izquierdo.longitud
+            self.total = _combinar(izquierdo.total, self.total)
+        if derecho is not None:
+            self.longitud += derecho.longitud
+            self.total = _combinar(self.total, derecho.total)
+
+
+def _longitud(nodo):
+    return 0 if nodo is None else nodo.longitud
+
+
+def _unir(a, b):
+    """
+    Une dos treaps: todo `a` va delante de todo `b`.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if a.prioridad > b.prioridad:
+        a.derecho = _unir(a.derecho, b)
+        a.actualizar()
+        return a
+    b.izquierdo = _unir(a, b.izquierdo)
+    b.actualizar()
+    return b
+
+
+def _partir(nodo, posicion):
+    """
+    Parte un treap en los primeros `posicion` caracteres y el resto,
+    cortando el bloque en que cae la posición si hace falta.
+    """
+    if nodo is None:
+        return None, None
+    izquierda = _longitud(nodo.izquierdo)
+    if posicion <= izquierda:
+        a, b = _partir(nodo.izquierdo, posicion)
+        nodo.izquierdo = b
+        nodo.actualizar()
+        return a, nodo
+    posicion -= izquierda
+    if posicion >= len(nodo.bloque):
+        a, b = _partir(nodo.derecho, posicion - len(nodo.bloque))
+        nodo.derecho = a
+        nodo.actualizar()
+        return nodo, b
+
+    # La posición cae dentro del bloque: el resto del bloque pasa a un nodo
+    # nuevo, con menos prioridad para no romper el orden de los antecesores
+    nuevo = _Nodo(nodo.bloque[posicion:])
+    nuevo.prioridad *= nodo.prioridad
+    resto = _unir(nuevo, nodo.derecho)
+    nodo.bloque = nodo.bloque[:posicion]
+    nodo.resumen = _resumir(nodo.bloque)
+    nodo.derecho = None
+    nodo.actualizar()
+    return nodo, resto
+
+
+def _construir(texto):
+    """
+    Treap con el texto repartido en bloques de TAM_BLOQUE caracteres.
+    """
+    raiz = None
+    for inicio in range(0, len(texto), TAM_BLOQUE):
+        raiz = _unir(raiz, _Nodo(texto[inicio:inicio + TAM_BLOQUE]))
+    return raiz
+
+
+def _quitar_extremo(nodo, ultimo):
+    """
+    Separa el primer o el último bloque de un treap.
+
+    Returns:
+        tuple: (treap sin ese bloque, nodo del bloque suelto)
+    """
+    if ultimo:
+        if nodo.derecho is None:
+            resto, nodo.izquierdo = nodo.izquierdo, None
+            nodo.actualizar()
+            return resto, nodo
+        nodo.derecho, extremo = _quitar_extremo(nodo.derecho, True)
+    else:
+        if nodo.izquierdo is None:
+            resto, nodo.derecho = nodo.derecho, None
+            nodo.actualizar()
+            return resto, nodo
+        nodo.izquierdo, extremo = _quitar_extremo(nodo.izquierdo, False)
+    nodo.actualizar()
+    return nodo, extremo
+
+
+def _recoser(a, b):
+    """
+    Une dos treaps y, si los bloques de la unión caben en uno, los junta
+    para que las ediciones no dejen el documento lleno de bloques pequeños.
+    """
+    if a is None or b is None:
+        return _unir(a, b)
+    a, ultimo = _quitar_extremo(a, True)
+    b, primero = _quitar_extremo(b, False)
+    if len(ultimo.bloque) + len(primero.bloque) <= 2 * TAM_BLOQUE:
+        ultimo.bloque += primero.bloque
+        ultimo.resumen = _combinar(ultimo.resumen, primero.resumen)
+        ultimo.actualizar()
+        return _unir(_unir(a, ultimo), b)
+    return _unir(_unir(a, ultimo), _unir(primero, b))
+
+
+def _editar_bloque(nodo, inicio, fin, texto):
+    """
+    Sustituye [inicio, fin) por texto si todo cae dentro de un mismo bloque
+    que no queda vacío ni demasiado grande.
+
+    Returns:
+        bool: True si se hizo el cambio
+    """
+    if nodo is None:
+        return False
+    izquierda = _longitud(nodo.izquierdo)
+    # Un texto insertado entre dos bloques se añade al final del de la izquierda
+    if nodo.izquierdo is not None and fin <= izquierda:
+        hecho = _editar_bloque(nodo.izquierdo, inicio, fin, texto)
+    elif inicio > izquierda + len(nodo.bloque) or (inicio == izquierda + len(nodo.bloque) and inicio < fin):
+        hecho = _editar_bloque(nodo.derecho, inicio - izquierda - len(nodo.bloque),
+                               fin - izquierda - len(nodo.bloque), texto)
+    else:
+        inicio, fin = inicio - izquierda, fin - izquierda
+        if inicio < 0 or fin > len(nodo.bloque):
+            return False  # El cambio abarca varios bloques
+        bloque = nodo.bloque[:inicio] + texto + nodo.bloque[fin:]
+        if not bloque or len(bloque) > 2 * TAM_BLOQUE:
+            return False
+        nodo.bloque = bloque
+        nodo.resumen = _resumir(bloque)
+        hecho = True
+    if hecho:
+        nodo.actualizar()
+    return hecho
+
+
+class AnalisisIncremental:
+    """
+    Estadísticas de analizar_texto de un documento que se mantienen al día
+    mientras se edita.
+    """
+
+    def __init__(self, texto=""):
+        """
+        Inicializa el análisis con el contenido inicial del documento.
+
+        Args:
+            texto (str, opcional): Texto del documento
+        """
+        self._raiz = _construir(texto)
+
+    def __len__(self):
+        """
+        Número de caracteres del documento.
+
+        Returns:
+            int: Caracteres
+        """
+        return _longitud(self._raiz)
+
+    def texto(self):
+        """
+        Devuelve el texto completo del documento.
+
+        Returns:
+            str: Texto actual
+        """
+        bloques = []
+        pendientes = []
+        nodo = self._raiz
+        while pendientes or nodo is not None:
+            if nodo is not None:
+                pendientes.append(nodo)
+                nodo = nodo.izquierdo
+            else:
+                nodo = pendientes.pop()
+                bloques.append(nodo.bloque)
+                nodo = nodo.derecho
+        return ''.join(bloques)
+
+    def reemplazar(self, inicio, fin, texto):
+        """
+        Sustituye los caracteres [inicio, fin) del documento por texto.
+
+        Args:
+            inicio (int): Posición del primer carácter sustituido
+            fin (int): Posición siguiente al último carácter sustituido
+            texto (str): Texto nuevo (vacío para borrar)
+
+        Returns:
+            bool: True si se hizo el cambio, False si las posiciones no son válidas
+        """
+        if not 0 <= inicio <= fin <= len(self):
+            print(f"Error: Posiciones fuera del documento: [{inicio}, {fin}) de {len(self)}.")
+            return False
+        if inicio == fin and not texto:
+            return True
+
+        # Lo habitual (teclear o borrar unos caracteres) no sale de un bloque
+        if len(texto) <= TAM_BLOQUE and _editar_bloque(self._raiz, inicio, fin, texto):
+            return True
+
+        antes, resto = _partir(self._raiz, inicio)
+        _, despues = _partir(resto, fin - inicio)
+        self._raiz = _recoser(_recoser(antes, _construir(texto)), despues)
+        return True
+
+    def insertar(self, posicion, texto):
+        """
+        Inserta texto en una posición del documento.
+
+        Args:
+            posicion (int): Posición donde se inserta
+            texto (str): Texto a insertar
+
+        Returns:
+            bool: True si se insertó, False si la posición no es válida
+        """
+        return self.reemplazar(posicion, posicion, texto)
+
+    def eliminar(self, inicio, fin):
+        """
+        Borra los caracteres [inicio, fin) del documento.
+
+        Args:
+            inicio (int): Posición del primer carácter borrado
+            fin (int): Posición siguiente al último carácter borrado
+
+        Returns:
+            bool: True si se borró, False si las posiciones no son válidas
+        """
+        return self.reemplazar(inicio, fin, "")
+
+    def resultados(self):
+        """
+        Devuelve las estadísticas del documento actual en O(1).
+
+        Returns:
+            tuple: (número de palabras, número de vocales, número de consonantes,
+                    palabra más larga), lo mismo que analizar_texto(self.texto())
+        """
+        if self._raiz is None:
+            return 0, 0, 0, ""
+        total = self._raiz.total
+        if total.sin_espacios:
+            return total.palabras, total.vocales, total.consonantes, _limpiar(total.prefijo)
+
+        palabra, letras = "", 0
+        if total.letras_prefijo > letras:
+            palabra, letras = _limpiar(total.prefijo), total.letras_prefijo
+        if total.letras_interior > letras:
+            palabra, letras = total.interior, total.letras_interior
+        if total.letras_sufijo > letras:
+            palabra = _limpiar(total.sufijo)
+        return total.palabras, total.vocales, total.consonantes, palabra
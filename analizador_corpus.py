@@ -0,0 +1,309 @@
+"""
+Análisis en paralelo de corpus de muchos ficheros de texto.
+
+Cada fichero (o cada rango de bytes de un fichero grande) se analiza en un
+proceso del pool, que devuelve un EstadisticasTexto pequeño. Las
+estadísticas se combinan después en orden para obtener el resultado de cada
+fichero y el total del corpus, idénticos a los de analizar el texto entero
+de una vez.
+
+Los rangos de un fichero grande se cortan siempre justo detrás de un
+espacio en blanco ASCII: en UTF-8 esos bytes nunca forman parte de otro
+carácter, así que el corte no parte ni caracteres ni palabras.
+
+Uso:
+    python analizador_corpus.py DIRECTORIO_O_FICHERO [...] [--procesos N]
+                                [--salida resultados.json | resultados.csv]
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+from collections import namedtuple
+
+from analizador_texto import analizar_flujo
+
+# Tamaño de los rangos en que se parten los ficheros grandes
+TAM_RANGO = 64 << 20
+
+# Bytes que str.split() considera espacio en blanco y ocupan un solo byte en UTF-8
+ESPACIOS_ASCII = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+# Bytes que se leen de cada vez al buscar dónde cortar un rango
+_LECTURA_CORTE = 4096
+
+Tarea = namedtuple('Tarea', 'indice ruta inicio fin')
+
+
+class EstadisticasTexto(namedtuple('EstadisticasTexto',
+                                   'palabras vocales consonantes palabra_mas_larga bytes')):
+    """
+    Estadísticas de un trozo de texto que se pueden combinar con las del
+    trozo siguiente.
+    """
+
+    __slots__ = ()
+
+    def combinar(self, siguiente):
+        """
+        Combina estas estadísticas con las del texto que va a continuación.
+
+        Como en analizar_texto, a igual longitud se queda la primera palabra.
+
+        Args:
+            siguiente (EstadisticasTexto): Estadísticas del texto posterior
+
+        Returns:
+            EstadisticasTexto: Estadísticas de los dos textos seguidos
+        """
+        larga = self.palabra_mas_larga
+        if len(siguiente.palabra_mas_larga) > len(larga):
+            larga = siguiente.palabra_mas_larga
+        return EstadisticasTexto(self.palabras + siguiente.palabras,
+                                 self.vocales + siguiente.vocales,
+                                 self.consonantes + siguiente.consonantes,
+                                 larga,
+                                 self.bytes + siguiente.bytes)
+
+    def como_dict(self):
+        """
+        Devuelve las estadísticas como diccionario (para JSON y CSV).
+
+        Returns:
+            dict: Campos de las estadísticas
+        """
+        return self._asdict()
+
+
+VACIAS = EstadisticasTexto(0, 0, 0, "", 0)
+
+
+class _Rango(io.RawIOBase):
+    """
+    Vista de solo lectura de los bytes [inicio, fin) de un fichero binario.
+    """
+
+    def __init__(self, fichero, inicio, fin):
+        self._fichero = fichero
+        self._restantes = fin - inicio
+        fichero.seek(inicio)
+
+    def readable(self):
+        return True
+
+    def readinto(self, destino):
+        n = min(len(destino), self._restantes)
+        if n <= 0:
+            return 0
+        leidos = self._fichero.readinto(memoryview(destino)[:n])
+        self._restantes -= leidos
+        return leidos
+
+
+def _corte(fichero, posicion, tamano):
+    """
+    Primera posición >= posicion que queda justo detrás de un espacio ASCII.
+    """
+    if posicion <= 0 or posicion >= tamano:
+        return max(0, min(posicion, tamano))
+    fichero.seek(posicion - 1)
+    while True:
+        bloque = fichero.read(_LECTURA_CORTE)
+        if not bloque:
+            return tamano
+        for i, byte in enumerate(bloque):
+            if byte in ESPACIOS_ASCII:
+                return fichero.tell() - len(bloque) + i + 1
+
+
+def _analizar_tarea(tarea):
+    """
+    Analiza un fichero o un rango de bytes de un fichero.
+
+    Returns:
+        tuple: (índice de la tarea, EstadisticasTexto o None, mensaje de error o None)
+    """
+    try:
+        with open(tarea.ruta, 'rb') as binario:
+            tamano = os.fstat(binario.fileno()).st_size
+            inicio = _corte(binario, tarea.inicio, tamano)
+            fin = tamano if tarea.fin is None else _corte(binario, tarea.fin, tamano)
+            if inicio >= fin:
+                return tarea.indice, VACIAS, None
+            texto = io.TextIOWrapper(io.BufferedReader(_Rango(binario, inicio, fin)),
+                                     encoding='utf-8')
+            palabras, vocales, consonantes, larga = analizar_flujo(texto)
+            return tarea.indice, EstadisticasTexto(palabras, vocales, consonantes,
+                                                   larga, fin - inicio), None
+    except OSError as error:
+        return tarea.indice, None, f"No se pudo leer '{tarea.ruta}': {error.strerror}."
+    except UnicodeDecodeError:
+        return tarea.indice, None, f"'{tarea.ruta}' no es un fichero de texto UTF-8."
+
+
+def recorrer_corpus(rutas, extensiones=('.txt',)):
+    """
+    Lista los ficheros de un corpus, entrando en los directorios.
+
+    Args:
+        rutas (iterable): Ficheros y directorios
+        extensiones (tuple, opcional): Extensiones de los ficheros que se buscan
+            dentro de los directorios (los ficheros indicados se incluyen siempre)
+
+    Returns:
+        list: Rutas de los ficheros, en orden
+    """
+    ficheros = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            encontrados = []
+            for directorio, _, nombres in os.walk(ruta):
+                encontrados.extend(os.path.join(directorio, nombre) for nombre in nombres
+                                   if nombre.lower().endswith(extensiones))
+            ficheros.extend(sorted(encontrados))
+        else:
+            ficheros.append(ruta)
+    return ficheros
+
+
+def _tareas(ficheros, tam_rango):
+    """
+    Reparte los ficheros en tareas: una por fichero o una por rango si es grande.
+    """
+    tareas = []
+    for ruta in ficheros:
+        try:
+            tamano = os.path.getsize(ruta)
+        except OSError:
+            tamano = 0  # El error se informará al intentar leerlo
+        if tamano <= tam_rango:
+            tareas.append(Tarea(len(tareas), ruta, 0, None))
+            continue
+        for inicio in range(0, tamano, tam_rango):
+            fin = inicio + tam_rango
+            tareas.append(Tarea(len(tareas), ruta, inicio, fin if fin < tamano else None))
+    return tareas
+
+
+def analizar_corpus(rutas, procesos=None, tam_rango=TAM_RANGO):
+    """
+    Analiza todos los ficheros de un corpus en paralelo.
+
+    Args:
+        rutas (iterable): Ficheros y directorios del corpus
+        procesos (int, opcional): Número de procesos. Por defecto, uno por núcleo
+        tam_rango (int, opcional): Los ficheros mayores se parten en rangos de
+            este tamaño en bytes
+
+    Returns:
+        tuple: (EstadisticasTexto del corpus, dict ruta -> EstadisticasTexto)
+               Los ficheros que no se pudieron leer no aparecen
+    """
+    procesos = procesos or os.cpu_count() or 1
+    tareas = _tareas(recorrer_corpus(rutas), tam_rango)
+
+    if procesos == 1 or len(tareas) == 1:
+        resultados = map(_analizar_tarea, tareas)
+        pool = None
+    else:
+        usar_fork = 'fork' in multiprocessing.get_all_start_methods()
+        pool = multiprocessing.get_context('fork' if usar_fork else None).Pool(procesos)
+        # Muchos ficheros pequeños: se envían en grupos para no pagar un viaje por fichero
+        grupo = max(1, len(tareas) // (procesos * 16))
+        resultados = pool.imap_unordered(_analizar_tarea, tareas, chunksize=grupo)
+
+    parciales = [None] * len(tareas)
+    errores = set()
+    try:
+        for indice, estadisticas, error in resultados:
+            if error is not None:
+                if tareas[indice].ruta not in errores:
+                    print(f"Error: {error}")
+                errores.add(tareas[indice].ruta)
+            parciales[indice] = estadisticas
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    # Combinamos en el orden original: los rangos de cada fichero y los ficheros entre sí
+    por_fichero = {}
+    total = VACIAS
+    for tarea, estadisticas in zip(tareas, parciales):
+        if tarea.ruta in errores:
+            continue
+        por_fichero[tarea.ruta] = por_fichero.get(tarea.ruta, VACIAS).combinar(estadisticas)
+    for estadisticas in por_fichero.values():
+        total = total.combinar(estadisticas)
+    return total, por_fichero
+
+
+def escribir_json(total, por_fichero, fichero):
+    """
+    Escribe los resultados de un corpus en JSON.
+
+    Args:
+        total (EstadisticasTexto): Totales del corpus
+        por_fichero (dict): Ruta -> EstadisticasTexto
+        fichero (file): Fichero abierto en modo texto
+    """
+    json.dump({
+        'total': total.como_dict(),
+        'ficheros': {ruta: e.como_dict() for ruta, e in por_fichero.items()},
+    }, fichero, indent=2, ensure_ascii=False)
+    fichero.write('\n')
+
+
+def escribir_csv(total, por_fichero, fichero):
+    """
+    Escribe los resultados de un corpus en CSV: una fila por fichero y una
+    última fila con los totales.
+
+    Args:
+        total (EstadisticasTexto): Totales del corpus
+        por_fichero (dict): Ruta -> EstadisticasTexto
+        fichero (file): Fichero abierto en modo texto con newline=''
+    """
+    escritor = csv.writer(fichero)
+    escritor.writerow(('fichero',) + EstadisticasTexto._fields)
+    for ruta, estadisticas in por_fichero.items():
+        escritor.writerow((ruta,) + tuple(estadisticas))
+    escritor.writerow(('TOTAL',) + tuple(total))
+
+
+def main():
+    """Función principal del programa"""
+    parser = argparse.ArgumentParser(description="Analiza en paralelo un corpus de ficheros de texto")
+    parser.add_argument('rutas', nargs='+', help="Ficheros o directorios (se buscan los .txt)")
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--salida', default=None,
+                        help="Fichero .json o .csv donde guardar los resultados")
+    args = parser.parse_args()
+
+    if args.salida is not None and not args.salida.lower().endswith(('.json', '.csv')):
+        print(f"Error: Formato de salida no soportado: '{args.salida}' (use .json o .csv).")
+        return
+
+    total, por_fichero = analizar_corpus(args.rutas, args.procesos)
+
+    if args.salida is None:
+        print(f"Ficheros analizados: {len(por_fichero)}")
+        print(f"Cantidad de palabras: {total.palabras}")
+        print(f"Cantidad de vocales: {total.vocales}")
+        print(f"Cantidad de consonantes: {total.consonantes}")
+        print(f"Palabra más larga: '{total.palabra_mas_larga}' "
+              f"({len(total.palabra_mas_larga)} letras)")
+    elif args.salida.lower().endswith('.json'):
+        with open(args.salida, 'w', encoding='utf-8') as fichero:
+            escribir_json(total, por_fichero, fichero)
+        print(f"Resultados de {len(por_fichero)} fichero(s) guardados en '{args.salida}'.")
+    else:
+        with open(args.salida, 'w', encoding='utf-8', newline='') as fichero:
+            escribir_csv(total, por_fichero, fichero)
+        print(f"Resultados de {len(por_fichero)} fichero(s) guardados en '{args.salida}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,179 @@
+import codecs
+import mmap
+import os
+import re
+import sys
+
+# Caracteres que se leen de cada vez al analizar un fichero
+TAM_BLOQUE = 1 << 20
+
+# Bytes de cada ventana al analizar un fichero proyectado en memoria
+TAM_VENTANA = 1 << 20
+
+# Vocales (incluyendo vocales con acentos en español)
+VOCALES = "aeiouáéíóúü"
+
+# Clases con las que se resume cada carácter del texto (un byte por carácter)
+_VOCAL, _CONSONANTE, _ESPACIO, _OTRO = b'v', b'c', b' ', b'.'
+
+# Carácter Latin-1 de cada clase, para sustituir a los que no caben en Latin-1
+_REPRESENTANTES = {_VOCAL: 'a', _CONSONANTE: 'b', _ESPACIO: ' ', _OTRO: '.'}
+
+def _clase(caracter):
+    """
+    Clase de un carácter tal como lo ve analizar_texto (después de pasarlo a minúsculas).
+    
+    Solo 'İ' cambia de longitud en minúsculas ('i' más un punto que no es
+    letra), así que basta con mirar el primer carácter.
+    """
+    minuscula = caracter.lower()[0]
+    if minuscula in VOCALES:
+        return _VOCAL
+    if minuscula.isalpha():
+        return _CONSONANTE
+    if minuscula.isspace():
+        return _ESPACIO
+    return _OTRO
+
+class _TablaPerezosa(dict):
+    """
+    Tabla para str.translate que calcula la traducción de cada carácter la primera vez.
+    """
+    
+    def __init__(self, traducir):
+        super().__init__()
+        self._traducir = traducir
+    
+    def __missing__(self, codigo):
+        self[codigo] = self._traducir(chr(codigo))
+        return self[codigo]
+
+# Cada carácter pasa al representante de su clase
+_TABLA_REPRESENTANTES = _TablaPerezosa(lambda c: _REPRESENTANTES[_clase(c)])
+# Se borra lo que no es letra ni espacio, como al limpiar las palabras
+_TABLA_LIMPIEZA = _TablaPerezosa(lambda c: None if _clase(c) == _OTRO else c)
+
+def _representar(error):
+    """
+    Manejador de errores de codificación: cambia los caracteres que no caben
+    en Latin-1 por el representante de su clase.
+    """
+    return error.object[error.start:error.end].translate(_TABLA_REPRESENTANTES), error.end
+
+codecs.register_error('analizador_texto.clases', _representar)
+
+_TABLA_LATIN1 = b''.join(_clase(chr(i)) for i in range(256))
+# Vocales, consonantes y otros pasan a 'x': las palabras quedan como tramos de 'x'
+_TABLA_PALABRAS = bytes.maketrans(_VOCAL + _CONSONANTE + _OTRO, b'xxx')
+
+def _clasificar(texto):
+    """
+    Resume un texto en un byte por carácter con su clase.
+    
+    El texto se codifica en Latin-1, que ocupa un byte por carácter, y se
+    clasifica con bytes.translate. Los pocos caracteres que no caben en
+    Latin-1 (€, comillas tipográficas, otros alfabetos...) los cambia el
+    manejador de errores por un carácter Latin-1 de su misma clase.
+    
+    Args:
+        texto (str): El texto a clasificar
+        
+    Returns:
+        bytes: La clase de cada carácter
+    """
+    return texto.encode('latin-1', 'analizador_texto.clases').translate(_TABLA_LATIN1)
+
+def normalizar_palabras(texto):
+    """
+    Divide un texto en palabras normalizadas con las mismas reglas que
+    analizar_texto: en minúsculas, conservando los acentos y sin los
+    caracteres que no son letras. Las palabras que se quedan vacías (por
+    ejemplo, un número o un guion suelto) se descartan.
+    
+    Args:
+        texto (str): El texto a dividir
+        
+    Returns:
+        list: Palabras normalizadas, en orden
+    """
+    return texto.lower().translate(_TABLA_LIMPIEZA).split()
+
+def _tramo_mas_largo(clases, tramos, minimo=0):
+    """
+    Posición de la primera palabra con más letras.
+    
+    Args:
+        clases (bytes): Clase de cada carácter
+        tramos (bytes): Espacio inicial y una 'x' por cada carácter que no es espacio
+        minimo (int, opcional): Solo interesan las palabras con más letras que esto
+        
+    Returns:
+        tuple: (letras, inicio, fin) de la palabra en clases; (0, 0, 0) si no hay
+               ninguna con más de `minimo` letras
+    """
+    bajo = minimo + 1
+    # Sin una palabra de esa longitud (contando lo que no son letras) no hay que buscar más
+    if minimo and b' ' + b'x' * bajo not in tramos:
+        return 0, 0, 0
+    
+    # Sin los caracteres que no son letras cada palabra queda como 'x' * letras
+    letras = clases.translate(_TABLA_PALABRAS, _OTRO)
+    if b'x' * bajo not in letras:
+        return 0, 0, 0
+    
+    # Buscamos el mayor número de letras con una búsqueda exponencial y binaria
+    alto = 2 * bajo
+    while b'x' * alto in letras:
+        bajo, alto = alto, alto * 2
+    while alto - bajo > 1:
+        medio = (bajo + alto) // 2
+        if b'x' * medio in letras:
+            bajo = medio
+        else:
+            alto = medio
+    
+    # Esa palabra tiene al menos `bajo` caracteres: probamos las candidatas en orden
+    patron = b' ' + b'x' * bajo
+    posicion = tramos.find(patron)
+    while True:
+        fin = tramos.find(b' ', posicion + 1)
+        if fin == -1:
+            fin = len(tramos)
+        # En tramos hay un espacio de más al principio
+        inicio, fin = posicion, fin - 1
+        if fin - inicio - clases.count(_OTRO, inicio, fin) == bajo:
+            return bajo, inicio, fin
+        posicion = tramos.find(patron, fin + 1)
+
+def _limpiar_palabra(palabra):
+    """
+    Palabra en minúsculas sin los caracteres que no son letras.
+    """
+    return ''.join(c for c in palabra.lower() if c.isalpha())
+
+def _palabra_mas_larga(texto, clases, tramos):
+    """
+    Primera palabra con más letras, sin los caracteres que no son letras.
+    
+    Args:
+        texto (str): El texto analizado (un carácter por clase)
+        clases (bytes): Clase de cada carácter
+        tramos (bytes): Espacio inicial y una 'x' por cada carácter que no es espacio
+        
+    Returns:
+        str: La palabra en minúsculas
+    """
+    letras, inicio, fin = _tramo_mas_largo(clases, tramos)
+    return _limpiar_palabra(texto[inicio:fin]) if letras else ""
+
 def analizar_texto(texto):
     """
     Analiza un texto proporcionado y devuelve estadísticas sobre el mismo.
     
+    En lugar de recorrer el texto carácter a carácter, se resume con tablas
+    en un byte por carácter (vocal, consonante, espacio u otro) y las
+    cuentas se hacen con bytes.count y búsquedas sobre ese resumen.
+    
     Args:
         texto (str): El texto a analizar
         
@@ -12,39 +184,182 @@ def analizar_texto(texto):
     if not texto:
         return 0, 0, 0, ""
     
-    # Convertimos el texto a minúsculas para facilitar el análisis
-    texto = texto.lower()
+    clases = _clasificar(texto)
     
-    # Dividimos el texto en palabras
-    palabras = texto.split()
-    num_palabras = len(palabras)
+    vocales = clases.count(_VOCAL)
+    consonantes = clases.count(_CONSONANTE)
     
-    # Inicializamos contadores
-    vocales = 0
-    consonantes = 0
+    # Cada palabra empieza con un espacio seguido de algo que no es espacio
+    tramos = b' ' + clases.translate(_TABLA_PALABRAS)
+    num_palabras = tramos.count(b' x')
     
-    # Definimos las vocales (incluyendo vocales con acentos en español)
-    todas_vocales = "aeiouáéíóúü"
+    palabra_mas_larga = _palabra_mas_larga(texto, clases, tramos)
     
-    # Analizamos cada caracter del texto
-    for caracter in texto:
-        # Verificamos si es una letra
-        if caracter.isalpha():
-            if caracter in todas_vocales:
-                vocales += 1
-            else:
-                consonantes += 1
+    return num_palabras, vocales, consonantes, palabra_mas_larga
+
+def leer_bloques(flujo, tam_bloque=TAM_BLOQUE):
+    """
+    Lee un texto por bloques sin partir ninguna palabra.
+    
+    Cada bloque se corta en el último espacio en blanco y lo que queda
+    detrás (el principio de una palabra) se une al bloque siguiente. La
+    memoria usada depende del tamaño del bloque y de la palabra más larga,
+    no del tamaño del texto.
+    
+    Args:
+        flujo (file): Fichero abierto en modo texto (o sys.stdin)
+        tam_bloque (int, opcional): Caracteres que se leen de cada vez
+        
+    Yields:
+        str: Trozos consecutivos del texto que terminan entre dos palabras
+    """
+    pendiente = ""
+    
+    while True:
+        bloque = flujo.read(tam_bloque)
+        if not bloque:
+            if pendiente:
+                yield pendiente
+            return
+        
+        texto = pendiente + bloque
+        # Buscamos el último espacio en blanco para no partir una palabra
+        # (lo pendiente no tiene ninguno, así que basta con mirar el bloque)
+        corte = len(texto)
+        while corte > len(pendiente) and not texto[corte - 1].isspace():
+            corte -= 1
+        if corte == len(pendiente):
+            corte = 0
+        texto, pendiente = texto[:corte], texto[corte:]
+        if texto:
+            yield texto
+
+def analizar_flujo(flujo, tam_bloque=TAM_BLOQUE):
+    """
+    Analiza un texto leyéndolo por bloques, sin tenerlo entero en memoria.
+    
+    Devuelve lo mismo que analizar_texto con el contenido completo: los
+    bloques de leer_bloques no parten ninguna palabra.
+    
+    Args:
+        flujo (file): Fichero abierto en modo texto (o sys.stdin)
+        tam_bloque (int, opcional): Caracteres que se leen de cada vez
+        
+    Returns:
+        tuple: (número de palabras, número de vocales, número de consonantes, palabra más larga)
+    """
+    num_palabras = vocales = consonantes = 0
+    palabra_mas_larga = ""
+    
+    for texto in leer_bloques(flujo, tam_bloque):
+        palabras, v, c, larga = analizar_texto(texto)
+        num_palabras += palabras
+        vocales += v
+        consonantes += c
+        # Solo una más larga estrictamente sustituye a la anterior, como en analizar_texto
+        if len(larga) > len(palabra_mas_larga):
+            palabra_mas_larga = larga
     
-    # Encontramos la palabra más larga
+    return num_palabras, vocales, consonantes, palabra_mas_larga
+
+# Espacios en blanco ASCII: en UTF-8 nunca forman parte de otro carácter
+_ESPACIO_ASCII = re.compile(rb'[ \t\n\r\x0b\x0c\x1c-\x1f]')
+
+def _corte_mapeado(mapa, posicion, tamano):
+    """
+    Primera posición >= posicion que queda justo detrás de un espacio ASCII.
+    """
+    if posicion >= tamano:
+        return tamano
+    espacio = _ESPACIO_ASCII.search(mapa, posicion - 1)
+    return espacio.end() if espacio else tamano
+
+def analizar_mapeado(fichero, tam_ventana=TAM_VENTANA):
+    """
+    Analiza un fichero UTF-8 proyectándolo en memoria en lugar de leerlo.
+    
+    El fichero se recorre por ventanas de bytes que terminan justo detrás
+    de un espacio ASCII, así que no parten ni caracteres ni palabras. Las
+    ventanas que son solo ASCII se clasifican directamente con la tabla de
+    bytes, sin pasar por str (solo se decodifica la palabra más larga
+    cuando supera a las anteriores). Las demás hay que decodificarlas de
+    todos modos para comprobar que son UTF-8 válido, y se clasifican como
+    en analizar_texto. Las páginas ya analizadas se devuelven al sistema,
+    así que la memoria residente depende del tamaño de la ventana y no del
+    fichero.
+    
+    Devuelve lo mismo que analizar_flujo con el fichero abierto en modo texto.
+    
+    Args:
+        fichero (file): Fichero abierto en modo binario (no vale sys.stdin)
+        tam_ventana (int, opcional): Bytes que se analizan de cada vez
+        
+    Returns:
+        tuple: (número de palabras, número de vocales, número de consonantes, palabra más larga)
+        
+    Raises:
+        UnicodeDecodeError: Si el fichero no es UTF-8 válido
+    """
+    num_palabras = vocales = consonantes = 0
     palabra_mas_larga = ""
-    for palabra in palabras:
-        # Limpiamos la palabra de signos de puntuación
-        palabra_limpia = ''.join(c for c in palabra if c.isalpha())
-        if len(palabra_limpia) > len(palabra_mas_larga):
-            palabra_mas_larga = palabra_limpia
+    
+    tamano = os.fstat(fichero.fileno()).st_size
+    if not tamano:
+        return num_palabras, vocales, consonantes, palabra_mas_larga
+    
+    with mmap.mmap(fichero.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        liberar = hasattr(mapa, 'madvise')
+        if liberar:
+            mapa.madvise(mmap.MADV_SEQUENTIAL)
+        inicio = liberado = 0
+        while inicio < tamano:
+            fin = _corte_mapeado(mapa, inicio + tam_ventana, tamano)
+            ventana = mapa[inicio:fin]
+            
+            # Una ventana ASCII se clasifica directamente con la tabla de bytes
+            if ventana.isascii():
+                texto = None
+                clases = ventana.translate(_TABLA_LATIN1)
+            else:
+                texto = ventana.decode('utf-8')
+                clases = _clasificar(texto)
+            vocales += clases.count(_VOCAL)
+            consonantes += clases.count(_CONSONANTE)
+            tramos = b' ' + clases.translate(_TABLA_PALABRAS)
+            num_palabras += tramos.count(b' x')
+            
+            # Solo una más larga estrictamente sustituye a la anterior, como en analizar_texto
+            letras, desde, hasta = _tramo_mas_largo(clases, tramos, len(palabra_mas_larga))
+            if letras:
+                palabra = texto[desde:hasta] if texto else ventana[desde:hasta].decode('ascii')
+                palabra_mas_larga = _limpiar_palabra(palabra)
+            
+            # Las páginas analizadas dejan de contar en la memoria del proceso
+            pagina = fin - fin % mmap.PAGESIZE
+            if liberar and pagina > liberado:
+                mapa.madvise(mmap.MADV_DONTNEED, liberado, pagina - liberado)
+                liberado = pagina
+            inicio = fin
     
     return num_palabras, vocales, consonantes, palabra_mas_larga
 
+def mostrar_resultados(num_palabras, num_vocales, num_consonantes, palabra_mas_larga):
+    """
+    Muestra por pantalla las estadísticas de un análisis.
+    
+    Args:
+        num_palabras (int): Cantidad de palabras
+        num_vocales (int): Cantidad de vocales
+        num_consonantes (int): Cantidad de consonantes
+        palabra_mas_larga (str): Palabra más larga
+    """
+    print("\nRESULTADOS DEL ANÁLISIS:")
+    print("-----------------------")
+    print(f"Cantidad de palabras: {num_palabras}")
+    print(f"Cantidad de vocales: {num_vocales}")
+    print(f"Cantidad de consonantes: {num_consonantes}")
+    print(f"Palabra más larga: '{palabra_mas_larga}' ({len(palabra_mas_larga)} letras)")
+
 def main():
     """Función principal del programa"""
     # Solicitamos al usuario que introduzca un texto
@@ -56,17 +371,48 @@ def main():
         print("No has introducido ningún texto.")
         return
     
-    # Analizamos el texto
-    num_palabras, num_vocales, num_consonantes, palabra_mas_larga = analizar_texto(texto)
+    # Analizamos el texto y mostramos los resultados
+    mostrar_resultados(*analizar_texto(texto))
+
+def main_ficheros(rutas, mapeado=False):
+    """
+    Analiza ficheros de cualquier tamaño leyéndolos por bloques.
     
-    # Mostramos los resultados
-    print("\nRESULTADOS DEL ANÁLISIS:")
-    print("-----------------------")
-    print(f"Cantidad de palabras: {num_palabras}")
-    print(f"Cantidad de vocales: {num_vocales}")
-    print(f"Cantidad de consonantes: {num_consonantes}")
-    print(f"Palabra más larga: '{palabra_mas_larga}' ({len(palabra_mas_larga)} letras)")
+    Uso: python analizador_texto.py [--mapeado] fichero.txt [otro.txt ...]
+    Con '-' como nombre se lee la entrada estándar:
+         cat corpus.txt | python analizador_texto.py -
+    Con --mapeado los ficheros se proyectan en memoria (analizar_mapeado).
+    
+    Args:
+        rutas (list): Rutas de los ficheros a analizar
+        mapeado (bool, opcional): Usar analizar_mapeado en lugar de analizar_flujo
+    """
+    for ruta in rutas:
+        if ruta == '-':
+            print("Entrada estándar:")
+            resultados = analizar_flujo(sys.stdin)
+        else:
+            try:
+                if mapeado:
+                    with open(ruta, 'rb') as fichero:
+                        print(f"Fichero '{ruta}':")
+                        resultados = analizar_mapeado(fichero)
+                else:
+                    with open(ruta, encoding='utf-8') as fichero:
+                        print(f"Fichero '{ruta}':")
+                        resultados = analizar_flujo(fichero)
+            except OSError as error:
+                print(f"Error: No se pudo leer '{ruta}': {error.strerror}.")
+                continue
+            except UnicodeDecodeError:
+                print(f"Error: '{ruta}' no es un fichero de texto UTF-8.")
+                continue
+        mostrar_resultados(*resultados)
 
 # Punto de entrada del programa
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1:
+        rutas = [ruta for ruta in sys.argv[1:] if ruta != '--mapeado']
+        main_ficheros(rutas, mapeado=len(rutas) < len(sys.argv) - 1)
+    else:
+        main()
@@ -0,0 +1,1129 @@
+"""
+Benchmarks de la agenda de contactos.
+
+Cada subcomando mide un aspecto concreto y muestra el resultado en JSON:
+
+    python benchmark_agenda.py carga [--contactos N] [--contactos-lista N]
+    python benchmark_agenda.py busqueda [--contactos N] [--consultas N]
+    python benchmark_agenda.py telefonos [--contactos N] [--consultas N]
+    python benchmark_agenda.py aproximada [--contactos N] [--consultas N]
+    python benchmark_agenda.py importacion [--megas N] [--fichero RUTA] [--solo-lectura]
+    python benchmark_agenda.py persistente [--contactos N] [--consultas N]
+    python benchmark_agenda.py alfabetico [--contactos N] [--consultas N]
+    python benchmark_agenda.py cache [--contactos N] [--consultas N] [--distintas N]
+                                     [--sesgo S] [--escrituras F] [--capacidad N]
+    python benchmark_agenda.py duplicados [--contactos N] [--duplicados N] [--procesos N]
+    python benchmark_agenda.py concurrente [--contactos N] [--hilos 1,2,4,8] [--segundos S]
+                                           [--escrituras N]
+    python benchmark_agenda.py memoria [--contactos N]
+    python benchmark_agenda.py autocompletado [--contactos N] [--consultas N]
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from agenda_concurrente import AgendaConcurrente
+from agenda_contactos import Agenda, Contacto, clave_alfabetica, normalizar_nombre
+from agenda_persistente import AgendaPersistente
+from busqueda_aproximada import distancia_edicion
+from duplicados_agenda import detectar_duplicados
+from intercambio_contactos import InformeImportacion, escribir_vcard, leer_vcard
+
+NOMBRES = ["Ana", "Luis", "María", "José", "Lucía", "Álvaro", "Sofía", "Íñigo",
+           "Carmen", "Javier", "Elena", "Raúl", "Marta", "Óscar", "Nuria", "Pablo"]
+APELLIDOS = ["García", "Pérez", "Sánchez", "López", "Martínez", "Gómez", "Núñez",
+             "Fernández", "Rodríguez", "Muñoz", "Díaz", "Álvarez", "Romero", "Peña"]
+DOMINIOS = ["example.com", "correo.es", "empresa.org", "mail.com"]
+
+
+@contextlib.contextmanager
+def silenciar_salida():
+    """
+    Redirige la salida estándar a /dev/null (la agenda imprime un mensaje por operación).
+    """
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        yield
+
+
+def generar_contactos(cantidad, semilla=0):
+    """
+    Genera contactos sintéticos con nombres únicos.
+
+    Args:
+        cantidad (int): Número de contactos
+        semilla (int, opcional): Semilla del generador aleatorio
+
+    Yields:
+        Contacto: Contactos con nombre, teléfono y email
+    """
+    rng = random.Random(semilla)
+    for i in range(cantidad):
+        nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)} {i}"
+        telefono = f"6{rng.randrange(10 ** 8):08d}"
+        usuario = nombre.split()[0].lower()
+        email = f"{usuario}{i}@{rng.choice(DOMINIOS)}"
+        yield Contacto(nombre, telefono, email)
+
+
+class _AgendaLista:
+    """
+    Réplica de la agenda anterior: lista de contactos y búsqueda lineal.
+    """
+
+    def __init__(self):
+        self.contactos = []
+
+    def buscar_contacto(self, nombre):
+        for contacto in self.contactos:
+            if contacto.nombre.lower() == nombre.lower():
+                return contacto
+        return None
+
+    def agregar_contacto(self, contacto):
+        if self.buscar_contacto(contacto.nombre) is not None:
+            return False
+        self.contactos.append(contacto)
+        return True
+
+
+def _cargar(agenda, contactos):
+    """
+    Agrega los contactos a la agenda y devuelve los segundos empleados.
+    """
+    with silenciar_salida():
+        inicio = time.perf_counter()
+        for contacto in contactos:
+            agenda.agregar_contacto(contacto)
+        return time.perf_counter() - inicio
+
+
+def bench_carga(contactos, contactos_lista):
+    """
+    Mide la carga de contactos y las búsquedas por nombre.
+
+    Args:
+        contactos (int): Contactos a cargar en la agenda indexada
+        contactos_lista (int): Contactos a cargar en la réplica con lista (cuadrática)
+
+    Returns:
+        dict: Tiempos de carga y de búsqueda
+    """
+    lista = list(generar_contactos(contactos_lista))
+    segundos_lista = _cargar(_AgendaLista(), lista)
+    segundos_indice_pequena = _cargar(Agenda(), lista)
+
+    agenda = Agenda()
+    todos = list(generar_contactos(contactos))
+    segundos_indice = _cargar(agenda, todos)
+
+    muestra = [c.nombre.upper() for c in random.Random(1).sample(todos, min(100_000, contactos))]
+    inicio = time.perf_counter()
+    for nombre in muestra:
+        agenda.buscar_contacto(nombre)
+    segundos_busqueda = time.perf_counter() - inicio
+
+    return {
+        'contactos_lista': contactos_lista,
+        'segundos_carga_lista': round(segundos_lista, 3),
+        'segundos_carga_indice_mismo_tamano': round(segundos_indice_pequena, 3),
+        'contactos': contactos,
+        'segundos_carga_indice': round(segundos_indice, 3),
+        'contactos_por_segundo': round(contactos / segundos_indice),
+        'us_por_busqueda': round(segundos_busqueda / len(muestra) * 1e6, 3),
+    }
+
+
+def _buscar_lineal(agenda, termino):
+    """
+    Búsqueda por término de referencia: recorre todos los contactos.
+    """
+    termino = termino.lower()
+    return [c for c in agenda.contactos
+            if (termino in c.nombre.lower() or
+                termino in c.telefono.lower() or
+                termino in c.email.lower())]
+
+
+def _consultas_aleatorias(contactos, consultas, semilla=2):
+    """
+    Genera subcadenas de 4 a 8 caracteres de campos de contactos al azar.
+    """
+    rng = random.Random(semilla)
+    resultado = []
+    for _ in range(consultas):
+        contacto = rng.choice(contactos)
+        campo = rng.choice([contacto.nombre, contacto.telefono, contacto.email])
+        largo = rng.randint(4, 8)
+        inicio = rng.randrange(max(1, len(campo) - largo))
+        resultado.append(campo[inicio:inicio + largo])
+    return resultado
+
+
+def bench_busqueda(contactos, consultas):
+    """
+    Compara buscar_por_termino con índice de trigramas frente al recorrido lineal.
+
+    Los términos son subcadenas de contactos existentes; los que aparecen en
+    muchos contactos (como "ía ") devuelven miles de resultados, por eso se
+    informa también de la mediana.
+
+    Args:
+        contactos (int): Contactos de la agenda
+        consultas (int): Consultas a lanzar
+
+    Returns:
+        dict: Tiempo medio por consulta de cada método
+    """
+    agenda = Agenda()
+    todos = list(generar_contactos(contactos))
+    _cargar(agenda, todos)
+    terminos = _consultas_aleatorias(todos, consultas)
+
+    resultados_indice = []
+    latencias = []
+    for termino in terminos:
+        t0 = time.perf_counter()
+        resultados_indice.append(agenda.buscar_por_termino(termino))
+        latencias.append(time.perf_counter() - t0)
+    segundos_indice = sum(latencias)
+    latencias.sort()
+
+    # La búsqueda lineal es lenta: basta con una muestra para estimar su coste
+    muestra = terminos[:max(1, min(consultas, 20))]
+    inicio = time.perf_counter()
+    resultados_lineal = [_buscar_lineal(agenda, t) for t in muestra]
+    segundos_lineal = time.perf_counter() - inicio
+
+    iguales = all(a == b for a, b in zip(resultados_indice, resultados_lineal))
+    ms_indice = segundos_indice / len(terminos) * 1000
+    ms_lineal = segundos_lineal / len(muestra) * 1000
+
+    return {
+        'contactos': contactos,
+        'consultas': consultas,
+        'resultados_identicos': iguales,
+        'ms_por_consulta_indice': round(ms_indice, 4),
+        'ms_mediana_indice': round(latencias[len(latencias) // 2] * 1000, 4),
+        'resultados_medios': round(sum(map(len, resultados_indice)) / len(terminos), 1),
+        'ms_por_consulta_lineal': round(ms_lineal, 3),
+        'aceleracion': round(ms_lineal / ms_indice, 1),
+        'trigramas_indexados': len(agenda._trigramas),
+    }
+
+
+def bench_telefonos(contactos, consultas):
+    """
+    Mide la identificación de llamadas y la enumeración por prefijo de teléfono.
+
+    Las llamadas entrantes llegan con formatos distintos ('+34 6..', '0034 6..'
+    o con espacios) y la mitad son números que no están en la agenda.
+
+    Args:
+        contactos (int): Contactos de la agenda
+        consultas (int): Llamadas a identificar
+
+    Returns:
+        dict: Latencias de búsqueda exacta y por prefijo frente al recorrido lineal
+    """
+    agenda = Agenda()
+    todos = list(generar_contactos(contactos))
+    _cargar(agenda, todos)
+
+    rng = random.Random(3)
+    formatos = ["+34 {}", "0034{}", "{} ", "{}"]
+    llamadas = []
+    for _ in range(consultas):
+        if rng.random() < 0.5:
+            numero = rng.choice(todos).telefono
+        else:
+            numero = f"7{rng.randrange(10 ** 8):08d}"
+        numero = f"{numero[:3]} {numero[3:6]} {numero[6:]}"
+        llamadas.append(rng.choice(formatos).format(numero))
+
+    latencias = []
+    identificadas = 0
+    for llamada in llamadas:
+        t0 = time.perf_counter()
+        encontrados = agenda.buscar_por_telefono(llamada)
+        latencias.append(time.perf_counter() - t0)
+        identificadas += bool(encontrados)
+    latencias.sort()
+
+    # Prefijos de 5 dígitos: cada uno abarca de media contactos / 10 000 números
+    prefijos = [rng.choice(todos).telefono[:5] for _ in range(min(consultas, 1000))]
+    inicio = time.perf_counter()
+    primeros = [next(agenda.contactos_con_prefijo(p), None) for p in prefijos]
+    segundos_primero = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    enumerados = sum(sum(1 for _ in agenda.contactos_con_prefijo(p)) for p in prefijos)
+    segundos_prefijo = time.perf_counter() - inicio
+
+    # Referencia: recorrer todos los contactos comparando el teléfono sin espacios
+    muestra = llamadas[:max(1, min(consultas, 20))]
+    inicio = time.perf_counter()
+    for llamada in muestra:
+        digitos = llamada.replace(' ', '')[-9:]
+        [c for c in agenda.contactos if c.telefono == digitos]
+    segundos_lineal = time.perf_counter() - inicio
+
+    us_exacta = sum(latencias) / len(latencias) * 1e6
+    us_lineal = segundos_lineal / len(muestra) * 1e6
+    return {
+        'contactos': contactos,
+        'consultas': consultas,
+        'llamadas_identificadas': identificadas,
+        'us_por_llamada': round(us_exacta, 3),
+        'us_p99_llamada': round(latencias[int(len(latencias) * 0.99)] * 1e6, 3),
+        'us_primer_resultado_prefijo': round(segundos_primero / len(prefijos) * 1e6, 3),
+        'prefijos_con_resultado': sum(p is not None for p in primeros),
+        'contactos_por_prefijo': round(enumerados / len(prefijos), 1),
+        'us_por_prefijo_completo': round(segundos_prefijo / len(prefijos) * 1e6, 3),
+        'us_por_llamada_lineal': round(us_lineal, 1),
+        'aceleracion': round(us_lineal / us_exacta, 1),
+    }
+
+
+def _con_erratas(nombre, rng):
+    """
+    Quita los acentos de un nombre y le introduce una o dos erratas.
+    """
+    letras = list(normalizar_nombre(nombre))
+    for _ in range(rng.randint(1, 2)):
+        i = rng.randrange(len(letras))
+        errata = rng.choice(('sustituir', 'borrar', 'insertar'))
+        if errata == 'sustituir':
+            letras[i] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+        elif errata == 'borrar' and len(letras) > 1:
+            del letras[i]
+        else:
+            letras.insert(i, rng.choice('abcdefghijklmnopqrstuvwxyz'))
+    return ''.join(letras)
+
+
+def _buscar_aproximado_lineal(agenda, nombre, max_distancia, k):
+    """
+    Búsqueda aproximada de referencia: calcula la distancia con todos los contactos.
+    """
+    consulta = normalizar_nombre(nombre).split()
+    encontrados = []
+    for orden, contacto in enumerate(agenda.contactos):
+        palabras = normalizar_nombre(contacto.nombre).split()
+        total = 0
+        for buscada in consulta:
+            total += min((0 if buscada == p else max_distancia + 1)
+                         if buscada.isdigit() or p.isdigit()
+                         else distancia_edicion(buscada, p, max_distancia)
+                         for p in palabras)
+            if total > max_distancia:
+                break
+        if total <= max_distancia:
+            encontrados.append((total, orden, contacto))
+    encontrados.sort(key=lambda e: e[:2])
+    return [(contacto, total) for total, _, contacto in encontrados[:k]]
+
+
+def bench_aproximada(contactos, consultas, max_distancia=2, k=5):
+    """
+    Compara buscar_aproximado con el cálculo de la distancia contra toda la agenda.
+
+    Las consultas son el nombre y un apellido de contactos existentes, sin
+    acentos y con una o dos erratas.
+
+    Args:
+        contactos (int): Contactos de la agenda
+        consultas (int): Consultas a lanzar
+        max_distancia (int, opcional): Distancia máxima de la búsqueda
+        k (int, opcional): Resultados por consulta
+
+    Returns:
+        dict: Latencias de la búsqueda con índice y de la lineal
+    """
+    agenda = Agenda()
+    todos = list(generar_contactos(contactos))
+    _cargar(agenda, todos)
+
+    rng = random.Random(4)
+    nombres = [_con_erratas(' '.join(rng.choice(todos).nombre.split()[:2]), rng)
+               for _ in range(consultas)]
+
+    latencias = []
+    resultados_indice = []
+    for nombre in nombres:
+        t0 = time.perf_counter()
+        resultados_indice.append(agenda.buscar_aproximado(nombre, max_distancia, k))
+        latencias.append(time.perf_counter() - t0)
+    latencias.sort()
+
+    muestra = nombres[:max(1, min(consultas, 5))]
+    inicio = time.perf_counter()
+    resultados_lineal = [_buscar_aproximado_lineal(agenda, n, max_distancia, k) for n in muestra]
+    segundos_lineal = time.perf_counter() - inicio
+
+    ms_indice = sum(latencias) / len(latencias) * 1000
+    ms_lineal = segundos_lineal / len(muestra) * 1000
+    return {
+        'contactos': contactos,
+        'consultas': consultas,
+        'max_distancia': max_distancia,
+        'k': k,
+        'resultados_identicos': all(a == b for a, b in zip(resultados_indice, resultados_lineal)),
+        'consultas_con_resultado': sum(bool(r) for r in resultados_indice),
+        'palabras_en_vocabulario': len(agenda._vocabulario),
+        'ms_por_consulta': round(ms_indice, 4),
+        'ms_p99': round(latencias[int(len(latencias) * 0.99)] * 1000, 4),
+        'ms_por_consulta_lineal': round(ms_lineal, 1),
+        'aceleracion': round(ms_lineal / ms_indice, 1),
+    }
+
+
+def _memoria_maxima_mb():
+    """
+    Pico de memoria residente del proceso en MB (ru_maxrss está en KB en Linux).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _generar_vcard(ruta, megas):
+    """
+    Escribe contactos sintéticos en vCard hasta alcanzar el tamaño pedido.
+
+    Returns:
+        int: Contactos escritos
+    """
+    objetivo = megas * 1024 * 1024
+    escritos = 0
+    contactos = generar_contactos(10 ** 12)
+    with open(ruta, 'w', encoding='utf-8', newline='') as fichero:
+        while fichero.tell() < objetivo:
+            escritos += escribir_vcard(itertools.islice(contactos, 10_000), fichero)
+    return escritos
+
+
+def bench_importacion(megas, fichero=None, solo_lectura=False):
+    """
+    Mide la lectura en streaming y la importación de un fichero vCard grande.
+
+    Primero se recorre el fichero solo leyendo (la memoria no debe crecer con
+    el tamaño del fichero) y después se importa a una agenda, que construye
+    sus índices al final.
+
+    Args:
+        megas (int): Tamaño del fichero a generar en MB
+        fichero (str, opcional): Fichero vCard existente; si se indica no se genera
+        solo_lectura (bool, opcional): No importar a la agenda (para ficheros
+            que no caben en memoria una vez indexados)
+
+    Returns:
+        dict: Velocidades de lectura e importación y picos de memoria
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        if fichero is None:
+            fichero = os.path.join(directorio, 'contactos.vcf')
+            inicio = time.perf_counter()
+            generados = _generar_vcard(fichero, megas)
+            segundos_generacion = time.perf_counter() - inicio
+        else:
+            generados = None
+            segundos_generacion = None
+        tamano_mb = os.path.getsize(fichero) / (1024 * 1024)
+
+        memoria_inicial = _memoria_maxima_mb()
+        informe = InformeImportacion(fichero)
+        inicio = time.perf_counter()
+        with open(fichero, encoding='utf-8-sig', newline='') as f:
+            leidos = sum(1 for _ in leer_vcard(f, informe))
+        segundos_lectura = time.perf_counter() - inicio
+        memoria_lectura = _memoria_maxima_mb()
+
+        resultado = {
+            'fichero_mb': round(tamano_mb, 1),
+            'contactos_generados': generados,
+            'segundos_generacion': None if generados is None else round(segundos_generacion, 2),
+            'contactos_leidos': leidos,
+            'rechazados': informe.rechazados,
+            'segundos_lectura': round(segundos_lectura, 2),
+            'mb_por_segundo_lectura': round(tamano_mb / segundos_lectura, 1),
+            'memoria_maxima_mb_antes': round(memoria_inicial, 1),
+            'memoria_maxima_mb_tras_lectura': round(memoria_lectura, 1),
+        }
+        if solo_lectura:
+            return resultado
+
+        agenda = Agenda()
+        informe = InformeImportacion(fichero)
+        inicio = time.perf_counter()
+        with open(fichero, encoding='utf-8-sig', newline='') as f, silenciar_salida():
+            agenda.importar(leer_vcard(f, informe), informe)
+        segundos_importacion = time.perf_counter() - inicio
+
+    resultado.update({
+        'contactos_agregados': informe.agregados,
+        'duplicados': informe.duplicados,
+        'segundos_importacion': round(segundos_importacion, 2),
+        'contactos_por_segundo_importacion': round(informe.agregados / segundos_importacion),
+        'mb_por_segundo_importacion': round(tamano_mb / segundos_importacion, 1),
+        'memoria_maxima_mb_tras_importacion': round(_memoria_maxima_mb(), 1),
+    })
+    return resultado
+
+
+def _latencias_us(funcion, argumentos):
+    """
+    Tiempo medio y mediana en microsegundos de llamar a funcion con cada argumento.
+    """
+    latencias = []
+    for argumento in argumentos:
+        t0 = time.perf_counter()
+        funcion(argumento)
+        latencias.append(time.perf_counter() - t0)
+    latencias.sort()
+    return {'media': round(sum(latencias) / len(latencias) * 1e6, 1),
+            'mediana': round(latencias[len(latencias) // 2] * 1e6, 1)}
+
+
+def bench_persistente(contactos, consultas):
+    """
+    Mide la agenda en SQLite: carga, apertura, búsquedas y escrituras por lotes.
+
+    Args:
+        contactos (int): Contactos de la agenda
+        consultas (int): Búsquedas y actualizaciones de cada tipo
+
+    Returns:
+        dict: Tiempos de cada operación
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'agenda.db')
+        inicio = time.perf_counter()
+        with AgendaPersistente(ruta) as agenda, silenciar_salida():
+            agenda.importar(generar_contactos(contactos))
+        segundos_carga = time.perf_counter() - inicio
+        tamano_mb = sum(os.path.getsize(os.path.join(directorio, f))
+                        for f in os.listdir(directorio)) / (1024 * 1024)
+
+        inicio = time.perf_counter()
+        agenda = AgendaPersistente(ruta)
+        ms_apertura = (time.perf_counter() - inicio) * 1000
+        inicio = time.perf_counter()
+        agenda.buscar_contacto("Ana García López 0")
+        ms_primera_busqueda = (time.perf_counter() - inicio) * 1000
+        memoria_mb = _memoria_maxima_mb()
+
+        # Nombres, teléfonos y términos de contactos al azar, sin cargar la agenda
+        rng = random.Random(5)
+        muestra = [agenda._conexion.execute(
+            "SELECT nombre, telefono, email FROM contactos WHERE id = ?",
+            (rng.randrange(1, contactos + 1),)).fetchone() for _ in range(consultas)]
+        nombres = [nombre.upper() for nombre, _, _ in muestra]
+        telefonos = [f"+34 {telefono}" for _, telefono, _ in muestra]
+        terminos = [email[:6] for _, _, email in muestra[:max(1, consultas // 10)]]
+
+        resultado = {
+            'contactos': contactos,
+            'segundos_carga': round(segundos_carga, 2),
+            'fichero_mb': round(tamano_mb, 1),
+            'ms_apertura': round(ms_apertura, 2),
+            'ms_primera_busqueda': round(ms_primera_busqueda, 2),
+            'memoria_maxima_mb': round(memoria_mb, 1),
+            'us_busqueda_nombre': _latencias_us(agenda.buscar_contacto, nombres),
+            'us_busqueda_telefono': _latencias_us(agenda.buscar_por_telefono, telefonos),
+            'us_busqueda_termino': _latencias_us(agenda.buscar_por_termino, terminos),
+        }
+
+        # Escrituras: una transacción por cada una frente a lotes de tam_lote
+        for tam_lote in (1, agenda.tam_lote):
+            agenda.tam_lote = tam_lote
+            contactos_muestra = [agenda.buscar_contacto(n) for n in nombres]
+            inicio = time.perf_counter()
+            for i, contacto in enumerate(contactos_muestra):
+                contacto.actualizar(email=f"cambio{tam_lote}_{i}@example.com")
+            agenda.confirmar()
+            segundos = time.perf_counter() - inicio
+            resultado[f'actualizaciones_por_segundo_lote_{tam_lote}'] = round(len(nombres) / segundos)
+        agenda.cerrar()
+
+    return resultado
+
+
+def bench_alfabetico(contactos, consultas, tam_pagina=20):
+    """
+    Compara el índice alfabético con ordenar la agenda en cada consulta.
+
+    Args:
+        contactos (int): Contactos de la agenda
+        consultas (int): Páginas y rangos a pedir
+        tam_pagina (int, opcional): Contactos por página
+
+    Returns:
+        dict: Latencias de saltar a un prefijo, pasar página y consultar un rango
+    """
+    agenda = Agenda()
+    todos = list(generar_contactos(contactos))
+    segundos_carga = _cargar(agenda, todos)
+
+    rng = random.Random(6)
+    prefijos = [rng.choice(todos).nombre[:rng.randint(1, 4)] for _ in range(consultas)]
+
+    inicio = time.perf_counter()
+    for prefijo in prefijos:
+        agenda.paginador(prefijo, tam_pagina).siguiente()
+    us_salto = (time.perf_counter() - inicio) / consultas * 1e6
+
+    paginador = agenda.paginador(tam_pagina=tam_pagina)
+    inicio = time.perf_counter()
+    for _ in range(consultas):
+        paginador.siguiente()
+    for _ in range(consultas):
+        paginador.anterior()
+    us_pagina = (time.perf_counter() - inicio) / (2 * consultas) * 1e6
+
+    # Rango "de Ma a Me": solo se cuentan los contactos, sin ordenarlos
+    inicio = time.perf_counter()
+    en_rango = sum(1 for _ in agenda.recorrer_alfabetico('Ma', 'Me'))
+    ms_rango = (time.perf_counter() - inicio) * 1000
+
+    # Referencia: ordenar toda la agenda para mostrar una página
+    muestra = prefijos[:max(1, min(consultas, 5))]
+    inicio = time.perf_counter()
+    for prefijo in muestra:
+        ordenados = sorted(agenda.contactos, key=lambda c: clave_alfabetica(c.nombre))
+        clave = clave_alfabetica(prefijo)
+        next((i for i, c in enumerate(ordenados) if clave_alfabetica(c.nombre) >= clave), None)
+    ms_ordenar = (time.perf_counter() - inicio) / len(muestra) * 1000
+
+    return {
+        'contactos': contactos,
+        'tam_pagina': tam_pagina,
+        'segundos_carga': round(segundos_carga, 2),
+        'us_saltar_a_prefijo': round(us_salto, 1),
+        'us_pasar_pagina': round(us_pagina, 1),
+        'contactos_de_ma_a_me': en_rango,
+        'ms_rango_ma_me': round(ms_rango, 1),
+        'ms_ordenar_para_cada_pagina': round(ms_ordenar, 1),
+        'aceleracion_salto': round(ms_ordenar * 1000 / us_salto, 1),
+    }
+
+
+def _registro_consultas(todos, consultas, distintas, sesgo, escrituras, semilla=8):
+    """
+    Genera un registro de consultas sesgado, como el de un CRM.
+
+    Las consultas se eligen entre `distintas` búsquedas posibles con una
+    distribución de Zipf de exponente `sesgo`; una fracción `escrituras` de
+    las operaciones actualiza el teléfono de un contacto al azar.
+
+    Returns:
+        list: Tuplas ('termino' | 'nombre' | 'actualizar', argumento)
+    """
+    rng = random.Random(semilla)
+    terminos = _consultas_aleatorias(todos, distintas // 2, semilla)
+    nombres = [c.nombre.lower() for c in rng.sample(todos, distintas - len(terminos))]
+    posibles = [('termino', t) for t in terminos] + [('nombre', n) for n in nombres]
+    rng.shuffle(posibles)
+
+    pesos = [1.0 / (rango ** sesgo) for rango in range(1, len(posibles) + 1)]
+    acumulados = list(itertools.accumulate(pesos))
+    registro = []
+    for consulta in rng.choices(posibles, cum_weights=acumulados, k=consultas):
+        if rng.random() < escrituras:
+            registro.append(('actualizar', rng.choice(todos).nombre))
+        registro.append(consulta)
+    return registro
+
+
+def _reproducir(agenda, registro):
+    """
+    Ejecuta un registro de consultas y devuelve los segundos empleados.
+    """
+    rng = random.Random(9)
+    inicio = time.perf_counter()
+    for tipo, argumento in registro:
+        if tipo == 'termino':
+            agenda.buscar_por_termino(argumento)
+        elif tipo == 'nombre':
+            agenda.buscar_contacto(argumento)
+        else:
+            contacto = agenda._por_id[agenda._por_nombre[normalizar_nombre(argumento)]]
+            contacto.actualizar(telefono=f"6{rng.randrange(10 ** 8):08d}")
+    return time.perf_counter() - inicio
+
+
+def bench_cache(contactos, consultas, distintas, sesgo, escrituras, capacidad):
+    """
+    Reproduce un registro de consultas sesgado con y sin caché de resultados.
+
+    Args:
+        contactos (int): Contactos de la agenda
+        consultas (int): Consultas del registro
+        distintas (int): Búsquedas distintas posibles
+        sesgo (float): Exponente de Zipf de la popularidad de las búsquedas
+        escrituras (float): Fracción de actualizaciones intercaladas
+        capacidad (int): Capacidad de la caché
+
+    Returns:
+        dict: Tiempos con y sin caché y contadores de la caché
+    """
+    todos = list(generar_contactos(contactos))
+    registro = _registro_consultas(todos, consultas, distintas, sesgo, escrituras)
+
+    resultado = {
+        'contactos': contactos,
+        'consultas': consultas,
+        'distintas': distintas,
+        'sesgo': sesgo,
+        'escrituras': escrituras,
+    }
+    for nombre, capacidad_cache in (('sin_cache', 0), ('con_cache', capacidad)):
+        agenda = Agenda(capacidad_cache=capacidad_cache)
+        # Contactos nuevos para que las actualizaciones de una pasada no afecten a la otra
+        _cargar(agenda, (Contacto(c.nombre, c.telefono, c.email) for c in todos))
+        segundos = _reproducir(agenda, registro)
+        resultado[f'us_por_consulta_{nombre}'] = round(segundos / len(registro) * 1e6, 1)
+    resultado['aceleracion'] = round(resultado['us_por_consulta_sin_cache'] /
+                                     resultado['us_por_consulta_con_cache'], 1)
+    resultado['cache'] = agenda.cache_consultas.estadisticas()
+    return resultado
+
+
+def _duplicado(contacto, rng):
+    """
+    Crea otra versión del mismo contacto: el nombre con erratas y, según el
+    caso, el mismo teléfono escrito de otra forma, el mismo email en
+    mayúsculas o ambos.
+    """
+    nombre = _con_erratas(contacto.nombre, rng)
+    caso = rng.randrange(3)
+    telefono = f"6{rng.randrange(10 ** 8):08d}"
+    email = ""
+    if caso != 1:
+        telefono = f"+34 {contacto.telefono[:3]} {contacto.telefono[3:6]} {contacto.telefono[6:]}"
+    if caso != 0:
+        email = contacto.email.upper()
+    return Contacto(nombre, telefono, email)
+
+
+def bench_duplicados(contactos, duplicados, procesos):
+    """
+    Detecta duplicados inyectados en una agenda con uno y con varios procesos.
+
+    Args:
+        contactos (int): Contactos originales
+        duplicados (int): Duplicados con erratas que se añaden
+        procesos (int): Procesos de la ejecución en paralelo
+
+    Returns:
+        dict: Tiempos, pares comparados frente a los posibles, precisión y exhaustividad
+    """
+    rng = random.Random(10)
+    agenda = Agenda(capacidad_cache=0)
+    todos = list(generar_contactos(contactos))
+    _cargar(agenda, todos)
+
+    esperados = set()
+    with silenciar_salida():
+        for original in rng.sample(todos, duplicados):
+            copia = _duplicado(original, rng)
+            if agenda.agregar_contacto(copia):
+                esperados.add((original.nombre, copia.nombre))
+
+    resultado = {
+        'contactos': len(agenda),
+        'duplicados_inyectados': len(esperados),
+        'procesos': procesos,
+    }
+    for nombre, n in (('un_proceso', 1), ('en_paralelo', procesos)):
+        inicio = time.perf_counter()
+        plan = detectar_duplicados(agenda, procesos=n)
+        resultado[f'segundos_{nombre}'] = round(time.perf_counter() - inicio, 2)
+
+    encontrados = {(f.conservar, eliminado) for f in plan for eliminado in f.eliminar}
+    aciertos = len(encontrados & esperados)
+    resultado.update({
+        'aceleracion': round(resultado['segundos_un_proceso'] / resultado['segundos_en_paralelo'], 2),
+        'pares_comparados': plan.pares_evaluados,
+        'pares_posibles': len(agenda) * (len(agenda) - 1) // 2,
+        'bloques': plan.bloques,
+        'bloques_descartados': plan.bloques_descartados,
+        'fusiones': len(plan),
+        'precision': round(aciertos / len(encontrados), 4) if encontrados else 0.0,
+        'exhaustividad': round(aciertos / len(esperados), 4) if esperados else 0.0,
+    })
+    return resultado
+
+
+class _AgendaConCerrojo:
+    """
+    Alternativa sencilla a AgendaConcurrente: una Agenda protegida por un cerrojo.
+    """
+
+    def __init__(self, contactos):
+        self.agenda = Agenda(capacidad_cache=0)
+        self.cerrojo = threading.Lock()
+        _cargar(self.agenda, contactos)
+
+    def buscar_contacto(self, nombre):
+        with self.cerrojo:
+            return self.agenda.buscar_contacto(nombre)
+
+    def buscar_por_telefono(self, telefono):
+        with self.cerrojo:
+            return self.agenda.buscar_por_telefono(telefono)
+
+    def actualizar_contacto(self, nombre, telefono):
+        with self.cerrojo:
+            self.agenda._por_id[self.agenda._por_nombre[normalizar_nombre(nombre)]].actualizar(
+                telefono=telefono)
+
+
+def _carga_mixta(agenda, hilos, segundos, nombres, telefonos, escrituras):
+    """
+    Lanza `hilos` lectores y un escritor sobre la agenda durante `segundos`.
+
+    Cada lector alterna búsquedas por nombre y por teléfono; el escritor
+    cambia teléfonos a razón de `escrituras` por segundo.
+
+    Returns:
+        tuple: (lecturas por segundo, escrituras por segundo)
+    """
+    parar = threading.Event()
+    lecturas = [0] * hilos
+    hechas = [0]
+
+    def lector(n):
+        rng = random.Random(n)
+        cuenta = 0
+        while not parar.is_set():
+            for _ in range(100):
+                agenda.buscar_contacto(rng.choice(nombres))
+                agenda.buscar_por_telefono(rng.choice(telefonos))
+            cuenta += 200
+        lecturas[n] = cuenta
+
+    def escritor():
+        rng = random.Random(-1)
+        inicio = time.perf_counter()
+        while not parar.is_set():
+            # Ráfagas de 100 cambios, esperando lo necesario para mantener el ritmo
+            for _ in range(100):
+                agenda.actualizar_contacto(rng.choice(nombres), f"6{rng.randrange(10 ** 8):08d}")
+            hechas[0] += 100
+            espera = hechas[0] / escrituras - (time.perf_counter() - inicio)
+            if espera > 0:
+                parar.wait(espera)
+
+    trabajadores = [threading.Thread(target=lector, args=(n,)) for n in range(hilos)]
+    if escrituras:
+        trabajadores.append(threading.Thread(target=escritor))
+    inicio = time.perf_counter()
+    for hilo in trabajadores:
+        hilo.start()
+    time.sleep(segundos)
+    parar.set()
+    for hilo in trabajadores:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+    return sum(lecturas) / transcurrido, hechas[0] / transcurrido
+
+
+def bench_concurrente(contactos, hilos, segundos, escrituras):
+    """
+    Compara lecturas en paralelo con escrituras continuas en AgendaConcurrente
+    y en una Agenda protegida por un cerrojo.
+
+    Args:
+        contactos (int): Contactos de la agenda
+        hilos (list): Números de hilos lectores a probar
+        segundos (float): Duración de cada prueba
+        escrituras (int): Actualizaciones por segundo del escritor (0 = sin escritor)
+
+    Returns:
+        dict: Lecturas y escrituras por segundo de cada agenda y número de hilos
+    """
+    todos = list(generar_contactos(contactos))
+    rng = random.Random(11)
+    muestra = rng.sample(todos, min(10_000, contactos))
+    nombres = [c.nombre for c in muestra]
+    telefonos = [c.telefono for c in muestra]
+
+    resultado = {
+        'contactos': contactos,
+        'segundos_por_prueba': segundos,
+        'escrituras_objetivo_por_segundo': escrituras,
+    }
+    agendas = {
+        'concurrente': AgendaConcurrente(todos),
+        'con_cerrojo': _AgendaConCerrojo(todos),
+    }
+    with silenciar_salida():
+        for nombre, agenda in agendas.items():
+            for n in hilos:
+                lecturas, hechas = _carga_mixta(agenda, n, segundos, nombres, telefonos, escrituras)
+                resultado[f'{nombre}_{n}_hilos'] = {
+                    'lecturas_por_segundo': round(lecturas),
+                    'escrituras_por_segundo': round(hechas),
+                }
+    resultado['publicaciones_concurrente'] = agendas['concurrente'].publicaciones
+    return resultado
+
+
+class _ContactoConDict:
+    """
+    Réplica de la representación anterior de Contacto (con __dict__ y los
+    tres campos como cadenas completas).
+    """
+
+    def __init__(self, nombre, telefono, email=""):
+        self.nombre = nombre
+        self.telefono = telefono
+        self.email = email
+        self._agendas = ()
+
+
+def _bytes_por_contacto(clase, contactos):
+    """
+    Crea `contactos` contactos de la clase dada y mide la memoria que ocupan.
+    """
+    rng = random.Random(12)
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    # Las cadenas se crean aquí, como al leerlas de un fichero, y las
+    # que el contacto no conserva se liberan antes de medir
+    lista = []
+    for i in range(contactos):
+        nombre = f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {i}"
+        lista.append(clase(nombre, f"6{rng.randrange(10 ** 8):08d}",
+                           f"{nombre.split()[0].lower()}{i}@{rng.choice(DOMINIOS)}"))
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del lista
+    return (despues - antes) / contactos
+
+
+def bench_memoria(contactos):
+    """
+    Compara los bytes por contacto antes y después del Contacto compacto.
+
+    Args:
+        contactos (int): Número de contactos a crear
+
+    Returns:
+        dict: Bytes medios por contacto de cada representación
+    """
+    antes = _bytes_por_contacto(_ContactoConDict, contactos)
+    despues = _bytes_por_contacto(Contacto, contactos)
+
+    return {
+        'contactos': contactos,
+        'bytes_por_contacto_antes': round(antes, 1),
+        'bytes_por_contacto_despues': round(despues, 1),
+        'ahorro_pct': round(100 * (antes - despues) / antes, 1),
+        'mb_totales_antes': round(antes * contactos / (1024 * 1024), 1),
+        'mb_totales_despues': round(despues * contactos / (1024 * 1024), 1),
+    }
+
+
+def _pulsaciones(textos, semilla=13):
+    """
+    Convierte textos en la secuencia de lo escrito tras cada pulsación,
+    con alguna letra borrada y vuelta a escribir por el camino.
+    """
+    rng = random.Random(semilla)
+    secuencias = []
+    for texto in textos:
+        escrito = []
+        for i in range(1, len(texto) + 1):
+            escrito.append(texto[:i])
+            if i > 2 and rng.random() < 0.1:
+                escrito.append(texto[:i - 1])
+                escrito.append(texto[:i])
+        secuencias.append(escrito)
+    return secuencias
+
+
+def _percentiles_us(latencias):
+    """
+    Mediana y percentil 99 en microsegundos de una lista de segundos.
+    """
+    latencias = sorted(latencias)
+    return {'mediana': round(latencias[len(latencias) // 2] * 1e6, 1),
+            'p99': round(latencias[int(len(latencias) * 0.99)] * 1e6, 1)}
+
+
+def _sugerencias_posibles(agenda, texto, coincidencias, k):
+    """
+    Número de sugerencias (hasta k) que daría una sesión de autocompletado
+    sin límite de tiempo, dadas las coincidencias de buscar_por_termino.
+    """
+    prefijo = clave_alfabetica(texto)
+    posibles = 0
+    for clave, _ in agenda._recorrer_desde(prefijo):
+        if not clave.startswith(prefijo) or posibles == k:
+            break
+        posibles += 1
+    for contacto in coincidencias:
+        if posibles == k:
+            break
+        if not clave_alfabetica(contacto.nombre).startswith(prefijo):
+            posibles += 1
+    return posibles
+
+
+def bench_autocompletado(contactos, consultas, k=10):
+    """
+    Mide la latencia por pulsación de una sesión de autocompletado frente a
+    llamar a buscar_por_termino con cada pulsación, y cuenta las pulsaciones
+    en que la sesión agotó su presupuesto antes de completar las sugerencias.
+
+    Args:
+        contactos (int): Contactos de la agenda
+        consultas (int): Textos que se escriben letra a letra
+        k (int, opcional): Sugerencias por pulsación
+
+    Returns:
+        dict: Latencias por pulsación de cada forma de buscar
+    """
+    agenda = Agenda(capacidad_cache=0)
+    todos = list(generar_contactos(contactos))
+    _cargar(agenda, todos)
+
+    rng = random.Random(14)
+    # La mitad escribe el nombre y la otra mitad un apellido o el usuario del email
+    textos = []
+    for contacto in rng.sample(todos, consultas):
+        if rng.random() < 0.5:
+            textos.append(contacto.nombre.lower()[:12])
+        else:
+            textos.append(rng.choice([contacto.nombre.split()[1].lower(), contacto.email.split('@')[0]]))
+    secuencias = _pulsaciones(textos)
+
+    latencias_sesion = []
+    latencias_termino = []
+    incompletas = 0
+    for escrito in secuencias:
+        sesion = agenda.autocompletar(k)
+        for texto in escrito:
+            inicio = time.perf_counter()
+            sugerencias = sesion.buscar(texto)
+            latencias_sesion.append(time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            coincidencias = agenda.buscar_por_termino(texto)
+            latencias_termino.append(time.perf_counter() - inicio)
+            if len(sugerencias) < _sugerencias_posibles(agenda, texto, coincidencias, k):
+                incompletas += 1
+
+    return {
+        'contactos': contactos,
+        'textos': consultas,
+        'pulsaciones': len(latencias_sesion),
+        'us_por_pulsacion_sesion': _percentiles_us(latencias_sesion),
+        'us_por_pulsacion_buscar_por_termino': _percentiles_us(latencias_termino),
+        'pulsaciones_incompletas': incompletas,
+    }
+
+
+def main():
+    """Función principal del benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmarks de la agenda de contactos")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    p = subcomandos.add_parser('carga', help="Carga de contactos y búsqueda por nombre")
+    p.add_argument('--contactos', type=int, default=1_000_000)
+    p.add_argument('--contactos-lista', type=int, default=20_000)
+
+    p = subcomandos.add_parser('busqueda', help="Búsqueda por término con y sin índice")
+    p.add_argument('--contactos', type=int, default=1_000_000)
+    p.add_argument('--consultas', type=int, default=10_000)
+
+    p = subcomandos.add_parser('telefonos', help="Identificación de llamadas y prefijos de teléfono")
+    p.add_argument('--contactos', type=int, default=1_000_000)
+    p.add_argument('--consultas', type=int, default=100_000)
+
+    p = subcomandos.add_parser('aproximada', help="Búsqueda de nombres con erratas")
+    p.add_argument('--contactos', type=int, default=1_000_000)
+    p.add_argument('--consultas', type=int, default=1_000)
+
+    p = subcomandos.add_parser('importacion', help="Lectura e importación de un vCard grande")
+    p.add_argument('--megas', type=int, default=2048)
+    p.add_argument('--fichero', default=None)
+    p.add_argument('--solo-lectura', action='store_true')
+
+    p = subcomandos.add_parser('persistente', help="Agenda guardada en SQLite")
+    p.add_argument('--contactos', type=int, default=1_000_000)
+    p.add_argument('--consultas', type=int, default=2_000)
+
+    p = subcomandos.add_parser('alfabetico', help="Índice alfabético y paginación")
+    p.add_argument('--contactos', type=int, default=1_000_000)
+    p.add_argument('--consultas', type=int, default=10_000)
+
+    p = subcomandos.add_parser('cache', help="Caché de resultados con un registro de consultas sesgado")
+    p.add_argument('--contactos', type=int, default=200_000)
+    p.add_argument('--consultas', type=int, default=100_000)
+    p.add_argument('--distintas', type=int, default=20_000)
+    p.add_argument('--sesgo', type=float, default=1.1,
+                   help="Exponente de Zipf de las consultas (0 = uniforme)")
+    p.add_argument('--escrituras', type=float, default=0.01,
+                   help="Fracción de actualizaciones intercaladas con las consultas")
+    p.add_argument('--capacidad', type=int, default=10_000)
+
+    p = subcomandos.add_parser('duplicados', help="Detección de contactos duplicados")
+    p.add_argument('--contactos', type=int, default=200_000)
+    p.add_argument('--duplicados', type=int, default=2_000)
+    p.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+
+    p = subcomandos.add_parser('concurrente', help="Lecturas en varios hilos con escrituras continuas")
+    p.add_argument('--contactos', type=int, default=200_000)
+    p.add_argument('--hilos', default='1,2,4,8',
+                   help="Números de hilos lectores separados por comas")
+    p.add_argument('--segundos', type=float, default=3.0)
+    p.add_argument('--escrituras', type=int, default=5_000,
+                   help="Actualizaciones por segundo del escritor")
+
+    p = subcomandos.add_parser('memoria', help="Memoria por contacto antes y después del Contacto compacto")
+    p.add_argument('--contactos', type=int, default=10_000_000)
+
+    p = subcomandos.add_parser('autocompletado', help="Búsqueda mientras se escribe")
+    p.add_argument('--contactos', type=int, default=1_000_000)
+    p.add_argument('--consultas', type=int, default=200)
+
+    args = parser.parse_args()
+
+    if args.comando == 'carga':
+        resultado = bench_carga(args.contactos, args.contactos_lista)
+    elif args.comando == 'busqueda':
+        resultado = bench_busqueda(args.contactos, args.consultas)
+    elif args.comando == 'telefonos':
+        resultado = bench_telefonos(args.contactos, args.consultas)
+    elif args.comando == 'aproximada':
+        resultado = bench_aproximada(args.contactos, args.consultas)
+    elif args.comando == 'importacion':
+        resultado = bench_importacion(args.megas, args.fichero, args.solo_lectura)
+    elif args.comando == 'persistente':
+        resultado = bench_persistente(args.contactos, args.consultas)
+    elif args.comando == 'alfabetico':
+        resultado = bench_alfabetico(args.contactos, args.consultas)
+    elif args.comando == 'cache':
+        resultado = bench_cache(args.contactos, args.consultas, args.distintas,
+                                args.sesgo, args.escrituras, args.capacidad)
+    elif args.comando == 'duplicados':
+        resultado = bench_duplicados(args.contactos, args.duplicados, args.procesos)
+    elif args.comando == 'concurrente':
+        hilos = [int(n) for n in args.hilos.split(',')]
+        resultado = bench_concurrente(args.contactos, hilos, args.segundos, args.escrituras)
+    elif args.comando == 'memoria':
+        resultado = bench_memoria(args.contactos)
+    elif args.comando == 'autocompletado':
+        resultado = bench_autocompletado(args.contactos, args.consultas)
+
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
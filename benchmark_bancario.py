@@ -0,0 +1,637 @@
+"""
+Benchmarks del sistema bancario.
+
+Cada subcomando mide un aspecto concreto y muestra el resultado en JSON:
+
+    python benchmark_bancario.py limites [--operaciones N]
+    python benchmark_bancario.py memoria [--cuentas N]
+    python benchmark_bancario.py particiones [--max-particiones N] [--cruzadas P]
+    python benchmark_bancario.py idempotencia [--claves N] [--capacidad N]
+    python benchmark_bancario.py instantaneas [--cuentas N] [--segundos S]
+    python benchmark_bancario.py conciliacion [--movimientos N] [--procesos N]
+    python benchmark_bancario.py carga [--cuentas N] [--operaciones N] [--mezcla M]
+                                       [--sesgo S] [--salida fichero.json]
+
+El subcomando `carga` reproduce una mezcla de operaciones realista y sirve
+para comparar versiones del núcleo de cuentas entre sí.
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+import tracemalloc
+
+from cache_idempotencia import CacheIdempotencia
+from conciliacion import conciliar
+from cuenta_bancaria import CuentaBancaria
+from limites_velocidad import LimiteVelocidad
+from sistema_bancario import SistemaBancario
+from sistema_particionado import SistemaBancarioParticionado
+
+
+@contextlib.contextmanager
+def silenciar_salida():
+    """
+    Redirige la salida estándar a /dev/null (las operaciones imprimen mensajes).
+    """
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        yield
+
+
+def _medir_retiros(cuenta, operaciones):
+    """
+    Ejecuta retiros pequeños y devuelve los nanosegundos medios por operación.
+    """
+    with silenciar_salida():
+        inicio = time.perf_counter_ns()
+        for _ in range(operaciones):
+            cuenta.retirar(0.01)
+        fin = time.perf_counter_ns()
+    return (fin - inicio) / operaciones
+
+
+def bench_limites(operaciones):
+    """
+    Mide el sobrecoste de los límites de velocidad en `retirar`.
+
+    Args:
+        operaciones (int): Número de retiros por escenario
+
+    Returns:
+        dict: Tiempos medios por operación en nanosegundos
+    """
+    class CuentaLimitada(CuentaBancaria):
+        __slots__ = ()
+        limites = (
+            LimiteVelocidad(24 * 3600, max_cantidad=float('inf'), operaciones=('retiro',)),
+            LimiteVelocidad(60, max_operaciones=10 ** 12),
+        )
+
+    saldo = operaciones * 0.01 + 1
+    sin_limites = _medir_retiros(CuentaBancaria("Bench", "B1", saldo), operaciones)
+    con_limites = _medir_retiros(CuentaLimitada("Bench", "B2", saldo), operaciones)
+
+    return {
+        'operaciones': operaciones,
+        'ns_por_retiro_sin_limites': round(sin_limites, 1),
+        'ns_por_retiro_con_2_limites': round(con_limites, 1),
+        'sobrecoste_ns': round(con_limites - sin_limites, 1),
+        'sobrecoste_pct': round(100 * (con_limites - sin_limites) / sin_limites, 2),
+    }
+
+
+class _CuentaConDict:
+    """
+    Réplica de la representación anterior de CuentaBancaria (con __dict__,
+    titular sin internar y lista de movimientos creada siempre).
+    """
+
+    def __init__(self, titular, numero_cuenta, saldo_inicial=0.0):
+        self.titular = titular
+        self.numero_cuenta = numero_cuenta
+        self.saldo = saldo_inicial
+        self.activa = True
+        self.movimientos = []
+
+
+def _bytes_por_cuenta(clase, cuentas, titulares):
+    """
+    Crea `cuentas` cuentas de la clase dada y mide la memoria que ocupan.
+    """
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    n = len(titulares)
+    # Cada cuenta recibe una copia nueva del nombre, como al leerlo con input()
+    lista = [clase(titulares[i % n][:-1] + titulares[i % n][-1:], f"ES{i:010d}")
+             for i in range(cuentas)]
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del lista
+    return (despues - antes) / cuentas
+
+
+def bench_memoria(cuentas):
+    """
+    Compara los bytes por cuenta antes y después del núcleo con __slots__.
+
+    Se reparten 1000 titulares distintos entre todas las cuentas.
+
+    Args:
+        cuentas (int): Número de cuentas a crear
+
+    Returns:
+        dict: Bytes medios por cuenta de cada representación
+    """
+    titulares = [f"Titular número {i}" for i in range(1000)]
+
+    antes = _bytes_por_cuenta(_CuentaConDict, cuentas, titulares)
+    despues = _bytes_por_cuenta(CuentaBancaria, cuentas, titulares)
+
+    return {
+        'cuentas': cuentas,
+        'bytes_por_cuenta_antes': round(antes, 1),
+        'bytes_por_cuenta_despues': round(despues, 1),
+        'ahorro_pct': round(100 * (antes - despues) / antes, 2),
+        'mb_totales_antes': round(antes * cuentas / 2 ** 20, 1),
+        'mb_totales_despues': round(despues * cuentas / 2 ** 20, 1),
+    }
+
+
+def bench_particiones(max_particiones, cuentas, operaciones, cruzadas, tam_lote):
+    """
+    Mide el rendimiento del sistema particionado de 1 a `max_particiones` procesos.
+
+    Args:
+        max_particiones (int): Número máximo de particiones a probar
+        cuentas (int): Número de cuentas del banco
+        operaciones (int): Número de transferencias por escenario
+        cruzadas (float): Fracción de transferencias entre particiones distintas
+        tam_lote (int): Operaciones enviadas por lote
+
+    Returns:
+        dict: Operaciones por segundo para cada número de particiones
+    """
+    resultados = []
+    for n in range(1, max_particiones + 1):
+        with SistemaBancarioParticionado("Bench", n) as banco, silenciar_salida():
+            numeros = [banco.crear_cuenta(f"Titular {i}", 1000.0) for i in range(cuentas)]
+
+            por_particion = {}
+            for numero in numeros:
+                por_particion.setdefault(banco.particion(numero), []).append(numero)
+
+            rng = random.Random(n)
+            ops = []
+            for _ in range(operaciones):
+                origen = rng.choice(numeros)
+                p = banco.particion(origen)
+                if n > 1 and rng.random() < cruzadas:
+                    otra = rng.choice([q for q in por_particion if q != p])
+                    destino = rng.choice(por_particion[otra])
+                else:
+                    destino = rng.choice(por_particion[p])
+                ops.append(('transferir', origen, destino, 1.0))
+
+            inicio = time.perf_counter()
+            for i in range(0, operaciones, tam_lote):
+                banco.procesar_lote(ops[i:i + tam_lote])
+            segundos = time.perf_counter() - inicio
+
+        resultados.append({
+            'particiones': n,
+            'ops_por_segundo': round(operaciones / segundos),
+        })
+
+    return {
+        'cuentas': cuentas,
+        'operaciones': operaciones,
+        'fraccion_cruzadas': cruzadas,
+        'tam_lote': tam_lote,
+        'nucleos': os.cpu_count(),
+        'resultados': resultados,
+    }
+
+
+def bench_idempotencia(claves, capacidad, reintentos):
+    """
+    Mide la caché de idempotencia con un flujo de claves nuevas y reintentos.
+
+    Args:
+        claves (int): Número de claves distintas a enviar
+        capacidad (int): Capacidad máxima de la caché
+        reintentos (float): Fracción de envíos que repiten una clave reciente
+
+    Returns:
+        dict: Rendimiento de la caché sola y de depósitos idempotentes en el banco
+    """
+    rng = random.Random(0)
+
+    # Caché sola: cada clave nueva se consulta y se guarda; los reintentos aciertan
+    cache = CacheIdempotencia(capacidad)
+    envios = 0
+    inicio = time.perf_counter()
+    for i in range(claves):
+        clave = f"op-{i}"
+        if cache.obtener(clave) is None:
+            cache.guardar(clave, ('depositar', True))
+        envios += 1
+        if rng.random() < reintentos:
+            cache.obtener(f"op-{i - rng.randrange(min(i + 1, 100))}")
+            envios += 1
+    segundos_cache = time.perf_counter() - inicio
+
+    # Banco completo: depósitos con clave, con una parte de reintentos
+    banco = SistemaBancario("Bench", capacidad_idempotencia=capacidad)
+    operaciones = min(claves, 200_000)
+    with silenciar_salida():
+        numero = banco.crear_cuenta("Bench").numero_cuenta
+        inicio = time.perf_counter()
+        for i in range(operaciones):
+            banco.depositar(numero, 1.0, clave_idempotencia=f"dep-{i}")
+            if rng.random() < reintentos:
+                banco.depositar(numero, 1.0, clave_idempotencia=f"dep-{i}")
+        segundos_banco = time.perf_counter() - inicio
+
+    return {
+        'claves': claves,
+        'capacidad': capacidad,
+        'fraccion_reintentos': reintentos,
+        'cache_envios_por_segundo': round(envios / segundos_cache),
+        'cache_claves_por_hora': round(claves / segundos_cache * 3600),
+        'cache_estadisticas': cache.estadisticas(),
+        'banco_depositos': operaciones,
+        'banco_saldo_final': banco.cuentas[numero].saldo,
+        'banco_depositos_por_segundo': round(operaciones / segundos_banco),
+        'banco_estadisticas': banco.idempotencia.estadisticas(),
+    }
+
+
+def _informe_con_cerrojo(banco):
+    """
+    Informe de referencia: bloquea el banco entero mientras suma los saldos.
+    """
+    with banco._cerrojo:
+        return sum(cuenta.saldo for cuenta in banco.cuentas.values())
+
+
+def _informe_con_instantanea(banco):
+    """
+    Informe sobre una instantánea: los escritores no se detienen.
+    """
+    with banco.instantanea() as instantanea:
+        return instantanea.saldo_total()
+
+
+def _escenario_instantaneas(cuentas, segundos, informe):
+    """
+    Ejecuta transferencias durante `segundos` con un informe opcional en paralelo.
+    """
+    banco = SistemaBancario("Bench")
+    with silenciar_salida():
+        numeros = [banco.crear_cuenta(f"Titular {i}", 100.0).numero_cuenta
+                   for i in range(cuentas)]
+    total_esperado = 100.0 * cuentas
+
+    parar = threading.Event()
+    totales = []
+
+    def informar():
+        while not parar.is_set():
+            totales.append(informe(banco))
+
+    hilo = threading.Thread(target=informar) if informe else None
+    rng = random.Random(0)
+    latencias = []
+    reloj = time.perf_counter
+
+    with silenciar_salida():
+        if hilo:
+            hilo.start()
+        inicio = reloj()
+        while reloj() - inicio < segundos:
+            origen, destino = rng.sample(numeros, 2)
+            t0 = reloj()
+            banco.realizar_transferencia(origen, destino, rng.random() * 10)
+            latencias.append(reloj() - t0)
+        transcurrido = reloj() - inicio
+        parar.set()
+        if hilo:
+            hilo.join()
+
+    latencias.sort()
+    return {
+        'transferencias_por_segundo': round(len(latencias) / transcurrido),
+        'latencia_p99_ms': round(latencias[int(len(latencias) * 0.99)] * 1000, 3),
+        'latencia_max_ms': round(latencias[-1] * 1000, 3),
+        'informes_completados': len(totales),
+        'informes_incoherentes': sum(1 for t in totales if abs(t - total_esperado) > 1e-6),
+    }
+
+
+def bench_instantaneas(cuentas, segundos):
+    """
+    Mide el impacto de un informe completo del banco sobre las escrituras.
+
+    Compara tres escenarios: solo escrituras, escrituras con un informe
+    continuo sobre instantáneas y escrituras con un informe que bloquea el
+    banco. Con el GIL, parte de la caída de rendimiento se debe a que ambos
+    hilos comparten el mismo núcleo; la latencia máxima muestra cuánto llega
+    a esperar una transferencia a que termine el informe.
+
+    Args:
+        cuentas (int): Número de cuentas del banco
+        segundos (float): Duración de cada escenario
+
+    Returns:
+        dict: Transferencias por segundo e informes completados en cada escenario
+    """
+    return {
+        'cuentas': cuentas,
+        'segundos': segundos,
+        'solo_escrituras': _escenario_instantaneas(cuentas, segundos, None),
+        'informe_con_instantanea': _escenario_instantaneas(cuentas, segundos,
+                                                           _informe_con_instantanea),
+        'informe_con_cerrojo': _escenario_instantaneas(cuentas, segundos,
+                                                       _informe_con_cerrojo),
+    }
+
+
+def bench_conciliacion(cuentas, movimientos, procesos):
+    """
+    Mide la velocidad de la conciliación del libro mayor.
+
+    Args:
+        cuentas (int): Número de cuentas del banco
+        movimientos (int): Número aproximado de movimientos a generar
+        procesos (int): Procesos usados en la conciliación
+
+    Returns:
+        dict: Movimientos conciliados por segundo y estimación para 100 millones
+    """
+    banco = SistemaBancario("Bench")
+    rng = random.Random(0)
+    with silenciar_salida():
+        numeros = [banco.crear_cuenta(f"Titular {i}", 1000.0).numero_cuenta
+                   for i in range(cuentas)]
+        # Cada transferencia genera dos movimientos
+        for _ in range(movimientos // 2):
+            origen, destino = rng.sample(numeros, 2)
+            banco.realizar_transferencia(origen, destino, rng.random() * 10)
+
+    inicio = time.perf_counter()
+    informe = conciliar(banco, procesos)
+    segundos = time.perf_counter() - inicio
+    por_segundo = informe.movimientos / segundos
+
+    return {
+        'cuentas': cuentas,
+        'movimientos': informe.movimientos,
+        'procesos': procesos,
+        'correcto': informe.correcto,
+        'segundos': round(segundos, 3),
+        'movimientos_por_segundo': round(por_segundo),
+        'minutos_estimados_100M': round(100_000_000 / por_segundo / 60, 1),
+    }
+
+
+MEZCLA_POR_DEFECTO = "depositar=0.3,retirar=0.2,transferir=0.4,historial=0.1"
+
+
+def _leer_mezcla(texto):
+    """
+    Convierte una mezcla 'operacion=peso,...' en un diccionario normalizado.
+    """
+    mezcla = {}
+    for parte in texto.split(','):
+        operacion, peso = parte.split('=')
+        operacion = operacion.strip()
+        if operacion not in ('depositar', 'retirar', 'transferir', 'historial'):
+            raise ValueError(f"Operación desconocida en la mezcla: {operacion}")
+        mezcla[operacion] = float(peso)
+    total = sum(mezcla.values())
+    return {operacion: peso / total for operacion, peso in mezcla.items()}
+
+
+def _generar_operaciones(numeros, operaciones, mezcla, sesgo, semilla):
+    """
+    Genera la secuencia de operaciones antes de medir.
+
+    Las cuentas se eligen con una distribución de Zipf de exponente `sesgo`,
+    de modo que unas pocas cuentas "calientes" concentran la mayor parte de
+    la actividad (sesgo 0 equivale a una elección uniforme).
+    """
+    rng = random.Random(semilla)
+    pesos = [1.0 / (rango ** sesgo) for rango in range(1, len(numeros) + 1)]
+    acumulados = list(itertools.accumulate(pesos))
+    tipos = rng.choices(list(mezcla), weights=list(mezcla.values()), k=operaciones)
+    origenes = rng.choices(numeros, cum_weights=acumulados, k=operaciones)
+    destinos = rng.choices(numeros, cum_weights=acumulados, k=operaciones)
+
+    posicion = {numero: i for i, numero in enumerate(numeros)}
+
+    secuencia = []
+    for tipo, origen, destino in zip(tipos, origenes, destinos):
+        if tipo == 'transferir':
+            if destino == origen:
+                destino = numeros[(posicion[origen] + 1) % len(numeros)]
+            secuencia.append((tipo, origen, destino, round(rng.uniform(1, 100), 2)))
+        elif tipo == 'historial':
+            secuencia.append((tipo, origen, 10))
+        else:
+            secuencia.append((tipo, origen, round(rng.uniform(1, 100), 2)))
+    return secuencia
+
+
+def _crear_banco(cuentas):
+    """
+    Crea un banco de `cuentas` cuentas mediante SistemaBancario.crear_cuenta.
+    """
+    banco = SistemaBancario("Bench")
+    with silenciar_salida():
+        numeros = [banco.crear_cuenta(f"Titular {i}", 1000.0).numero_cuenta
+                   for i in range(cuentas)]
+    return banco, numeros
+
+
+def _ejecutar_operacion(banco, operacion):
+    """
+    Ejecuta una operación de la secuencia sobre el banco.
+    """
+    tipo = operacion[0]
+    if tipo == 'depositar':
+        banco.depositar(operacion[1], operacion[2])
+    elif tipo == 'retirar':
+        banco.retirar(operacion[1], operacion[2])
+    elif tipo == 'transferir':
+        banco.realizar_transferencia(operacion[1], operacion[2], operacion[3])
+    else:
+        banco.buscar_cuenta(operacion[1]).ver_historial(operacion[2])
+
+
+def _percentiles(latencias):
+    """
+    Calcula los percentiles de una lista de latencias en segundos.
+
+    Returns:
+        dict: Percentiles en microsegundos
+    """
+    if not latencias:
+        return {}
+    latencias.sort()
+    n = len(latencias)
+    resultado = {}
+    for nombre, p in (('p50', 0.50), ('p90', 0.90), ('p99', 0.99), ('p999', 0.999)):
+        resultado[nombre] = round(latencias[min(n - 1, int(n * p))] * 1e6, 2)
+    resultado['max'] = round(latencias[-1] * 1e6, 2)
+    return resultado
+
+
+def _total_movimientos(banco):
+    """
+    Cuenta los movimientos registrados en todas las cuentas del banco.
+    """
+    return sum(len(cuenta.movimientos) for cuenta in banco.cuentas.values())
+
+
+def bench_carga(cuentas, operaciones, mezcla, sesgo, semilla, etiqueta=None):
+    """
+    Reproduce una mezcla de operaciones y mide rendimiento, latencias y memoria.
+
+    Se hacen dos pasadas con la misma secuencia sobre bancos nuevos: la
+    primera mide tiempos sin instrumentación y la segunda, con tracemalloc
+    activo, mide bloques asignados y crecimiento de memoria.
+
+    Args:
+        cuentas (int): Número de cuentas del banco
+        operaciones (int): Número de operaciones a reproducir
+        mezcla (dict): Operación -> fracción de la carga
+        sesgo (float): Exponente de Zipf para las cuentas calientes
+        semilla (int): Semilla de la generación de la carga
+        etiqueta (str, opcional): Nombre de la versión medida
+
+    Returns:
+        dict: Resultados listos para serializar como JSON
+    """
+    # Pasada 1: tiempos
+    banco, numeros = _crear_banco(cuentas)
+    secuencia = _generar_operaciones(numeros, operaciones, mezcla, sesgo, semilla)
+    latencias = {tipo: [] for tipo in mezcla}
+    reloj = time.perf_counter
+
+    with silenciar_salida():
+        inicio = reloj()
+        for operacion in secuencia:
+            t0 = reloj()
+            _ejecutar_operacion(banco, operacion)
+            latencias[operacion[0]].append(reloj() - t0)
+        segundos = reloj() - inicio
+
+    por_tipo = {}
+    for tipo, valores in latencias.items():
+        tiempo_tipo = sum(valores)
+        por_tipo[tipo] = {
+            'operaciones': len(valores),
+            'ops_por_segundo': round(len(valores) / tiempo_tipo) if tiempo_tipo else None,
+            'latencia_us': _percentiles(valores),
+        }
+
+    # Pasada 2: memoria y bloques asignados
+    del banco
+    banco, numeros = _crear_banco(cuentas)
+    movimientos_antes = _total_movimientos(banco)
+    tracemalloc.start()
+    bloques_antes = sys.getallocatedblocks()
+    memoria_antes = tracemalloc.get_traced_memory()[0]
+    with silenciar_salida():
+        for operacion in secuencia:
+            _ejecutar_operacion(banco, operacion)
+    memoria_despues, memoria_pico = tracemalloc.get_traced_memory()
+    bloques_despues = sys.getallocatedblocks()
+    tracemalloc.stop()
+    movimientos_nuevos = _total_movimientos(banco) - movimientos_antes
+    crecimiento = memoria_despues - memoria_antes
+
+    return {
+        'etiqueta': etiqueta,
+        'python': platform.python_version(),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'parametros': {
+            'cuentas': cuentas,
+            'operaciones': operaciones,
+            'mezcla': mezcla,
+            'sesgo': sesgo,
+            'semilla': semilla,
+        },
+        'total': {
+            'segundos': round(segundos, 3),
+            'ops_por_segundo': round(operaciones / segundos),
+        },
+        'por_operacion': por_tipo,
+        'memoria': {
+            'movimientos_nuevos': movimientos_nuevos,
+            'bloques_asignados_netos': bloques_despues - bloques_antes,
+            'bloques_por_operacion': round((bloques_despues - bloques_antes) / operaciones, 3),
+            'crecimiento_bytes': crecimiento,
+            'pico_bytes': memoria_pico - memoria_antes,
+            'mb_por_millon_de_movimientos': (round(crecimiento / movimientos_nuevos * 1e6 / 2 ** 20, 1)
+                                             if movimientos_nuevos else None),
+        },
+    }
+
+
+def main():
+    """Función principal del benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmarks del sistema bancario")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    p = subcomandos.add_parser('limites', help="Sobrecoste de los límites de velocidad")
+    p.add_argument('--operaciones', type=int, default=200_000)
+
+    p = subcomandos.add_parser('memoria', help="Memoria por cuenta con y sin __slots__")
+    p.add_argument('--cuentas', type=int, default=1_000_000)
+
+    p = subcomandos.add_parser('particiones', help="Escalado del sistema particionado")
+    p.add_argument('--max-particiones', type=int, default=os.cpu_count() or 1)
+    p.add_argument('--cuentas', type=int, default=10_000)
+    p.add_argument('--operaciones', type=int, default=200_000)
+    p.add_argument('--cruzadas', type=float, default=0.2)
+    p.add_argument('--tam-lote', type=int, default=5_000)
+
+    p = subcomandos.add_parser('idempotencia', help="Caché de claves de idempotencia")
+    p.add_argument('--claves', type=int, default=2_000_000)
+    p.add_argument('--capacidad', type=int, default=500_000)
+    p.add_argument('--reintentos', type=float, default=0.05)
+
+    p = subcomandos.add_parser('instantaneas', help="Escrituras durante un informe completo")
+    p.add_argument('--cuentas', type=int, default=100_000)
+    p.add_argument('--segundos', type=float, default=5.0)
+
+    p = subcomandos.add_parser('conciliacion', help="Velocidad de la conciliación")
+    p.add_argument('--cuentas', type=int, default=100_000)
+    p.add_argument('--movimientos', type=int, default=2_000_000)
+    p.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+
+    p = subcomandos.add_parser('carga', help="Mezcla de operaciones realista")
+    p.add_argument('--cuentas', type=int, default=10_000)
+    p.add_argument('--operaciones', type=int, default=200_000)
+    p.add_argument('--mezcla', default=MEZCLA_POR_DEFECTO,
+                   help="Pesos por operación, p. ej. 'depositar=0.3,transferir=0.7'")
+    p.add_argument('--sesgo', type=float, default=1.1,
+                   help="Exponente de Zipf para las cuentas calientes (0 = uniforme)")
+    p.add_argument('--semilla', type=int, default=0)
+    p.add_argument('--etiqueta', help="Nombre de la versión medida")
+    p.add_argument('--salida', help="Fichero JSON donde guardar el resultado")
+
+    args = parser.parse_args()
+
+    if args.comando == 'limites':
+        resultado = bench_limites(args.operaciones)
+    elif args.comando == 'memoria':
+        resultado = bench_memoria(args.cuentas)
+    elif args.comando == 'particiones':
+        resultado = bench_particiones(args.max_particiones, args.cuentas, args.operaciones,
+                                      args.cruzadas, args.tam_lote)
+    elif args.comando == 'idempotencia':
+        resultado = bench_idempotencia(args.claves, args.capacidad, args.reintentos)
+    elif args.comando == 'instantaneas':
+        resultado = bench_instantaneas(args.cuentas, args.segundos)
+    elif args.comando == 'conciliacion':
+        resultado = bench_conciliacion(args.cuentas, args.movimientos, args.procesos)
+    elif args.comando == 'carga':
+        resultado = bench_carga(args.cuentas, args.operaciones, _leer_mezcla(args.mezcla),
+                                args.sesgo, args.semilla, args.etiqueta)
+        if args.salida:
+            with open(args.salida, 'w', encoding='utf-8') as fichero:
+                json.dump(resultado, fichero, indent=2, ensure_ascii=False)
+
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
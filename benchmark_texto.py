@@ -0,0 +1,497 @@
+"""
+Benchmarks del analizador de texto.
+
+Cada subcomando mide un aspecto concreto y muestra el resultado en JSON:
+
+    python benchmark_texto.py flujo [--megas N] [--fichero RUTA] [--tam-bloque N]
+                                    [--comparar]
+    python benchmark_texto.py corpus [--ficheros N] [--megas N] [--procesos 1,2,4]
+    python benchmark_texto.py clasificacion [--megas N]
+    python benchmark_texto.py frecuencias [--palabras N] [--vocabulario N] [--max-claves N]
+                                          [--top N]
+    python benchmark_texto.py incremental [--lineas N] [--ediciones N]
+    python benchmark_texto.py mapeado [--megas N] [--fichero RUTA] [--tam-ventana N]
+                                      [--comparar]
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+
+from analisis_incremental import AnalisisIncremental
+from analizador_corpus import analizar_corpus
+from analizador_texto import (TAM_BLOQUE, TAM_VENTANA, analizar_flujo, analizar_mapeado,
+                              analizar_texto)
+from frecuencias_texto import AnalizadorFrecuencias
+
+PALABRAS = ["el", "la", "de", "que", "y", "en", "un", "ser", "se", "no", "haber",
+            "por", "con", "su", "para", "como", "estar", "tener", "le", "lo",
+            "árbol", "camión", "pingüino", "murciélago", "ñandú", "corazón",
+            "ESPAÑA", "Ángel", "él", "también", "así", "después", "pequeño",
+            "otorrinolaringólogo", "electroencefalografista", "ciudad", "año"]
+SIGNOS = ["", "", "", "", ",", ".", ";", ":", "!", "?", "¡", "¿", "(", ")", "\""]
+
+
+def _memoria_maxima_mb():
+    """
+    Pico de memoria residente del proceso en MB (ru_maxrss está en KB en Linux).
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def generar_corpus(ruta, megas, semilla=0):
+    """
+    Escribe texto sintético en español hasta alcanzar el tamaño pedido.
+
+    Args:
+        ruta (str): Fichero a escribir
+        megas (int): Tamaño aproximado en MB
+        semilla (int, opcional): Semilla del generador aleatorio
+    """
+    rng = random.Random(semilla)
+    objetivo = megas * 1024 * 1024
+    with open(ruta, 'w', encoding='utf-8') as fichero:
+        while fichero.tell() < objetivo:
+            lineas = []
+            for _ in range(1000):
+                palabras = [rng.choice(PALABRAS) + rng.choice(SIGNOS)
+                            for _ in range(rng.randint(5, 15))]
+                lineas.append(' '.join(palabras))
+            fichero.write('\n'.join(lineas) + '\n')
+
+
+def _analizar_texto_caracter_a_caracter(texto):
+    """
+    Réplica de la versión anterior de analizar_texto, que recorre el texto
+    carácter a carácter y limpia cada palabra con un join.
+    """
+    if not texto:
+        return 0, 0, 0, ""
+    texto = texto.lower()
+    palabras = texto.split()
+    vocales = consonantes = 0
+    for caracter in texto:
+        if caracter.isalpha():
+            if caracter in "aeiouáéíóúü":
+                vocales += 1
+            else:
+                consonantes += 1
+    palabra_mas_larga = ""
+    for palabra in palabras:
+        palabra_limpia = ''.join(c for c in palabra if c.isalpha())
+        if len(palabra_limpia) > len(palabra_mas_larga):
+            palabra_mas_larga = palabra_limpia
+    return len(palabras), vocales, consonantes, palabra_mas_larga
+
+
+def bench_flujo(megas, fichero=None, tam_bloque=TAM_BLOQUE, comparar=False):
+    """
+    Mide la velocidad y la memoria del análisis por bloques de un fichero grande.
+
+    Args:
+        megas (int): Tamaño del fichero a generar en MB
+        fichero (str, opcional): Fichero existente; si se indica no se genera
+        tam_bloque (int, opcional): Caracteres leídos de cada vez
+        comparar (bool, opcional): Analizar también el fichero entero en
+            memoria con analizar_texto (solo para ficheros que quepan)
+
+    Returns:
+        dict: MB/s y picos de memoria de cada modo
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        if fichero is None:
+            fichero = os.path.join(directorio, 'corpus.txt')
+            generar_corpus(fichero, megas)
+        tamano_mb = os.path.getsize(fichero) / (1024 * 1024)
+
+        memoria_inicial = _memoria_maxima_mb()
+        inicio = time.perf_counter()
+        with open(fichero, encoding='utf-8') as f:
+            resultados = analizar_flujo(f, tam_bloque)
+        segundos = time.perf_counter() - inicio
+
+        resultado = {
+            'fichero_mb': round(tamano_mb, 1),
+            'tam_bloque': tam_bloque,
+            'palabras': resultados[0],
+            'segundos_flujo': round(segundos, 2),
+            'mb_por_segundo_flujo': round(tamano_mb / segundos, 2),
+            'memoria_inicial_mb': round(memoria_inicial, 1),
+            'memoria_maxima_mb_flujo': round(_memoria_maxima_mb(), 1),
+        }
+
+        if comparar:
+            inicio = time.perf_counter()
+            with open(fichero, encoding='utf-8') as f:
+                en_memoria = analizar_texto(f.read())
+            segundos = time.perf_counter() - inicio
+            resultado.update({
+                'segundos_en_memoria': round(segundos, 2),
+                'mb_por_segundo_en_memoria': round(tamano_mb / segundos, 2),
+                'memoria_maxima_mb_en_memoria': round(_memoria_maxima_mb(), 1),
+                'mismo_resultado': en_memoria == resultados,
+            })
+    return resultado
+
+
+def bench_corpus(ficheros, megas, procesos):
+    """
+    Mide cómo escala el análisis de un corpus con el número de procesos.
+
+    El corpus tiene `ficheros` ficheros pequeños que suman la mitad de los
+    MB y un fichero grande con la otra mitad, que se parte en rangos.
+
+    Args:
+        ficheros (int): Número de ficheros pequeños
+        megas (int): Tamaño total del corpus en MB
+        procesos (list): Números de procesos a probar
+
+    Returns:
+        dict: MB/s y aceleración para cada número de procesos
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        grande = os.path.join(directorio, 'grande.txt')
+        generar_corpus(grande, max(1, megas // 2), semilla=1)
+        # Los pequeños son trozos de un mismo texto generado
+        muestra = os.path.join(directorio, 'muestra.txt')
+        generar_corpus(muestra, max(1, megas - megas // 2), semilla=2)
+        with open(muestra, encoding='utf-8') as f:
+            lineas = f.readlines()
+        os.remove(muestra)
+        por_fichero = -(-len(lineas) // ficheros)
+        pequenos = os.path.join(directorio, 'documentos')
+        os.mkdir(pequenos)
+        for i in range(ficheros):
+            with open(os.path.join(pequenos, f"doc{i:06d}.txt"), 'w', encoding='utf-8') as f:
+                f.writelines(lineas[i * por_fichero:(i + 1) * por_fichero])
+        del lineas
+        tamano_mb = sum(os.path.getsize(os.path.join(d, n))
+                        for d, _, nombres in os.walk(directorio) for n in nombres) / (1024 * 1024)
+
+        resultado = {
+            'ficheros': ficheros + 1,
+            'corpus_mb': round(tamano_mb, 1),
+            'nucleos': os.cpu_count(),
+        }
+        referencia = None
+        for n in procesos:
+            inicio = time.perf_counter()
+            total, _ = analizar_corpus([directorio], n, tam_rango=8 << 20)
+            segundos = time.perf_counter() - inicio
+            if referencia is None:
+                referencia = (segundos, total)
+            resultado[f'{n}_procesos'] = {
+                'segundos': round(segundos, 2),
+                'mb_por_segundo': round(tamano_mb / segundos, 2),
+                'aceleracion': round(referencia[0] / segundos, 2),
+                'mismo_resultado': total == referencia[1],
+            }
+    return resultado
+
+
+def bench_clasificacion(megas):
+    """
+    Compara analizar_texto con la versión carácter a carácter sobre un texto en memoria.
+
+    Args:
+        megas (int): Tamaño del texto en MB
+
+    Returns:
+        dict: Segundos y MB/s de cada versión y aceleración
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        fichero = os.path.join(directorio, 'corpus.txt')
+        generar_corpus(fichero, megas)
+        with open(fichero, encoding='utf-8') as f:
+            texto = f.read()
+    tamano_mb = len(texto.encode('utf-8')) / (1024 * 1024)
+
+    inicio = time.perf_counter()
+    anterior = _analizar_texto_caracter_a_caracter(texto)
+    segundos_anterior = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    actual = analizar_texto(texto)
+    segundos_actual = time.perf_counter() - inicio
+
+    return {
+        'texto_mb': round(tamano_mb, 1),
+        'segundos_caracter_a_caracter': round(segundos_anterior, 2),
+        'mb_por_segundo_caracter_a_caracter': round(tamano_mb / segundos_anterior, 2),
+        'segundos_tablas': round(segundos_actual, 2),
+        'mb_por_segundo_tablas': round(tamano_mb / segundos_actual, 2),
+        'aceleracion': round(segundos_anterior / segundos_actual, 1),
+        'mismo_resultado': anterior == actual,
+    }
+
+
+def _texto_zipf(palabras, vocabulario, semilla=0):
+    """
+    Texto de palabras inventadas con frecuencias de Zipf (la i-ésima más
+    frecuente aparece con probabilidad proporcional a 1 / i).
+    """
+    rng = random.Random(semilla)
+    silabas = [c + v for c in "bcdfglmnprstñ" for v in "aeiouáéíóú"]
+    inventadas = set()
+    while len(inventadas) < vocabulario:
+        inventadas.add(''.join(rng.choices(silabas, k=rng.randint(2, 5))))
+    inventadas = sorted(inventadas)
+    rng.shuffle(inventadas)
+    acumulados = list(itertools.accumulate(1 / i for i in range(1, vocabulario + 1)))
+    return ' '.join(rng.choices(inventadas, cum_weights=acumulados, k=palabras))
+
+
+def _medir_frecuencias(texto, max_claves, top):
+    """
+    Analiza el texto con un presupuesto de claves y mide tiempo y pico de memoria.
+
+    El pico se mide en una segunda pasada con tracemalloc, que ralentiza mucho
+    el modo aproximado y falsearía el tiempo.
+    """
+    inicio = time.perf_counter()
+    analizador = AnalizadorFrecuencias(max_claves=max_claves, capacidad=10 * top)
+    analizador.agregar_flujo(io.StringIO(texto))
+    segundos = time.perf_counter() - inicio
+
+    flujo = io.StringIO(texto)
+    tracemalloc.start()
+    AnalizadorFrecuencias(max_claves=max_claves, capacidad=10 * top).agregar_flujo(flujo)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return analizador, segundos, pico
+
+
+def bench_frecuencias(palabras, vocabulario, max_claves, top):
+    """
+    Compara las frecuencias exactas con las aproximadas de memoria acotada.
+
+    Args:
+        palabras (int): Palabras del texto generado
+        vocabulario (int): Palabras distintas posibles
+        max_claves (int): Presupuesto de claves exactas de cada tabla
+        top (int): Términos más frecuentes que se comparan
+
+    Returns:
+        dict: Tiempo y memoria de cada modo y, por tabla, aciertos en los más
+              frecuentes, error máximo observado y cota de error
+    """
+    texto = _texto_zipf(palabras, vocabulario)
+    exacto, segundos_exacto, pico_exacto = _medir_frecuencias(texto, float('inf'), top)
+    acotado, segundos_acotado, pico_acotado = _medir_frecuencias(texto, max_claves, top)
+
+    resultado = {
+        'palabras': palabras,
+        'vocabulario': vocabulario,
+        'max_claves': max_claves,
+        'segundos_exacto': round(segundos_exacto, 2),
+        'segundos_acotado': round(segundos_acotado, 2),
+        'memoria_pico_mb_exacto': round(pico_exacto / 2 ** 20, 1),
+        'memoria_pico_mb_acotado': round(pico_acotado / 2 ** 20, 1),
+        'tablas': {},
+    }
+    reales, estimados = exacto.resultados(top), acotado.resultados(top)
+    for tabla_exacta, (nombre, real) in zip(exacto.tablas, reales.items()):
+        estimado = estimados[nombre]
+        mas_frecuentes = {termino for termino, _ in real['mas_frecuentes']}
+        errores = [frecuencia - tabla_exacta.frecuencia(termino)
+                   for termino, frecuencia in estimado['mas_frecuentes']]
+        resultado['tablas'][nombre] = {
+            'modo': estimado['modo'],
+            'distintos': real['distintos'],
+            'aciertos_top': round(len(mas_frecuentes & {t for t, _ in estimado['mas_frecuentes']})
+                                  / max(1, len(mas_frecuentes)), 3),
+            'error_maximo_observado': max(errores, default=0),
+            'cota_error': estimado['error_maximo'],
+            'confianza': estimado['confianza'],
+        }
+    return resultado
+
+
+def bench_incremental(lineas, ediciones):
+    """
+    Mide el coste de mantener las estadísticas de un documento mientras se
+    teclea, frente a volver a analizarlo entero tras cada pulsación.
+
+    Args:
+        lineas (int): Líneas del documento
+        ediciones (int): Pulsaciones simuladas (escribir o borrar un carácter)
+
+    Returns:
+        dict: Microsegundos por pulsación de cada modo y aceleración
+    """
+    rng = random.Random(0)
+    texto = '\n'.join(' '.join(rng.choice(PALABRAS) + rng.choice(SIGNOS)
+                                for _ in range(rng.randint(5, 15)))
+                       for _ in range(lineas))
+
+    inicio = time.perf_counter()
+    analisis = AnalisisIncremental(texto)
+    segundos_carga = time.perf_counter() - inicio
+
+    tiempos = []
+    for _ in range(ediciones):
+        # Rachas de escritura en un punto, como en un editor
+        if rng.random() < 0.05 or not tiempos:
+            posicion = rng.randrange(len(analisis))
+        inicio = time.perf_counter()
+        if rng.random() < 0.8:
+            analisis.insertar(posicion, rng.choice("abcdeáéñ ,."))
+            posicion += 1
+        elif posicion > 0:
+            analisis.eliminar(posicion - 1, posicion)
+            posicion -= 1
+        resultados = analisis.resultados()
+        tiempos.append(time.perf_counter() - inicio)
+
+    texto = analisis.texto()
+    completos = []
+    for _ in range(min(20, ediciones)):
+        inicio = time.perf_counter()
+        completo = analizar_texto(texto)
+        completos.append(time.perf_counter() - inicio)
+
+    tiempos.sort()
+    media = sum(tiempos) / len(tiempos)
+    media_completo = sum(completos) / len(completos)
+    return {
+        'lineas': lineas,
+        'caracteres': len(texto),
+        'ediciones': ediciones,
+        'segundos_carga': round(segundos_carga, 2),
+        'us_por_edicion_incremental': round(media * 1e6, 1),
+        'us_p99_incremental': round(tiempos[int(0.99 * (len(tiempos) - 1))] * 1e6, 1),
+        'us_por_edicion_completo': round(media_completo * 1e6, 1),
+        'aceleracion': round(media_completo / media, 1),
+        'mismo_resultado': resultados == completo,
+    }
+
+
+def bench_mapeado(megas, fichero=None, tam_ventana=TAM_VENTANA, comparar=False):
+    """
+    Compara el análisis de un fichero proyectado en memoria con el análisis
+    por bloques de str.
+
+    El pico de memoria solo crece, así que primero se mide el modo mapeado,
+    después el de bloques y, si se pide, el fichero entero en memoria.
+
+    Args:
+        megas (int): Tamaño del fichero a generar en MB
+        fichero (str, opcional): Fichero existente; si se indica no se genera
+        tam_ventana (int, opcional): Bytes de cada ventana del modo mapeado
+        comparar (bool, opcional): Analizar también el fichero entero con analizar_texto
+
+    Returns:
+        dict: MB/s y picos de memoria de cada modo
+    """
+    with tempfile.TemporaryDirectory() as directorio:
+        if fichero is None:
+            fichero = os.path.join(directorio, 'corpus.txt')
+            generar_corpus(fichero, megas)
+        tamano_mb = os.path.getsize(fichero) / (1024 * 1024)
+
+        memoria_inicial = _memoria_maxima_mb()
+        inicio = time.perf_counter()
+        with open(fichero, 'rb') as f:
+            mapeado = analizar_mapeado(f, tam_ventana)
+        segundos_mapeado = time.perf_counter() - inicio
+        memoria_mapeado = _memoria_maxima_mb()
+
+        inicio = time.perf_counter()
+        with open(fichero, encoding='utf-8') as f:
+            por_bloques = analizar_flujo(f)
+        segundos_bloques = time.perf_counter() - inicio
+
+        resultado = {
+            'fichero_mb': round(tamano_mb, 1),
+            'tam_ventana': tam_ventana,
+            'memoria_inicial_mb': round(memoria_inicial, 1),
+            'mb_por_segundo_mapeado': round(tamano_mb / segundos_mapeado, 2),
+            'memoria_maxima_mb_mapeado': round(memoria_mapeado, 1),
+            'mb_por_segundo_bloques': round(tamano_mb / segundos_bloques, 2),
+            'memoria_maxima_mb_bloques': round(_memoria_maxima_mb(), 1),
+            'aceleracion': round(segundos_bloques / segundos_mapeado, 2),
+            'mismo_resultado': mapeado == por_bloques,
+        }
+
+        if comparar:
+            inicio = time.perf_counter()
+            with open(fichero, encoding='utf-8') as f:
+                en_memoria = analizar_texto(f.read())
+            segundos = time.perf_counter() - inicio
+            resultado.update({
+                'mb_por_segundo_en_memoria': round(tamano_mb / segundos, 2),
+                'memoria_maxima_mb_en_memoria': round(_memoria_maxima_mb(), 1),
+                'mismo_resultado': resultado['mismo_resultado'] and en_memoria == mapeado,
+            })
+    return resultado
+
+
+def main():
+    """Función principal del benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmarks del analizador de texto")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    p = subcomandos.add_parser('flujo', help="Análisis por bloques de un fichero grande")
+    p.add_argument('--megas', type=int, default=1024)
+    p.add_argument('--fichero', default=None)
+    p.add_argument('--tam-bloque', type=int, default=TAM_BLOQUE)
+    p.add_argument('--comparar', action='store_true',
+                   help="Analizar también el fichero entero en memoria")
+
+    p = subcomandos.add_parser('corpus', help="Análisis en paralelo de un corpus de ficheros")
+    p.add_argument('--ficheros', type=int, default=2000)
+    p.add_argument('--megas', type=int, default=256)
+    p.add_argument('--procesos', default=None,
+                   help="Números de procesos separados por comas (por defecto 1, 2, 4... hasta los núcleos)")
+
+    p = subcomandos.add_parser('clasificacion', help="analizar_texto con tablas frente a carácter a carácter")
+    p.add_argument('--megas', type=int, default=64)
+
+    p = subcomandos.add_parser('frecuencias', help="Frecuencias exactas frente a memoria acotada")
+    p.add_argument('--palabras', type=int, default=1_000_000)
+    p.add_argument('--vocabulario', type=int, default=300_000)
+    p.add_argument('--max-claves', type=int, default=20_000)
+    p.add_argument('--top', type=int, default=100)
+
+    p = subcomandos.add_parser('incremental', help="Estadísticas de un documento mientras se edita")
+    p.add_argument('--lineas', type=int, default=100_000)
+    p.add_argument('--ediciones', type=int, default=20_000)
+
+    p = subcomandos.add_parser('mapeado', help="Fichero proyectado en memoria frente a bloques de str")
+    p.add_argument('--megas', type=int, default=256)
+    p.add_argument('--fichero', default=None)
+    p.add_argument('--tam-ventana', type=int, default=TAM_VENTANA)
+    p.add_argument('--comparar', action='store_true',
+                   help="Analizar también el fichero entero en memoria")
+
+    args = parser.parse_args()
+
+    if args.comando == 'flujo':
+        resultado = bench_flujo(args.megas, args.fichero, args.tam_bloque, args.comparar)
+    elif args.comando == 'corpus':
+        if args.procesos:
+            procesos = [int(n) for n in args.procesos.split(',')]
+        else:
+            nucleos = os.cpu_count() or 1
+            procesos = sorted({min(2 ** i, nucleos) for i in range(nucleos.bit_length() + 1)})
+        resultado = bench_corpus(args.ficheros, args.megas, procesos)
+    elif args.comando == 'clasificacion':
+        resultado = bench_clasificacion(args.megas)
+    elif args.comando == 'frecuencias':
+        resultado = bench_frecuencias(args.palabras, args.vocabulario, args.max_claves, args.top)
+    elif args.comando == 'incremental':
+        resultado = bench_incremental(args.lineas, args.ediciones)
+    elif args.comando == 'mapeado':
+        resultado = bench_mapeado(args.megas, args.fichero, args.tam_ventana, args.comparar)
+
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
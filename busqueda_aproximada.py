@@ -0,0 +1,241 @@
+"""
+Búsqueda aproximada de palabras por distancia de edición.
+
+Usa el método de borrado simétrico: cada palabra del vocabulario se guarda
+junto con las variantes que resultan de borrarle hasta `max_distancia`
+caracteres. Dos palabras a distancia d o menos comparten al menos una
+variante, así que para buscar basta con generar las variantes de la
+consulta, mirarlas en un diccionario y calcular la distancia de Levenshtein
+solo con los pocos candidatos que aparecen.
+"""
+import heapq
+
+
+def distancia_edicion(a, b, limite=None):
+    """
+    Calcula la distancia de Levenshtein entre dos palabras.
+
+    Args:
+        a (str): Primera palabra
+        b (str): Segunda palabra
+        limite (int, opcional): Si la distancia supera este valor se deja de
+            calcular y se devuelve limite + 1
+
+    Returns:
+        int: Número mínimo de inserciones, borrados y sustituciones
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if limite is None:
+        limite = len(a)
+    if len(a) - len(b) > limite:
+        return limite + 1
+    if not b:
+        return len(a)
+
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        for j, cb in enumerate(b, 1):
+            actual.append(min(anterior[j] + 1,
+                              actual[j - 1] + 1,
+                              anterior[j - 1] + (ca != cb)))
+        if min(actual) > limite:
+            return limite + 1
+        anterior = actual
+    return min(anterior[-1], limite + 1)
+
+
+def borrados(palabra, max_distancia):
+    """
+    Genera las variantes de una palabra con hasta max_distancia caracteres borrados.
+
+    Args:
+        palabra (str): Palabra original
+        max_distancia (int): Número máximo de borrados
+
+    Returns:
+        set: Variantes, incluida la propia palabra
+    """
+    variantes = {palabra}
+    nivel = {palabra}
+    for _ in range(max_distancia):
+        siguiente = set()
+        for v in nivel:
+            for i in range(len(v)):
+                siguiente.add(v[:i] + v[i + 1:])
+        siguiente -= variantes
+        variantes |= siguiente
+        nivel = siguiente
+    return variantes
+
+
+class IndiceBorrados:
+    """
+    Vocabulario de palabras con búsqueda por distancia de edición.
+    """
+
+    def __init__(self, max_distancia=2):
+        """
+        Inicializa un índice vacío.
+
+        Args:
+            max_distancia (int, opcional): Distancia máxima que se podrá buscar
+        """
+        self.max_distancia = max_distancia
+        self._variantes = {}  # variante -> palabra o set de palabras que la generan
+        self._palabras = set()
+
+    def __len__(self):
+        """
+        Número de palabras del vocabulario.
+
+        Returns:
+            int: Palabras indexadas
+        """
+        return len(self._palabras)
+
+    def agregar(self, palabra):
+        """
+        Añade una palabra al vocabulario.
+
+        Args:
+            palabra (str): Palabra a añadir
+        """
+        if palabra in self._palabras:
+            return
+        self._palabras.add(palabra)
+        variantes = self._variantes
+        for v in borrados(palabra, self.max_distancia):
+            actual = variantes.get(v)
+            if actual is None:
+                variantes[v] = palabra
+            elif isinstance(actual, set):
+                actual.add(palabra)
+            else:
+                variantes[v] = {actual, palabra}
+
+    def quitar(self, palabra):
+        """
+        Quita una palabra del vocabulario.
+
+        Args:
+            palabra (str): Palabra a quitar
+        """
+        if palabra not in self._palabras:
+            return
+        self._palabras.discard(palabra)
+        variantes = self._variantes
+        for v in borrados(palabra, self.max_distancia):
+            actual = variantes.get(v)
+            if isinstance(actual, set):
+                actual.discard(palabra)
+                if len(actual) == 1:
+                    variantes[v] = actual.pop()
+            elif actual == palabra:
+                del variantes[v]
+
+    def buscar(self, palabra, max_distancia=None):
+        """
+        Busca las palabras del vocabulario cercanas a una dada.
+
+        Args:
+            palabra (str): Palabra a buscar
+            max_distancia (int, opcional): Distancia máxima; por defecto la del índice
+
+        Returns:
+            dict: Palabra encontrada -> distancia de edición
+        """
+        if max_distancia is None or max_distancia > self.max_distancia:
+            max_distancia = self.max_distancia
+
+        candidatos = set()
+        variantes = self._variantes
+        for v in borrados(palabra, max_distancia):
+            actual = variantes.get(v)
+            if actual is None:
+                continue
+            if isinstance(actual, set):
+                candidatos |= actual
+            else:
+                candidatos.add(actual)
+
+        encontradas = {}
+        for candidato in candidatos:
+            d = distancia_edicion(palabra, candidato, max_distancia)
+            if d <= max_distancia:
+                encontradas[candidato] = d
+        return encontradas
+
+
+def mejores_coincidencias(consulta, buscar_palabra, ids_con_palabra, max_distancia, k):
+    """
+    Obtiene los k registros más cercanos a una consulta de varias palabras.
+
+    La distancia de un registro es la suma, para cada palabra de la consulta,
+    de la distancia a la palabra más parecida del registro. Los conjuntos de
+    registros se combinan con intersecciones de menor a mayor distancia, de
+    modo que solo se ordenan los del último nivel necesario.
+
+    Args:
+        consulta (list): Palabras buscadas, ya normalizadas
+        buscar_palabra (callable): Palabra -> dict {palabra indexada: distancia}
+        ids_con_palabra (callable): Palabra indexada -> set de identificadores
+        max_distancia (int): Distancia total máxima
+        k (int): Número máximo de resultados
+
+    Returns:
+        list: Tuplas (identificador, distancia) ordenadas por distancia y,
+              a igual distancia, por identificador
+    """
+    # Para cada palabra buscada, palabras del índice agrupadas por distancia
+    coincidencias = []
+    for palabra in consulta:
+        por_distancia = [[] for _ in range(max_distancia + 1)]
+        for encontrada, d in buscar_palabra(palabra).items():
+            por_distancia[d].append(encontrada)
+        coincidencias.append(por_distancia)
+
+    uniones = {}
+
+    def ids_a_distancia(i, d):
+        # Registros con alguna palabra a distancia d de la palabra buscada i
+        if (i, d) not in uniones:
+            listas = [ids_con_palabra(p) for p in coincidencias[i][d]]
+            if len(listas) == 1:
+                uniones[i, d] = listas[0]
+            else:
+                uniones[i, d] = set().union(*listas)
+        return uniones[i, d]
+
+    def repartos(total, palabras):
+        # Formas de repartir la distancia total entre las palabras buscadas
+        if palabras == 1:
+            yield (total,)
+            return
+        for d in range(total + 1):
+            for resto in repartos(total - d, palabras - 1):
+                yield (d,) + resto
+
+    # Recorremos las distancias de menor a mayor: un registro aparece por
+    # primera vez en la suma de sus distancias mínimas a cada palabra
+    resultados = []
+    vistos = set()
+    for total in range(max_distancia + 1):
+        nivel = set()
+        for reparto in repartos(total, len(consulta)):
+            listas = [ids_a_distancia(i, d) for i, d in enumerate(reparto)]
+            if not all(listas):
+                continue
+            listas.sort(key=len)
+            nivel |= listas[0].intersection(*listas[1:])
+        nivel -= vistos
+        for ident in heapq.nsmallest(k - len(resultados), nivel):
+            resultados.append((ident, total))
+        if len(resultados) >= k:
+            break
+        vistos |= nivel
+
+    return resultados
@@ -0,0 +1,196 @@
+"""
+Caché de resultados de las búsquedas de la agenda.
+
+Guarda los resultados de buscar_contacto y buscar_por_termino en una caché
+LRU acotada. Cuando un contacto cambia solo se descartan las consultas cuyo
+resultado puede cambiar:
+
+  - las búsquedas por nombre con el mismo nombre normalizado,
+  - las búsquedas por término cuyo término aparece en alguno de los textos
+    que cambian (el valor anterior o el nuevo).
+
+Para encontrar esos términos sin recorrer la caché, cada término de 3 o más
+caracteres se registra bajo su primer trigrama; basta con mirar los
+trigramas de los textos modificados. Los términos más cortos se comprueban
+uno a uno.
+
+Cada invalidación incrementa la versión de la caché. Un resultado calculado
+con una versión anterior (porque la agenda cambió mientras se calculaba) no
+se guarda.
+"""
+from collections import OrderedDict
+
+
+def _trigramas(texto):
+    """
+    Trigramas distintos de un texto.
+    """
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class CacheConsultas:
+    """
+    Caché LRU de búsquedas por nombre y por término con invalidación selectiva.
+    """
+
+    def __init__(self, capacidad=10_000):
+        """
+        Inicializa una caché vacía.
+
+        Args:
+            capacidad (int, opcional): Número máximo de consultas guardadas (0 la desactiva)
+        """
+        self.capacidad = capacidad
+        self.version = 0
+        # ('nombre', nombre tal cual) o ('termino', término en minúsculas)
+        #   -> (tupla de contactos, nombre normalizado o None)
+        self._entradas = OrderedDict()
+        self._por_clave = {}     # nombre normalizado -> nombres consultados con esa clave
+        self._por_trigrama = {}  # primer trigrama -> términos guardados
+        self._cortos = set()     # términos de menos de 3 caracteres
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+        self.invalidaciones = 0
+
+    def __len__(self):
+        """
+        Número de consultas guardadas.
+
+        Returns:
+            int: Entradas de la caché
+        """
+        return len(self._entradas)
+
+    def obtener(self, tipo, consulta):
+        """
+        Busca el resultado guardado de una consulta.
+
+        Args:
+            tipo (str): 'nombre' o 'termino'
+            consulta (str): Nombre consultado o término en minúsculas
+
+        Returns:
+            tuple o None: Contactos del resultado o None si no está guardado
+        """
+        clave = (tipo, consulta)
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            self.fallos += 1
+            return None
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return entrada[0]
+
+    def guardar(self, tipo, consulta, resultado, version, clave_nombre=None):
+        """
+        Guarda el resultado de una consulta.
+
+        Args:
+            tipo (str): 'nombre' o 'termino'
+            consulta (str): Nombre consultado o término en minúsculas
+            resultado (tuple): Contactos del resultado
+            version (int): Versión de la caché cuando empezó la consulta
+            clave_nombre (str, opcional): Nombre normalizado (solo para 'nombre')
+        """
+        if not self.capacidad or version != self.version:
+            return
+
+        clave = (tipo, consulta)
+        if clave not in self._entradas:
+            if tipo == 'nombre':
+                self._por_clave.setdefault(clave_nombre, set()).add(consulta)
+            elif len(consulta) < 3:
+                self._cortos.add(consulta)
+            else:
+                self._por_trigrama.setdefault(consulta[:3], set()).add(consulta)
+        self._entradas[clave] = (resultado, clave_nombre)
+        self._entradas.move_to_end(clave)
+
+        while len(self._entradas) > self.capacidad:
+            (tipo_antiguo, consulta_antigua), (_, clave_antigua) = self._entradas.popitem(last=False)
+            self._desregistrar(tipo_antiguo, consulta_antigua, clave_antigua)
+            self.expulsiones += 1
+
+    def _desregistrar(self, tipo, consulta, clave_nombre=None):
+        """
+        Quita una consulta de los registros usados para invalidar.
+        """
+        if tipo == 'nombre':
+            nombres = self._por_clave.get(clave_nombre)
+            if nombres is not None:
+                nombres.discard(consulta)
+                if not nombres:
+                    del self._por_clave[clave_nombre]
+        elif len(consulta) < 3:
+            self._cortos.discard(consulta)
+        else:
+            terminos = self._por_trigrama.get(consulta[:3])
+            if terminos is not None:
+                terminos.discard(consulta)
+                if not terminos:
+                    del self._por_trigrama[consulta[:3]]
+
+    def invalidar_nombre(self, clave_nombre):
+        """
+        Descarta las búsquedas por nombre de un nombre normalizado.
+
+        Args:
+            clave_nombre (str): Nombre normalizado que se ha agregado o eliminado
+        """
+        self.version += 1
+        for nombre in self._por_clave.pop(clave_nombre, ()):
+            del self._entradas[('nombre', nombre)]
+            self.invalidaciones += 1
+
+    def invalidar_textos(self, *textos):
+        """
+        Descarta las búsquedas por término cuyo término aparece en alguno de los textos.
+
+        Args:
+            *textos (str): Campos del contacto que cambian (valores anteriores y nuevos)
+        """
+        self.version += 1
+        if not self._entradas:
+            return
+        textos = [t.lower() for t in textos]
+        afectados = {c for c in self._cortos if any(c in t for t in textos)}
+        for texto in textos:
+            for trigrama in _trigramas(texto):
+                for termino in self._por_trigrama.get(trigrama, ()):
+                    if termino in texto:
+                        afectados.add(termino)
+
+        for termino in afectados:
+            del self._entradas[('termino', termino)]
+            self._desregistrar('termino', termino)
+            self.invalidaciones += 1
+
+    def invalidar_todo(self):
+        """
+        Descarta todas las consultas guardadas.
+        """
+        self.version += 1
+        self.invalidaciones += len(self._entradas)
+        self._entradas.clear()
+        self._por_clave.clear()
+        self._por_trigrama.clear()
+        self._cortos.clear()
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de uso de la caché.
+
+        Returns:
+            dict: Entradas, capacidad, aciertos, fallos, expulsiones e invalidaciones
+        """
+        consultas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._entradas),
+            'capacidad': self.capacidad,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0.0,
+            'expulsiones': self.expulsiones,
+            'invalidaciones': self.invalidaciones,
+        }
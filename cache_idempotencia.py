@@ -0,0 +1,122 @@
+"""
+Caché acotada de claves de idempotencia.
+
+Guarda el resultado de las operaciones recientes para que un cliente que
+reintenta una operación con la misma clave reciba el resultado original sin
+que la operación se aplique dos veces. La memoria está limitada por una
+capacidad máxima (expulsión LRU) y por un tiempo de vida (TTL).
+"""
+import time
+from collections import OrderedDict
+
+
+class CacheIdempotencia:
+    """
+    Caché LRU con caducidad para resultados de operaciones idempotentes.
+    """
+
+    # Fuente de tiempo; se puede sustituir para simular el paso del tiempo
+    reloj = staticmethod(time.monotonic)
+
+    def __init__(self, capacidad=100_000, ttl=24 * 3600):
+        """
+        Inicializa una caché vacía.
+
+        Args:
+            capacidad (int, opcional): Número máximo de claves guardadas
+            ttl (float, opcional): Segundos que se recuerda cada clave. Por defecto 24 h
+        """
+        self.capacidad = capacidad
+        self.ttl = ttl
+        self._entradas = OrderedDict()  # clave -> (instante de caducidad, valor), en orden de uso
+        # Las mismas claves en orden de inserción: con un TTL fijo es también
+        # el orden de caducidad, aunque una clave muy consultada siga al final del LRU
+        self._caducidades = OrderedDict()  # clave -> instante de caducidad
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones_lru = 0
+        self.expulsiones_ttl = 0
+
+    def __len__(self):
+        """
+        Número de claves guardadas.
+
+        Returns:
+            int: Claves presentes en la caché (incluidas las caducadas aún no purgadas)
+        """
+        return len(self._entradas)
+
+    def obtener(self, clave):
+        """
+        Busca el valor asociado a una clave.
+
+        Args:
+            clave (str): Clave de idempotencia
+
+        Returns:
+            object o None: El valor guardado o None si la clave no está o ha caducado
+        """
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            self.fallos += 1
+            return None
+
+        if entrada[0] <= self.reloj():
+            del self._entradas[clave]
+            del self._caducidades[clave]
+            self.expulsiones_ttl += 1
+            self.fallos += 1
+            return None
+
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return entrada[1]
+
+    def guardar(self, clave, valor):
+        """
+        Guarda el valor de una clave, expulsando las entradas caducadas o menos usadas.
+
+        Args:
+            clave (str): Clave de idempotencia
+            valor (object): Valor a recordar (no puede ser None)
+        """
+        ahora = self.reloj()
+        entradas = self._entradas
+        caducidades = self._caducidades
+        caducidad = ahora + self.ttl
+        entradas[clave] = (caducidad, valor)
+        entradas.move_to_end(clave)
+        caducidades[clave] = caducidad
+        caducidades.move_to_end(clave)
+
+        # Las caducadas se purgan por orden de inserción, no de uso: una clave
+        # consultada a menudo queda al final del LRU aunque ya haya caducado
+        while caducidades:
+            clave_antigua, caducidad = next(iter(caducidades.items()))
+            if caducidad > ahora:
+                break
+            del caducidades[clave_antigua]
+            del entradas[clave_antigua]
+            self.expulsiones_ttl += 1
+
+        while len(entradas) > self.capacidad:
+            clave_antigua, _ = entradas.popitem(last=False)
+            del caducidades[clave_antigua]
+            self.expulsiones_lru += 1
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de uso de la caché.
+
+        Returns:
+            dict: Entradas, capacidad, aciertos, fallos y expulsiones
+        """
+        return {
+            'entradas': len(self._entradas),
+            'capacidad': self.capacidad,
+            'ttl': self.ttl,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'expulsiones_lru': self.expulsiones_lru,
+            'expulsiones_ttl': self.expulsiones_ttl,
+        }
@@ -0,0 +1,330 @@
+"""
+Conciliación del libro mayor de un SistemaBancario.
+
+Comprueba en paralelo que:
+  - el saldo de cada cuenta coincide con la reproducción de sus movimientos
+    (cadena de 'saldo_resultante'),
+  - cada 'Transferencia enviada' tiene su 'Transferencia recibida' en la
+    cuenta contraria, con la misma cantidad,
+  - el total del banco es igual a lo depositado menos lo retirado.
+
+Las transferencias no se emparejan una a una en memoria: cada proceso suma
+una firma (crc32) de cada transferencia en una tabla de cubetas, sumando las
+enviadas y restando las recibidas. Las cubetas que no quedan a cero señalan
+las transferencias descuadradas, que se localizan con una segunda pasada
+solo sobre esas cubetas.
+"""
+import multiprocessing
+import os
+import zlib
+from collections import namedtuple
+
+# Efecto de cada tipo de movimiento sobre el saldo
+EFECTO_MOVIMIENTO = {
+    'Depósito inicial': 1,
+    'Depósito': 1,
+    'Retiro': -1,
+    'Transferencia enviada': -1,
+    'Transferencia recibida': 1,
+    'Cierre de cuenta': -1,
+}
+
+TOLERANCIA = 1e-6
+CUBETAS = 1 << 16
+
+Discrepancia = namedtuple('Discrepancia', 'numero_cuenta indice tipo detalle')
+Discrepancia.__doc__ = """
+Problema encontrado en una cuenta.
+
+`indice` es la posición del movimiento en `cuenta.movimientos` (empezando en
+0), o el número de movimientos si el problema es el saldo final.
+"""
+
+# Cuentas a conciliar; los procesos creados con fork las heredan sin copiarlas
+_CUENTAS = None
+
+
+def _firma_transferencia(origen, destino, cantidad):
+    """
+    Calcula una firma estable de una transferencia (igual en todos los procesos).
+    """
+    return zlib.crc32(f"{origen}\x00{destino}\x00{cantidad!r}".encode())
+
+
+def _datos_bloque(tarea):
+    """
+    Obtiene las cuentas de una tarea: un rango de _CUENTAS o los datos ya copiados.
+
+    Returns:
+        list: Tuplas (numero_cuenta, saldo, movimientos)
+    """
+    if isinstance(tarea, tuple):
+        inicio, fin = tarea
+        return [(c.numero_cuenta, c.saldo, c.movimientos) for c in _CUENTAS[inicio:fin]]
+    return tarea
+
+
+def _conciliar_bloque(tarea):
+    """
+    Reproduce los movimientos de un bloque de cuentas.
+
+    Returns:
+        tuple: (discrepancias, nº de movimientos, total real, total esperado,
+                cuentas de cubetas, sumas de firmas de cubetas)
+    """
+    discrepancias = []
+    movimientos_vistos = 0
+    total_real = 0.0
+    total_esperado = 0.0
+    cuentas_cubeta = [0] * CUBETAS
+    firmas_cubeta = [0] * CUBETAS
+    mascara = CUBETAS - 1
+    efecto = EFECTO_MOVIMIENTO.get
+    firma = _firma_transferencia
+
+    for numero, saldo_final, movimientos in _datos_bloque(tarea):
+        saldo = 0.0
+        for i, mov in enumerate(movimientos):
+            tipo = mov['tipo']
+            signo = efecto(tipo)
+            if signo is None:
+                discrepancias.append(Discrepancia(numero, i, 'tipo_desconocido',
+                                                  f"Tipo de movimiento desconocido: {tipo!r}"))
+                continue
+
+            cantidad = mov['cantidad']
+            saldo += cantidad if signo > 0 else -cantidad
+
+            if abs(saldo - mov['saldo_resultante']) > TOLERANCIA:
+                discrepancias.append(Discrepancia(
+                    numero, i, 'saldo_resultante',
+                    f"Se esperaba {saldo:.2f} € y consta {mov['saldo_resultante']:.2f} €"))
+                # Seguimos desde el valor registrado para no arrastrar el error
+                saldo = mov['saldo_resultante']
+
+            if tipo == 'Transferencia enviada':
+                h = firma(numero, mov['destinatario'], cantidad)
+                cuentas_cubeta[h & mascara] += 1
+                firmas_cubeta[h & mascara] += h
+            elif tipo == 'Transferencia recibida':
+                h = firma(mov['remitente'], numero, cantidad)
+                cuentas_cubeta[h & mascara] -= 1
+                firmas_cubeta[h & mascara] -= h
+            else:
+                total_esperado += cantidad if signo > 0 else -cantidad
+
+        if abs(saldo - saldo_final) > TOLERANCIA:
+            discrepancias.append(Discrepancia(
+                numero, len(movimientos), 'saldo_final',
+                f"Los movimientos suman {saldo:.2f} € pero el saldo es {saldo_final:.2f} €"))
+
+        movimientos_vistos += len(movimientos)
+        total_real += saldo_final
+
+    return (discrepancias, movimientos_vistos, total_real, total_esperado,
+            cuentas_cubeta, firmas_cubeta)
+
+
+def _localizar_transferencias(argumentos):
+    """
+    Segunda pasada: lista las transferencias que caen en las cubetas descuadradas.
+
+    Returns:
+        list: Tuplas (papel, numero_cuenta, índice, contraparte, cantidad)
+    """
+    tarea, cubetas = argumentos
+    mascara = CUBETAS - 1
+    encontradas = []
+
+    for numero, _, movimientos in _datos_bloque(tarea):
+        for i, mov in enumerate(movimientos):
+            tipo = mov['tipo']
+            if tipo == 'Transferencia enviada':
+                h = _firma_transferencia(numero, mov['destinatario'], mov['cantidad'])
+                if h & mascara in cubetas:
+                    encontradas.append(('enviada', numero, i, mov['destinatario'], mov['cantidad']))
+            elif tipo == 'Transferencia recibida':
+                h = _firma_transferencia(mov['remitente'], numero, mov['cantidad'])
+                if h & mascara in cubetas:
+                    encontradas.append(('recibida', numero, i, mov['remitente'], mov['cantidad']))
+    return encontradas
+
+
+def _transferencias_descuadradas(encontradas):
+    """
+    Empareja las transferencias localizadas y devuelve las que no tienen pareja.
+
+    Returns:
+        list: Discrepancias de tipo 'transferencia_sin_contrapartida'
+    """
+    pendientes = {}  # (origen, destino, cantidad) -> {'enviada': [...], 'recibida': [...]}
+    for papel, numero, indice, contraparte, cantidad in encontradas:
+        clave = (numero, contraparte, cantidad) if papel == 'enviada' else (contraparte, numero, cantidad)
+        pendientes.setdefault(clave, {'enviada': [], 'recibida': []})[papel].append((numero, indice))
+
+    discrepancias = []
+    for (origen, destino, cantidad), lados in pendientes.items():
+        sobrantes = len(lados['enviada']) - len(lados['recibida'])
+        if sobrantes > 0:
+            for numero, indice in lados['enviada'][-sobrantes:]:
+                discrepancias.append(Discrepancia(
+                    numero, indice, 'transferencia_sin_contrapartida',
+                    f"Envío de {cantidad:.2f} € a {destino} sin recepción en la cuenta destino"))
+        elif sobrantes < 0:
+            for numero, indice in lados['recibida'][sobrantes:]:
+                discrepancias.append(Discrepancia(
+                    numero, indice, 'transferencia_sin_contrapartida',
+                    f"Recepción de {cantidad:.2f} € desde {origen} sin envío en la cuenta origen"))
+    return discrepancias
+
+
+class InformeConciliacion:
+    """
+    Resultado de una conciliación.
+    """
+
+    def __init__(self, cuentas, movimientos, discrepancias, total_real, total_esperado):
+        """
+        Inicializa el informe.
+
+        Args:
+            cuentas (int): Número de cuentas revisadas
+            movimientos (int): Número de movimientos revisados
+            discrepancias (list): Discrepancias encontradas
+            total_real (float): Suma de los saldos de las cuentas
+            total_esperado (float): Depósitos menos retiros y cierres
+        """
+        self.cuentas = cuentas
+        self.movimientos = movimientos
+        self.discrepancias = discrepancias
+        self.total_real = total_real
+        self.total_esperado = total_esperado
+
+    @property
+    def total_conservado(self):
+        """
+        Indica si el total del banco coincide con el flujo externo de dinero.
+
+        Returns:
+            bool: True si el total se conserva
+        """
+        escala = max(1.0, abs(self.total_esperado))
+        return abs(self.total_real - self.total_esperado) <= TOLERANCIA * escala
+
+    @property
+    def correcto(self):
+        """
+        Indica si los libros cuadran por completo.
+
+        Returns:
+            bool: True si no hay discrepancias y el total se conserva
+        """
+        return not self.discrepancias and self.total_conservado
+
+    def mostrar(self):
+        """
+        Muestra el informe por pantalla.
+        """
+        print("\n=== CONCILIACIÓN DEL BANCO ===")
+        print(f"Cuentas revisadas: {self.cuentas}")
+        print(f"Movimientos revisados: {self.movimientos}")
+        print(f"Total en cuentas: {self.total_real:.2f} €")
+        print(f"Total esperado: {self.total_esperado:.2f} €")
+
+        if self.correcto:
+            print("Los libros cuadran.")
+            return
+
+        if not self.total_conservado:
+            print("Error: El total del banco no se conserva.")
+        for d in self.discrepancias:
+            print(f"  Cuenta {d.numero_cuenta}, movimiento #{d.indice}: {d.detalle}")
+
+
+def _tareas(cuentas, procesos, por_rango):
+    """
+    Reparte las cuentas en bloques de trabajo.
+
+    Sin fork, los bloques llevan los datos de las cuentas. Los historiales se
+    copian aquí, con el cerrojo adquirido, porque pool.map los serializa más
+    tarde, cuando los escritores ya pueden haberlos modificado.
+    """
+    tam = max(1, -(-len(cuentas) // (procesos * 8)))
+    if por_rango:
+        return [(i, min(i + tam, len(cuentas))) for i in range(0, len(cuentas), tam)]
+    return [[(c.numero_cuenta, c.saldo, tuple(c.movimientos)) for c in cuentas[i:i + tam]]
+            for i in range(0, len(cuentas), tam)]
+
+
+def conciliar(sistema, procesos=None):
+    """
+    Concilia todas las cuentas de un SistemaBancario.
+
+    Con fork disponible, los procesos heredan una copia del banco tomada con
+    el cerrojo de escritura adquirido, así que ven un estado coherente
+    aunque el banco siga recibiendo operaciones. Sin fork, los saldos y los
+    historiales se copian con el cerrojo adquirido. Con un solo proceso se
+    trabaja sobre una instantánea.
+
+    Args:
+        sistema (SistemaBancario): Banco a conciliar
+        procesos (int, opcional): Número de procesos. Por defecto, uno por núcleo
+
+    Returns:
+        InformeConciliacion: Resultado de la conciliación
+    """
+    global _CUENTAS
+    procesos = procesos or os.cpu_count() or 1
+
+    pool = None
+    try:
+        if procesos == 1:
+            with sistema.instantanea() as instantanea:
+                cuentas = [(v.numero_cuenta, v.saldo, instantanea.movimientos(v.numero_cuenta))
+                           for v in instantanea.cuentas()]
+            tareas = [cuentas]
+            resultados = [_conciliar_bloque(cuentas)]
+        else:
+            usar_fork = 'fork' in multiprocessing.get_all_start_methods()
+            contexto = multiprocessing.get_context('fork' if usar_fork else None)
+            with sistema._cerrojo:
+                cuentas = list(sistema.cuentas.values())
+                _CUENTAS = cuentas
+                tareas = _tareas(cuentas, procesos, por_rango=usar_fork)
+                # Los procesos se crean aquí: con fork copian el banco en este instante
+                pool = contexto.Pool(procesos)
+            _CUENTAS = None
+            resultados = pool.map(_conciliar_bloque, tareas)
+
+        discrepancias = []
+        movimientos = 0
+        total_real = 0.0
+        total_esperado = 0.0
+        cuentas_cubeta = [0] * CUBETAS
+        firmas_cubeta = [0] * CUBETAS
+
+        for disc, movs, real, esperado, cuentas_b, firmas_b in resultados:
+            discrepancias.extend(disc)
+            movimientos += movs
+            total_real += real
+            total_esperado += esperado
+            cuentas_cubeta = [a + b for a, b in zip(cuentas_cubeta, cuentas_b)]
+            firmas_cubeta = [a + b for a, b in zip(firmas_cubeta, firmas_b)]
+
+        descuadradas = frozenset(i for i in range(CUBETAS) if cuentas_cubeta[i] or firmas_cubeta[i])
+        if descuadradas:
+            argumentos = [(tarea, descuadradas) for tarea in tareas]
+            if pool is None:
+                encontradas = _localizar_transferencias(argumentos[0])
+            else:
+                encontradas = [t for r in pool.map(_localizar_transferencias, argumentos) for t in r]
+            discrepancias.extend(_transferencias_descuadradas(encontradas))
+    finally:
+        # Los procesos no deben quedar vivos aunque falle alguna de las fases
+        _CUENTAS = None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    discrepancias.sort(key=lambda d: (d.numero_cuenta, d.indice))
+    return InformeConciliacion(len(cuentas), movimientos, discrepancias, total_real, total_esperado)
@@ -0,0 +1,401 @@
+"""
+Detección y fusión de contactos duplicados.
+
+Comparar todos los pares de contactos es cuadrático. En su lugar se agrupan
+los contactos por claves de bloqueo (teléfono normalizado, parte local del
+email y clave fonética del nombre) y solo se puntúan los pares que
+comparten alguna clave. Tanto el cálculo de las claves como la puntuación
+se reparten entre varios procesos.
+
+Los pares que superan el umbral se agrupan (unión-búsqueda) y cada grupo se
+convierte en una fusión: se conserva el contacto más antiguo, completado con
+el teléfono y el email de los demás, y se eliminan el resto. El plan se
+aplica después a la agenda de una vez con Agenda.aplicar_fusiones.
+"""
+import multiprocessing
+import os
+import re
+from collections import namedtuple
+
+from agenda_contactos import normalizar_nombre
+from busqueda_aproximada import distancia_edicion
+from trie_telefonos import normalizar_telefono
+
+# Peso de cada coincidencia en la puntuación de un par (la suma máxima es 1)
+PESOS = {
+    'telefono': 0.35,
+    'email': 0.35,
+    'usuario_email': 0.15,
+    'nombre': 0.2,
+    'fonetica': 0.1,
+}
+
+UMBRAL = 0.5
+
+# Los bloques más grandes (una clave muy común) no distinguen a nadie y se descartan
+MAX_BLOQUE = 200
+
+Fusion = namedtuple('Fusion', 'conservar eliminar telefono email puntuacion')
+Fusion.__doc__ = """
+Fusión de un grupo de contactos duplicados.
+
+`conservar` es el nombre del contacto que se queda, `eliminar` los nombres de
+los que desaparecen, `telefono` y `email` los datos finales del contacto
+conservado y `puntuacion` la menor puntuación de los pares que unieron el grupo.
+"""
+
+# Reglas fonéticas para el español, en orden de aplicación
+_REGLAS_FONETICAS = [
+    (re.compile(r'ch'), '0'),         # se protege la ch antes de quitar las haches
+    (re.compile(r'h'), ''),
+    (re.compile(r'qu(?=[ei])'), 'k'),
+    (re.compile(r'gu(?=[ei])'), 'g'),
+    (re.compile(r'g(?=[ei])'), 'j'),
+    (re.compile(r'c(?=[ei])'), 's'),
+    (re.compile(r'[cq]'), 'k'),
+    (re.compile(r'z'), 's'),
+    (re.compile(r'^x'), 'j'),         # Xavier, Ximena
+    (re.compile(r'x'), 'ks'),
+    (re.compile(r'[vw]'), 'b'),
+    (re.compile(r'll'), 'y'),
+    (re.compile(r'ñ'), 'ny'),
+    (re.compile(r'y$'), 'i'),
+    (re.compile(r'(.)\1+'), r'\1'),   # letras repetidas
+]
+
+# Registros (nombre, telefono, email) que se comparan; los procesos creados con fork los heredan
+_REGISTROS = None
+# Claves de los bloques que se comparan (no descartados por grandes); se publican igual
+_CONSERVADAS = None
+
+
+def clave_fonetica(nombre):
+    """
+    Obtiene una clave que coincide en nombres que suenan igual en español.
+
+    "Javier Pérez" y "Xavier Perez", o "Álvarez" y "Albares", tienen la misma
+    clave. Las palabras se ordenan para que "García Ana" y "Ana García"
+    coincidan, y se ignoran los números.
+
+    Args:
+        nombre (str): Nombre a codificar
+
+    Returns:
+        str: Clave fonética (vacía si el nombre solo tiene números)
+    """
+    palabras = []
+    for palabra in normalizar_nombre(nombre).split():
+        if palabra.isdigit():
+            continue
+        for patron, sustituto in _REGLAS_FONETICAS:
+            palabra = patron.sub(sustituto, palabra)
+        palabras.append(palabra.replace('0', 'ch'))
+    return ' '.join(sorted(palabras))
+
+
+def _usuario_email(email):
+    """
+    Parte local de un email en minúsculas, sin la etiqueta '+...'.
+    """
+    usuario, arroba, _ = email.strip().lower().partition('@')
+    if not arroba:
+        return ""
+    return usuario.split('+', 1)[0]
+
+
+def _claves_registro(registro):
+    """
+    Claves de bloqueo de un registro (nombre, telefono, email).
+    """
+    nombre, telefono, email = registro
+    claves = []
+    numero = normalizar_telefono(telefono)
+    if numero is not None:
+        claves.append('tel:' + numero)
+    usuario = _usuario_email(email)
+    if usuario:
+        claves.append('mail:' + usuario)
+    fonetica = clave_fonetica(nombre)
+    if fonetica:
+        claves.append('fon:' + fonetica)
+    return claves
+
+
+def _claves_rango(rango):
+    """
+    Calcula las claves de bloqueo de un rango de _REGISTROS.
+
+    Returns:
+        list: Pares (clave, índice del registro)
+    """
+    inicio, fin = rango
+    return [(clave, i) for i in range(inicio, fin) for clave in _claves_registro(_REGISTROS[i])]
+
+
+def _preparar(registro):
+    """
+    Campos normalizados de un registro: (teléfono, email, usuario del email).
+    """
+    email = registro[2].strip().lower()
+    return normalizar_telefono(registro[1]), email, _usuario_email(email)
+
+
+def puntuar(a, b, umbral=0.0, preparados=None):
+    """
+    Puntúa el parecido de dos registros (nombre, telefono, email) entre 0 y 1.
+
+    Args:
+        a (tuple): Primer registro
+        b (tuple): Segundo registro
+        umbral (float, opcional): Si con los teléfonos y los emails el par ya
+            no puede llegar a esta puntuación, no se comparan los nombres
+        preparados (tuple, opcional): Resultado de _preparar para a y para b,
+            si ya se tiene
+
+    Returns:
+        float: Suma de los pesos de las coincidencias (menor que el umbral si
+               se dejó de calcular)
+    """
+    (numero_a, email_a, usuario_a), (numero_b, email_b, usuario_b) = (
+        preparados or (_preparar(a), _preparar(b)))
+    puntos = 0.0
+    if numero_a is not None and numero_a == numero_b:
+        puntos += PESOS['telefono']
+    if email_a and email_a == email_b:
+        puntos += PESOS['email']
+    elif usuario_a and usuario_a == usuario_b:
+        puntos += PESOS['usuario_email']
+
+    if puntos + PESOS['nombre'] + PESOS['fonetica'] < umbral:
+        return puntos
+
+    nombre_a, nombre_b = normalizar_nombre(a[0]), normalizar_nombre(b[0])
+    largo = max(len(nombre_a), len(nombre_b), 1)
+    puntos += PESOS['nombre'] * (1 - distancia_edicion(nombre_a, nombre_b) / largo)
+    if clave_fonetica(a[0]) == clave_fonetica(b[0]):
+        puntos += PESOS['fonetica']
+    return puntos
+
+
+def _puntuar_bloques(tarea):
+    """
+    Puntúa los pares de una lista de bloques.
+
+    Un par que comparte varias claves solo se puntúa en el bloque de su
+    menor clave común entre las de los bloques conservados, así que ningún
+    par se evalúa dos veces ni se pierde porque esa clave sea la de un
+    bloque descartado.
+
+    Returns:
+        tuple: (pares evaluados, lista de (i, j, puntuación) que superan el umbral)
+    """
+    bloques, umbral = tarea
+    claves = {}
+    preparados = {}
+    evaluados = 0
+    duplicados = []
+    for clave, indices in bloques:
+        for i in indices:
+            if i not in claves:
+                claves[i] = set(_claves_registro(_REGISTROS[i]))
+                preparados[i] = _preparar(_REGISTROS[i])
+        for posicion, i in enumerate(indices):
+            claves_i = claves[i]
+            for j in indices[posicion + 1:]:
+                comunes = claves_i & claves[j]
+                if len(comunes) > 1 and min(comunes & _CONSERVADAS) != clave:
+                    continue
+                evaluados += 1
+                puntuacion = puntuar(_REGISTROS[i], _REGISTROS[j], umbral,
+                                     (preparados[i], preparados[j]))
+                if puntuacion >= umbral:
+                    duplicados.append((min(i, j), max(i, j), puntuacion))
+    return evaluados, duplicados
+
+
+def _agrupar(pares):
+    """
+    Une los pares duplicados en grupos (unión-búsqueda).
+
+    Returns:
+        dict: Representante -> (índices del grupo, menor puntuación)
+    """
+    padre = {}
+
+    def raiz(i):
+        while padre.get(i, i) != i:
+            padre[i] = padre.get(padre[i], padre[i])
+            i = padre[i]
+        return i
+
+    for i, j, _ in pares:
+        ri, rj = raiz(i), raiz(j)
+        if ri != rj:
+            # El representante es siempre el más antiguo
+            padre[max(ri, rj)] = min(ri, rj)
+
+    grupos = {}
+    for i, j, puntuacion in pares:
+        r = raiz(i)
+        miembros, minima = grupos.get(r, (set(), puntuacion))
+        miembros.update((i, j))
+        grupos[r] = (miembros, min(minima, puntuacion))
+    return grupos
+
+
+class PlanFusion:
+    """
+    Fusiones propuestas para una agenda, con las estadísticas de la detección.
+    """
+
+    def __init__(self, fusiones, contactos, bloques, bloques_descartados, pares_evaluados):
+        """
+        Inicializa el plan.
+
+        Args:
+            fusiones (list): Fusiones a aplicar
+            contactos (int): Contactos revisados
+            bloques (int): Bloques con más de un contacto
+            bloques_descartados (int): Bloques descartados por ser demasiado grandes
+            pares_evaluados (int): Pares puntuados
+        """
+        self.fusiones = fusiones
+        self.contactos = contactos
+        self.bloques = bloques
+        self.bloques_descartados = bloques_descartados
+        self.pares_evaluados = pares_evaluados
+
+    def __len__(self):
+        return len(self.fusiones)
+
+    def __iter__(self):
+        return iter(self.fusiones)
+
+    def mostrar(self):
+        """
+        Muestra el plan por pantalla.
+        """
+        print("\n=== CONTACTOS DUPLICADOS ===")
+        print(f"Contactos revisados: {self.contactos}")
+        print(f"Pares comparados: {self.pares_evaluados} "
+              f"(de {self.contactos * (self.contactos - 1) // 2} posibles)")
+        if self.bloques_descartados:
+            print(f"Bloques descartados por demasiado comunes: {self.bloques_descartados}")
+
+        if not self.fusiones:
+            print("No se encontraron duplicados.")
+            return
+        for fusion in self.fusiones:
+            print(f"\n'{fusion.conservar}' (puntuación {fusion.puntuacion:.2f}) absorbe a:")
+            for nombre in fusion.eliminar:
+                print(f"  - {nombre}")
+            print(f"  Teléfono: {fusion.telefono}  Email: {fusion.email}")
+
+
+def _repartir(elementos, partes):
+    """
+    Divide una lista en `partes` trozos de tamaño parecido.
+    """
+    tam = max(1, -(-len(elementos) // partes))
+    return [elementos[i:i + tam] for i in range(0, len(elementos), tam)]
+
+
+def detectar_duplicados(agenda, umbral=UMBRAL, procesos=None, max_bloque=MAX_BLOQUE):
+    """
+    Busca contactos duplicados en una agenda y propone cómo fusionarlos.
+
+    Args:
+        agenda (Agenda): Agenda a revisar (se recorre en orden de inserción)
+        umbral (float, opcional): Puntuación mínima para considerar duplicado un par
+        procesos (int, opcional): Número de procesos. Por defecto, uno por núcleo
+        max_bloque (int, opcional): Tamaño máximo de un bloque para compararlo
+
+    Returns:
+        PlanFusion: Fusiones propuestas
+    """
+    global _REGISTROS, _CONSERVADAS
+    procesos = procesos or os.cpu_count() or 1
+    registros = [(c.nombre, c.telefono, c.email) for c in agenda]
+    if len(registros) < 2:
+        procesos = 1
+    _REGISTROS = registros
+
+    try:
+        # 1. Claves de bloqueo
+        tam = max(1, -(-len(registros) // (procesos * 4)))
+        rangos = [(i, min(i + tam, len(registros))) for i in range(0, len(registros), tam)]
+        bloques = {}
+        for pares in _mapear(_claves_rango, rangos, procesos):
+            for clave, i in pares:
+                bloques.setdefault(clave, []).append(i)
+
+        candidatos = []
+        descartados = 0
+        for clave, indices in bloques.items():
+            if len(indices) < 2:
+                continue
+            if len(indices) > max_bloque:
+                descartados += 1
+                continue
+            candidatos.append((clave, indices))
+        del bloques
+
+        # 2. Puntuación de los pares de cada bloque. Las claves conservadas se
+        # publican antes de crear los procesos, en lugar de enviarlas con cada tarea
+        _CONSERVADAS = frozenset(clave for clave, _ in candidatos)
+        tareas = [(trozo, umbral) for trozo in _repartir(candidatos, procesos * 4)]
+        evaluados = 0
+        pares = []
+        for n, duplicados in _mapear(_puntuar_bloques, tareas, procesos):
+            evaluados += n
+            pares.extend(duplicados)
+    finally:
+        _REGISTROS = None
+        _CONSERVADAS = None
+
+    # 3. Grupos y fusiones
+    fusiones = []
+    for representante, (miembros, puntuacion) in sorted(_agrupar(pares).items()):
+        orden = sorted(miembros)
+        nombre, telefono, email = registros[orden[0]]
+        for i in orden[1:]:
+            telefono = telefono or registros[i][1]
+            email = email or registros[i][2]
+        fusiones.append(Fusion(nombre, [registros[i][0] for i in orden[1:]],
+                               telefono, email, round(puntuacion, 3)))
+
+    return PlanFusion(fusiones, len(registros), len(candidatos), descartados, evaluados)
+
+
+def _mapear(funcion, tareas, procesos):
+    """
+    Aplica una función a cada tarea, en paralelo si hay más de un proceso.
+
+    Los procesos se crean para esta llamada, así que ven los valores
+    actuales de _REGISTROS y _CONSERVADAS: con fork los heredan y sin fork
+    se les pasan al iniciarse.
+
+    Returns:
+        list: Resultados en el orden de las tareas
+    """
+    if procesos == 1:
+        return list(map(funcion, tareas))
+
+    usar_fork = 'fork' in multiprocessing.get_all_start_methods()
+    contexto = multiprocessing.get_context('fork' if usar_fork else None)
+    pool = contexto.Pool(procesos, initializer=None if usar_fork else _iniciar,
+                         initargs=() if usar_fork else (_REGISTROS, _CONSERVADAS))
+    try:
+        return pool.map(funcion, tareas)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _iniciar(registros, conservadas):
+    """
+    Inicializa _REGISTROS y _CONSERVADAS en los procesos que no se crean con fork.
+    """
+    global _REGISTROS, _CONSERVADAS
+    _REGISTROS = registros
+    _CONSERVADAS = conservadas
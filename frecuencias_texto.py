@@ -0,0 +1,424 @@
+"""
+Frecuencias de palabras, bigramas y trigramas con memoria acotada.
+
+Las palabras se normalizan igual que en analizar_texto (minúsculas, con
+acentos y sin signos de puntuación) y los n-gramas se forman con palabras
+consecutivas del texto.
+
+Cada tabla cuenta de forma exacta mientras el número de claves distintas no
+supera max_claves. Al superarlo pasa a un modo aproximado con memoria fija:
+
+  - un Count-Min Sketch (profundidad x anchura contadores) estima la
+    frecuencia de cualquier clave. Nunca se queda corto y, con probabilidad
+    al menos 1 - delta, no se pasa en más de epsilon * total;
+  - un montículo mantiene las `capacidad` claves con mayor estimación, de
+    donde salen las más frecuentes.
+
+Uso:
+    python frecuencias_texto.py FICHERO [...] [--top N] [--orden N] [--max-claves N]
+                                [--epsilon E] [--delta D] [--salida resultados.json]
+"""
+import argparse
+import heapq
+import json
+import math
+import sys
+from array import array
+from collections import Counter
+from itertools import islice
+
+from analizador_texto import TAM_BLOQUE, leer_bloques, normalizar_palabras
+
+# Claves distintas que se cuentan de forma exacta en cada tabla
+MAX_CLAVES = 1_000_000
+
+# Parámetros por defecto del Count-Min Sketch
+EPSILON = 1e-4
+DELTA = 1e-3
+
+# Elementos que se agrupan antes de actualizar los contadores
+TAM_LOTE = 100_000
+
+NOMBRES_NGRAMAS = {1: 'palabras', 2: 'bigramas', 3: 'trigramas'}
+
+
+class CountMinSketch:
+    """
+    Estimador de frecuencias con memoria fija (Count-Min Sketch).
+
+    Las columnas salen de hash(), que las cadenas guardan calculado: son
+    rápidas pero solo valen dentro del proceso.
+    """
+
+    def __init__(self, epsilon=EPSILON, delta=DELTA):
+        """
+        Inicializa un boceto vacío.
+
+        Args:
+            epsilon (float, opcional): Error máximo relativo al total
+            delta (float, opcional): Probabilidad de superar ese error
+        """
+        self.epsilon = epsilon
+        self.delta = delta
+        self.anchura = math.ceil(math.e / epsilon)
+        self.profundidad = math.ceil(math.log(1 / delta))
+        self.total = 0
+        self._filas = [array('Q', bytes(8 * self.anchura)) for _ in range(self.profundidad)]
+
+    def _posiciones(self, elemento):
+        """
+        Columna del elemento en cada fila (doble hash de Kirsch-Mitzenmacher).
+        """
+        h = hash(elemento) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.anchura for i in range(self.profundidad)]
+
+    def agregar(self, elemento, cuenta=1):
+        """
+        Suma apariciones de un elemento.
+
+        Args:
+            elemento (str): Elemento contado
+            cuenta (int, opcional): Apariciones que se suman
+
+        Returns:
+            int: Frecuencia estimada del elemento después de sumarlas
+        """
+        self.total += cuenta
+        h = hash(elemento) & 0xFFFFFFFFFFFFFFFF
+        columna, salto = h & 0xFFFFFFFF, (h >> 32) | 1
+        anchura = self.anchura
+        estimacion = None
+        # Mismas columnas que _posiciones, calculadas sobre la marcha
+        for fila in self._filas:
+            columna %= anchura
+            valor = fila[columna] + cuenta
+            fila[columna] = valor
+            if estimacion is None or valor < estimacion:
+                estimacion = valor
+            columna += salto
+        return estimacion
+
+    def estimar(self, elemento):
+        """
+        Estima la frecuencia de un elemento.
+
+        Args:
+            elemento (str): Elemento a consultar
+
+        Returns:
+            int: Frecuencia estimada (nunca menor que la real)
+        """
+        return min(fila[columna] for fila, columna in zip(self._filas, self._posiciones(elemento)))
+
+    def error_maximo(self):
+        """
+        Cota del error de cualquier estimación, válida con probabilidad 1 - delta.
+
+        Returns:
+            int: Apariciones que una estimación puede tener de más
+        """
+        return math.ceil(self.epsilon * self.total)
+
+    def bytes_contadores(self):
+        """
+        Memoria ocupada por los contadores.
+
+        Returns:
+            int: Bytes
+        """
+        return sum(fila.itemsize * len(fila) for fila in self._filas)
+
+
+class ContadorFrecuencias:
+    """
+    Tabla de frecuencias exacta que pasa a Count-Min Sketch más un montículo
+    de candidatos cuando supera su presupuesto de claves.
+    """
+
+    def __init__(self, max_claves=MAX_CLAVES, capacidad=1000, epsilon=EPSILON, delta=DELTA):
+        """
+        Inicializa una tabla vacía.
+
+        Args:
+            max_claves (int, opcional): Claves distintas que se cuentan de forma exacta
+            capacidad (int, opcional): Candidatos a más frecuentes que se vigilan
+                en el modo aproximado
+            epsilon (float, opcional): Error máximo relativo del modo aproximado
+            delta (float, opcional): Probabilidad de superar ese error
+        """
+        self.max_claves = max_claves
+        self.capacidad = capacidad
+        self.epsilon = epsilon
+        self.delta = delta
+        self.total = 0
+        self._exactas = Counter()
+        self._boceto = None
+        self._candidatos = {}  # elemento -> última estimación
+        self._monticulo = []   # (estimación, elemento); con entradas caducadas
+
+    @property
+    def aproximado(self):
+        """True si la tabla ya superó su presupuesto y estima las frecuencias."""
+        return self._boceto is not None
+
+    def agregar(self, elementos):
+        """
+        Cuenta una secuencia de elementos.
+
+        En el modo exacto las claves se cuentan por lotes, así que la tabla
+        puede pasarse de max_claves en un lote antes de cambiar de modo.
+
+        Args:
+            elementos (iterable): Elementos a contar (cadenas)
+        """
+        elementos = iter(elementos)
+        while True:
+            lote = list(islice(elementos, TAM_LOTE))
+            if not lote:
+                return
+            self.total += len(lote)
+            if self._boceto is None:
+                self._exactas.update(lote)
+                if len(self._exactas) > self.max_claves:
+                    self._pasar_a_aproximado()
+            else:
+                # Agrupamos el lote para tocar el boceto una vez por elemento distinto
+                agregar = self._boceto.agregar
+                candidatos, monticulo = self._candidatos, self._monticulo
+                for elemento, cuenta in Counter(lote).items():
+                    estimacion = agregar(elemento, cuenta)
+                    # La cima del montículo nunca supera la menor estimación vigilada:
+                    # lo que no la supera no puede entrar (es el caso de casi todo)
+                    if (estimacion > monticulo[0][0] or elemento in candidatos
+                            or len(candidatos) < self.capacidad):
+                        self._vigilar(elemento, estimacion)
+                        monticulo = self._monticulo
+
+    def _pasar_a_aproximado(self):
+        """
+        Vuelca las cuentas exactas en el boceto y se queda con los candidatos.
+        """
+        self._boceto = CountMinSketch(self.epsilon, self.delta)
+        for elemento, cuenta in self._exactas.items():
+            self._boceto.agregar(elemento, cuenta)
+        mayores = heapq.nlargest(self.capacidad, self._exactas.items(), key=lambda par: par[1])
+        self._exactas = None
+        self._candidatos = {elemento: self._boceto.estimar(elemento) for elemento, _ in mayores}
+        self._monticulo = [(estimacion, elemento) for elemento, estimacion in self._candidatos.items()]
+        heapq.heapify(self._monticulo)
+
+    def _vigilar(self, elemento, estimacion):
+        """
+        Actualiza los candidatos con la nueva estimación de un elemento.
+
+        Las estimaciones de un elemento solo crecen, así que una entrada del
+        montículo está caducada si no coincide con la estimación guardada.
+        """
+        candidatos = self._candidatos
+        monticulo = self._monticulo
+        if elemento in candidatos or len(candidatos) < self.capacidad:
+            candidatos[elemento] = estimacion
+            heapq.heappush(monticulo, (estimacion, elemento))
+            if len(monticulo) > 4 * self.capacidad:
+                self._monticulo = [(e, elem) for elem, e in candidatos.items()]
+                heapq.heapify(self._monticulo)
+            return
+
+        while monticulo[0][0] != candidatos.get(monticulo[0][1]):
+            heapq.heappop(monticulo)
+        if estimacion > monticulo[0][0]:
+            _, expulsado = heapq.heapreplace(monticulo, (estimacion, elemento))
+            del candidatos[expulsado]
+            candidatos[elemento] = estimacion
+
+    def frecuencia(self, elemento):
+        """
+        Frecuencia de un elemento: exacta o estimada según el modo.
+
+        Args:
+            elemento (str): Elemento a consultar
+
+        Returns:
+            int: Apariciones del elemento
+        """
+        if self._boceto is None:
+            return self._exactas[elemento]
+        return self._boceto.estimar(elemento)
+
+    def mas_frecuentes(self, k=10):
+        """
+        Devuelve los k elementos más frecuentes.
+
+        Args:
+            k (int, opcional): Número de elementos
+
+        Returns:
+            list: Pares (elemento, frecuencia) de mayor a menor frecuencia
+        """
+        if self._boceto is None:
+            return self._exactas.most_common(k)
+        estimaciones = ((elemento, self._boceto.estimar(elemento)) for elemento in self._candidatos)
+        return heapq.nlargest(k, estimaciones, key=lambda par: par[1])
+
+    def resumen(self, k=10):
+        """
+        Devuelve el modo, los más frecuentes y la cota de error de la tabla.
+
+        Returns:
+            dict: modo, total, distintos (solo en el modo exacto),
+                  mas_frecuentes, error_maximo y confianza
+        """
+        if self._boceto is None:
+            return {
+                'modo': 'exacto',
+                'total': self.total,
+                'distintos': len(self._exactas),
+                'mas_frecuentes': self.mas_frecuentes(k),
+                'error_maximo': 0,
+                'confianza': 1.0,
+            }
+        return {
+            'modo': 'aproximado',
+            'total': self.total,
+            'distintos': None,
+            'mas_frecuentes': self.mas_frecuentes(k),
+            'error_maximo': self._boceto.error_maximo(),
+            'confianza': 1 - self.delta,
+            'contadores_boceto': self._boceto.anchura * self._boceto.profundidad,
+        }
+
+
+class AnalizadorFrecuencias:
+    """
+    Frecuencias de palabras y n-gramas de uno o varios textos.
+    """
+
+    def __init__(self, orden=3, max_claves=MAX_CLAVES, capacidad=1000,
+                 epsilon=EPSILON, delta=DELTA):
+        """
+        Inicializa el analizador.
+
+        Args:
+            orden (int, opcional): Longitud máxima de los n-gramas (1 solo palabras)
+            max_claves (int, opcional): Presupuesto de claves exactas de cada tabla
+            capacidad (int, opcional): Candidatos vigilados en el modo aproximado
+            epsilon (float, opcional): Error máximo relativo del modo aproximado
+            delta (float, opcional): Probabilidad de superar ese error
+        """
+        self.orden = orden
+        # tablas[n - 1] cuenta los n-gramas (los de varias palabras separadas por un espacio)
+        self.tablas = [ContadorFrecuencias(max_claves, capacidad, epsilon, delta)
+                       for _ in range(orden)]
+        self._cola = []  # Últimas palabras del trozo anterior del mismo texto
+
+    def _agregar_palabras(self, palabras):
+        """
+        Cuenta las palabras de un trozo y los n-gramas que terminan en ellas.
+        """
+        nuevas = len(palabras)
+        palabras = self._cola + palabras
+        desde_nuevas = len(palabras) - nuevas
+        for n, tabla in enumerate(self.tablas, 1):
+            # Solo los n-gramas que incluyen alguna palabra nueva; los otros ya se contaron
+            inicio = max(0, desde_nuevas - n + 1)
+            if n == 1:
+                tabla.agregar(palabras[inicio:])
+            else:
+                tabla.agregar(map(' '.join, zip(*(palabras[inicio + i:] for i in range(n)))))
+        self._cola = palabras[max(0, len(palabras) - self.orden + 1):] if self.orden > 1 else []
+
+    def agregar_texto(self, texto):
+        """
+        Cuenta un texto completo. Los n-gramas no cruzan de un texto a otro.
+
+        Args:
+            texto (str): El texto a analizar
+        """
+        self._cola = []
+        self._agregar_palabras(normalizar_palabras(texto))
+
+    def agregar_flujo(self, flujo, tam_bloque=TAM_BLOQUE):
+        """
+        Cuenta un texto leyéndolo por bloques, sin tenerlo entero en memoria.
+
+        Args:
+            flujo (file): Fichero abierto en modo texto (o sys.stdin)
+            tam_bloque (int, opcional): Caracteres que se leen de cada vez
+        """
+        self._cola = []
+        for texto in leer_bloques(flujo, tam_bloque):
+            self._agregar_palabras(normalizar_palabras(texto))
+
+    def resultados(self, k=10):
+        """
+        Devuelve el resumen de cada tabla.
+
+        Args:
+            k (int, opcional): Número de términos más frecuentes de cada tabla
+
+        Returns:
+            dict: 'palabras', 'bigramas', 'trigramas' (o 'N-gramas') -> resumen
+        """
+        return {NOMBRES_NGRAMAS.get(n, f'{n}-gramas'): tabla.resumen(k)
+                for n, tabla in enumerate(self.tablas, 1)}
+
+
+def mostrar_resultados(resultados):
+    """
+    Muestra por pantalla los términos más frecuentes de cada tabla.
+
+    Args:
+        resultados (dict): Lo que devuelve AnalizadorFrecuencias.resultados
+    """
+    for nombre, resumen in resultados.items():
+        print(f"\n{nombre.upper()} ({resumen['total']} en total, modo {resumen['modo']})")
+        print("-" * 40)
+        if resumen['modo'] == 'aproximado':
+            print(f"Las frecuencias pueden tener hasta {resumen['error_maximo']} de más "
+                  f"(con probabilidad {resumen['confianza']:.4f})")
+        else:
+            print(f"Términos distintos: {resumen['distintos']}")
+        for termino, frecuencia in resumen['mas_frecuentes']:
+            print(f"{frecuencia:>10}  {termino}")
+
+
+def main():
+    """Función principal del programa"""
+    parser = argparse.ArgumentParser(description="Frecuencias de palabras y n-gramas de ficheros de texto")
+    parser.add_argument('rutas', nargs='+', help="Ficheros de texto ('-' para la entrada estándar)")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--orden', type=int, default=3, help="Longitud máxima de los n-gramas")
+    parser.add_argument('--max-claves', type=int, default=MAX_CLAVES,
+                        help="Claves distintas que se cuentan de forma exacta en cada tabla")
+    parser.add_argument('--epsilon', type=float, default=EPSILON)
+    parser.add_argument('--delta', type=float, default=DELTA)
+    parser.add_argument('--salida', default=None, help="Fichero .json donde guardar los resultados")
+    args = parser.parse_args()
+
+    analizador = AnalizadorFrecuencias(args.orden, args.max_claves, max(1000, 10 * args.top),
+                                       args.epsilon, args.delta)
+    for ruta in args.rutas:
+        if ruta == '-':
+            analizador.agregar_flujo(sys.stdin)
+            continue
+        try:
+            with open(ruta, encoding='utf-8') as fichero:
+                analizador.agregar_flujo(fichero)
+        except OSError as error:
+            print(f"Error: No se pudo leer '{ruta}': {error.strerror}.")
+        except UnicodeDecodeError:
+            print(f"Error: '{ruta}' no es un fichero de texto UTF-8.")
+
+    resultados = analizador.resultados(args.top)
+    if args.salida is None:
+        mostrar_resultados(resultados)
+    else:
+        with open(args.salida, 'w', encoding='utf-8') as fichero:
+            json.dump(resultados, fichero, indent=2, ensure_ascii=False)
+            fichero.write('\n')
+        print(f"Resultados guardados en '{args.salida}'.")
+
+
+if __name__ == "__main__":
+    main()
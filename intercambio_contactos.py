@@ -0,0 +1,388 @@
+"""
+Importación y exportación de contactos en vCard y CSV.
+
+Los ficheros se leen y se escriben contacto a contacto con generadores, de
+modo que la memoria usada no depende del tamaño del fichero. Al importar,
+la agenda construye sus índices una sola vez al final (ver Agenda.importar)
+y se genera un informe con los duplicados y los registros rechazados.
+
+Formato CSV: cabecera con las columnas nombre, telefono y email.
+Formato vCard: versiones 2.1, 3.0 y 4.0, con las propiedades FN (o N),
+TEL y EMAIL.
+"""
+import csv
+import os
+
+from agenda_contactos import Contacto
+
+# Ejemplos de duplicados y rechazos que se guardan en el informe (el resto solo se cuenta)
+MAX_EJEMPLOS = 100
+
+# Longitud máxima en bytes de una línea de vCard antes de plegarla
+LONGITUD_LINEA_VCARD = 75
+
+CAMPOS_CSV = ('nombre', 'telefono', 'email')
+
+
+class InformeImportacion:
+    """
+    Resumen de una importación: contactos leídos, agregados, duplicados y rechazados.
+    """
+
+    def __init__(self, origen=""):
+        """
+        Inicializa un informe vacío.
+
+        Args:
+            origen (str, opcional): Fichero del que se importa
+        """
+        self.origen = origen
+        self.leidos = 0
+        self.agregados = 0
+        self.duplicados = 0
+        self.rechazados = 0
+        self.ejemplos_duplicados = []  # nombres de los primeros duplicados
+        self.ejemplos_rechazos = []    # (línea, motivo) de los primeros rechazos
+
+    def registrar_duplicado(self, contacto):
+        """
+        Anota un contacto que no se agregó porque su nombre ya existía.
+
+        Args:
+            contacto (Contacto): Contacto duplicado
+        """
+        self.duplicados += 1
+        if len(self.ejemplos_duplicados) < MAX_EJEMPLOS:
+            self.ejemplos_duplicados.append(contacto.nombre)
+
+    def registrar_rechazo(self, linea, motivo):
+        """
+        Anota un registro del fichero que no se pudo convertir en contacto.
+
+        Args:
+            linea (int): Línea del fichero donde empieza el registro
+            motivo (str): Descripción del problema
+        """
+        self.rechazados += 1
+        if len(self.ejemplos_rechazos) < MAX_EJEMPLOS:
+            self.ejemplos_rechazos.append((linea, motivo))
+
+    def mostrar(self):
+        """
+        Muestra el informe por pantalla.
+        """
+        print("\n=== INFORME DE IMPORTACIÓN ===")
+        if self.origen:
+            print(f"Fichero: {self.origen}")
+        print(f"Contactos leídos: {self.leidos}")
+        print(f"Contactos agregados: {self.agregados}")
+        print(f"Duplicados: {self.duplicados}")
+        print(f"Rechazados: {self.rechazados}")
+
+        for nombre in self.ejemplos_duplicados:
+            print(f"  Duplicado: {nombre}")
+        for linea, motivo in self.ejemplos_rechazos:
+            print(f"  Línea {linea}: {motivo}")
+        omitidos = (self.duplicados - len(self.ejemplos_duplicados) +
+                    self.rechazados - len(self.ejemplos_rechazos))
+        if omitidos:
+            print(f"  ... y {omitidos} más")
+
+
+def _contacto_valido(nombre, telefono, email, linea, informe):
+    """
+    Crea el contacto si tiene nombre y teléfono; si no, anota el rechazo.
+    """
+    nombre = ' '.join(nombre.split())
+    telefono = telefono.strip()
+    if not nombre:
+        informe.registrar_rechazo(linea, "El contacto no tiene nombre")
+        return None
+    if not telefono:
+        informe.registrar_rechazo(linea, f"El contacto '{nombre}' no tiene teléfono")
+        return None
+    informe.leidos += 1
+    return Contacto(nombre, telefono, email.strip())
+
+
+def leer_csv(fichero, informe):
+    """
+    Lee contactos de un CSV de forma perezosa.
+
+    Args:
+        fichero (file): Fichero de texto abierto con newline=''
+        informe (InformeImportacion): Informe donde se anotan los rechazos
+
+    Yields:
+        Contacto: Contactos válidos en el orden del fichero
+    """
+    lector = csv.reader(fichero)
+    cabecera = next(lector, None)
+    if cabecera is None:
+        return
+    columnas = [c.strip().lower() for c in cabecera]
+    if 'nombre' not in columnas or 'telefono' not in columnas:
+        informe.registrar_rechazo(1, "La cabecera debe tener las columnas nombre y telefono")
+        return
+    i_nombre = columnas.index('nombre')
+    i_telefono = columnas.index('telefono')
+    i_email = columnas.index('email') if 'email' in columnas else None
+
+    for fila in lector:
+        if not fila:
+            continue
+        linea = lector.line_num
+        if len(fila) != len(columnas):
+            informe.registrar_rechazo(
+                linea, f"Se esperaban {len(columnas)} columnas y hay {len(fila)}")
+            continue
+        email = fila[i_email] if i_email is not None else ""
+        contacto = _contacto_valido(fila[i_nombre], fila[i_telefono], email, linea, informe)
+        if contacto is not None:
+            yield contacto
+
+
+def escribir_csv(contactos, fichero):
+    """
+    Escribe contactos en CSV a medida que se recorren.
+
+    Args:
+        contactos (iterable): Contactos a exportar
+        fichero (file): Fichero de texto abierto para escritura con newline=''
+
+    Returns:
+        int: Número de contactos escritos
+    """
+    escritor = csv.writer(fichero)
+    escritor.writerow(CAMPOS_CSV)
+    escritos = 0
+    for contacto in contactos:
+        escritor.writerow((contacto.nombre, contacto.telefono, contacto.email))
+        escritos += 1
+    return escritos
+
+
+def _desescapar_vcard(valor):
+    """
+    Deshace el escapado de un valor de vCard (\\n, \\, \\; y \\\\).
+    """
+    if '\\' not in valor:
+        return valor
+    partes = []
+    i = 0
+    while i < len(valor):
+        c = valor[i]
+        if c == '\\' and i + 1 < len(valor):
+            siguiente = valor[i + 1]
+            partes.append('\n' if siguiente in 'nN' else siguiente)
+            i += 2
+        else:
+            partes.append(c)
+            i += 1
+    return ''.join(partes)
+
+
+def _escapar_vcard(valor):
+    """
+    Escapa un valor para escribirlo en una vCard.
+    """
+    return (valor.replace('\\', '\\\\').replace(',', '\\,')
+            .replace(';', '\\;').replace('\n', '\\n'))
+
+
+def _nombre_de_n(valor):
+    """
+    Construye el nombre a partir de la propiedad N (apellidos;nombre;adicionales;...).
+    """
+    partes = [_desescapar_vcard(p) for p in valor.split(';')]
+    apellidos = partes[0] if partes else ""
+    nombre = partes[1] if len(partes) > 1 else ""
+    return f"{nombre} {apellidos}"
+
+
+def _lineas_desplegadas(fichero):
+    """
+    Une las líneas de una vCard que continúan en la siguiente (empiezan por espacio).
+
+    Yields:
+        tuple: (número de línea, línea lógica)
+    """
+    pendiente = None
+    inicio = 0
+    for numero, linea in enumerate(fichero, 1):
+        linea = linea.rstrip('\r\n')
+        if linea[:1] in (' ', '\t') and pendiente is not None:
+            pendiente += linea[1:]
+            continue
+        if pendiente is not None:
+            yield inicio, pendiente
+        pendiente, inicio = linea, numero
+    if pendiente is not None:
+        yield inicio, pendiente
+
+
+def leer_vcard(fichero, informe):
+    """
+    Lee contactos de un fichero vCard de forma perezosa.
+
+    Args:
+        fichero (file): Fichero de texto abierto para lectura
+        informe (InformeImportacion): Informe donde se anotan los rechazos
+
+    Yields:
+        Contacto: Contactos válidos en el orden del fichero
+    """
+    tarjeta = None  # propiedades de la tarjeta abierta
+    inicio = 0
+
+    for numero, linea in _lineas_desplegadas(fichero):
+        if not linea.strip():
+            continue
+        nombre, separador, valor = linea.partition(':')
+        if not separador:
+            if tarjeta is not None:
+                informe.registrar_rechazo(numero, "Línea sin ':' dentro de la vCard")
+                tarjeta['erronea'] = True
+            continue
+
+        # "item1.TEL;TYPE=cell" -> "TEL"
+        propiedad = nombre.split(';', 1)[0].rsplit('.', 1)[-1].strip().upper()
+
+        if propiedad == 'BEGIN' and valor.strip().upper() == 'VCARD':
+            if tarjeta is not None:
+                informe.registrar_rechazo(inicio, "vCard sin END:VCARD")
+            tarjeta, inicio = {}, numero
+        elif propiedad == 'END' and valor.strip().upper() == 'VCARD':
+            if tarjeta is None:
+                informe.registrar_rechazo(numero, "END:VCARD sin BEGIN:VCARD")
+                continue
+            if not tarjeta.get('erronea'):
+                nombre_contacto = tarjeta.get('FN') or tarjeta.get('N', "")
+                contacto = _contacto_valido(nombre_contacto, tarjeta.get('TEL', ""),
+                                            tarjeta.get('EMAIL', ""), inicio, informe)
+                if contacto is not None:
+                    yield contacto
+            tarjeta = None
+        elif tarjeta is not None:
+            # Nos quedamos con el primer teléfono y el primer email
+            if propiedad in ('FN', 'TEL', 'EMAIL') and propiedad not in tarjeta:
+                tarjeta[propiedad] = _desescapar_vcard(valor)
+            elif propiedad == 'N' and 'N' not in tarjeta:
+                tarjeta['N'] = _nombre_de_n(valor)
+
+    if tarjeta is not None:
+        informe.registrar_rechazo(inicio, "vCard sin END:VCARD al final del fichero")
+
+
+def _plegar_linea(linea):
+    """
+    Parte una línea de vCard en trozos de como mucho 75 bytes (RFC 6350).
+    """
+    if len(linea) <= LONGITUD_LINEA_VCARD // 4 or len(linea.encode('utf-8')) <= LONGITUD_LINEA_VCARD:
+        return linea + '\r\n'
+    trozos = []
+    actual = []
+    bytes_actual = 0
+    limite = LONGITUD_LINEA_VCARD
+    for c in linea:
+        tam = len(c.encode('utf-8'))
+        if bytes_actual + tam > limite:
+            trozos.append(''.join(actual))
+            actual, bytes_actual = [], 0
+            limite = LONGITUD_LINEA_VCARD - 1  # las continuaciones empiezan por un espacio
+        actual.append(c)
+        bytes_actual += tam
+    trozos.append(''.join(actual))
+    return '\r\n '.join(trozos) + '\r\n'
+
+
+def escribir_vcard(contactos, fichero):
+    """
+    Escribe contactos en formato vCard 4.0 a medida que se recorren.
+
+    Args:
+        contactos (iterable): Contactos a exportar
+        fichero (file): Fichero de texto abierto para escritura con newline=''
+
+    Returns:
+        int: Número de contactos escritos
+    """
+    escritos = 0
+    for contacto in contactos:
+        lineas = ['BEGIN:VCARD\r\nVERSION:4.0\r\n',
+                  _plegar_linea(f"FN:{_escapar_vcard(contacto.nombre)}"),
+                  _plegar_linea(f"TEL:{_escapar_vcard(contacto.telefono)}")]
+        if contacto.email:
+            lineas.append(_plegar_linea(f"EMAIL:{_escapar_vcard(contacto.email)}"))
+        lineas.append('END:VCARD\r\n')
+        fichero.write(''.join(lineas))
+        escritos += 1
+    return escritos
+
+
+def _formato(ruta):
+    """
+    Deduce el formato de un fichero por su extensión.
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    if extension in ('.vcf', '.vcard'):
+        return 'vcard'
+    if extension == '.csv':
+        return 'csv'
+    return None
+
+
+def importar_fichero(agenda, ruta):
+    """
+    Importa a la agenda los contactos de un fichero .vcf o .csv.
+
+    Args:
+        agenda (Agenda): Agenda de destino
+        ruta (str): Ruta del fichero
+
+    Returns:
+        InformeImportacion o None: Informe de la importación o None si hubo un error
+    """
+    formato = _formato(ruta)
+    if formato is None:
+        print(f"Error: Formato no reconocido para '{ruta}' (use .vcf o .csv).")
+        return None
+
+    informe = InformeImportacion(ruta)
+    try:
+        with open(ruta, encoding='utf-8-sig', newline='') as fichero:
+            if formato == 'csv':
+                contactos = leer_csv(fichero, informe)
+            else:
+                contactos = leer_vcard(fichero, informe)
+            agenda.importar(contactos, informe)
+    except (OSError, UnicodeDecodeError, csv.Error) as e:
+        print(f"Error: No se pudo leer '{ruta}': {e}")
+        return None
+    return informe
+
+
+def exportar_fichero(agenda, ruta):
+    """
+    Exporta los contactos de la agenda a un fichero .vcf o .csv.
+
+    Args:
+        agenda (Agenda): Agenda de origen
+        ruta (str): Ruta del fichero
+
+    Returns:
+        int o None: Número de contactos exportados o None si hubo un error
+    """
+    formato = _formato(ruta)
+    if formato is None:
+        print(f"Error: Formato no reconocido para '{ruta}' (use .vcf o .csv).")
+        return None
+
+    try:
+        with open(ruta, 'w', encoding='utf-8', newline='') as fichero:
+            if formato == 'csv':
+                return escribir_csv(agenda, fichero)
+            return escribir_vcard(agenda, fichero)
+    except OSError as e:
+        print(f"Error: No se pudo escribir '{ruta}': {e}")
+        return None
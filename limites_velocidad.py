@@ -0,0 +1,216 @@
+"""
+Límites de velocidad (velocity limits) para cuentas bancarias.
+
+Permite restringir, por ejemplo, la cantidad retirada en las últimas 24 horas
+o el número de transferencias por minuto sin recorrer el historial de
+movimientos. Cada límite usa un contador de ventana deslizante formado por
+cubetas en anillo, con memoria acotada y coste O(1) amortizado por operación.
+"""
+import time
+
+
+class ContadorVentana:
+    """
+    Contador de ventana deslizante basado en un anillo de cubetas.
+
+    La ventana se divide en `num_cubetas` intervalos de igual duración. Cada
+    cubeta acumula la cantidad y el número de operaciones de su intervalo y,
+    al avanzar el tiempo, las cubetas caducadas se reutilizan.
+    """
+
+    __slots__ = ('ancho_cubeta', 'num_cubetas', 'cantidades', 'operaciones',
+                 'total_cantidad', 'total_operaciones', 'ultima_epoca', 'actual')
+
+    def __init__(self, ventana, num_cubetas=60):
+        """
+        Inicializa un contador vacío.
+
+        Args:
+            ventana (float): Duración de la ventana en segundos
+            num_cubetas (int, opcional): Número de cubetas del anillo. Por defecto 60
+        """
+        self.ancho_cubeta = ventana / num_cubetas
+        self.num_cubetas = num_cubetas
+        self.cantidades = [0.0] * num_cubetas
+        self.operaciones = [0] * num_cubetas
+        self.total_cantidad = 0.0
+        self.total_operaciones = 0
+        self.ultima_epoca = None
+        self.actual = 0
+
+    def avanzar(self, ahora):
+        """
+        Descarta las cubetas que han salido de la ventana.
+
+        Args:
+            ahora (float): Instante actual en segundos
+        """
+        epoca = int(ahora // self.ancho_cubeta)
+        ultima = self.ultima_epoca
+        if epoca == ultima:
+            return
+
+        if ultima is None or epoca - ultima >= self.num_cubetas:
+            # Toda la ventana ha caducado: reiniciamos el anillo
+            if self.total_operaciones:
+                self.cantidades = [0.0] * self.num_cubetas
+                self.operaciones = [0] * self.num_cubetas
+                self.total_cantidad = 0.0
+                self.total_operaciones = 0
+        elif epoca < ultima:
+            # El reloj no debería retroceder; seguimos usando la cubeta actual
+            return
+        else:
+            # Vaciamos solo las cubetas que se van a reutilizar
+            for e in range(ultima + 1, epoca + 1):
+                i = e % self.num_cubetas
+                self.total_cantidad -= self.cantidades[i]
+                self.total_operaciones -= self.operaciones[i]
+                self.cantidades[i] = 0.0
+                self.operaciones[i] = 0
+
+        self.ultima_epoca = epoca
+        self.actual = epoca % self.num_cubetas
+
+    def registrar(self, cantidad):
+        """
+        Suma una operación a la cubeta actual.
+
+        Args:
+            cantidad (float): Cantidad de la operación
+        """
+        i = self.actual
+        self.cantidades[i] += cantidad
+        self.operaciones[i] += 1
+        self.total_cantidad += cantidad
+        self.total_operaciones += 1
+
+
+class LimiteVelocidad:
+    """
+    Definición de un límite de velocidad sobre una ventana de tiempo.
+    """
+
+    def __init__(self, ventana, max_cantidad=None, max_operaciones=None,
+                 operaciones=('retiro', 'transferencia'), num_cubetas=60):
+        """
+        Define un nuevo límite.
+
+        Args:
+            ventana (float): Duración de la ventana en segundos
+            max_cantidad (float, opcional): Cantidad máxima acumulada en la ventana
+            max_operaciones (int, opcional): Número máximo de operaciones en la ventana
+            operaciones (tuple, opcional): Tipos de operación a los que se aplica
+            num_cubetas (int, opcional): Resolución de la ventana deslizante
+        """
+        if max_cantidad is None and max_operaciones is None:
+            raise ValueError("El límite debe fijar una cantidad o un número de operaciones.")
+
+        self.ventana = ventana
+        self.max_cantidad = max_cantidad
+        self.max_operaciones = max_operaciones
+        self.operaciones = frozenset(operaciones)
+        self.num_cubetas = num_cubetas
+
+    def __str__(self):
+        """
+        Representación en cadena de texto del límite.
+
+        Returns:
+            str: Descripción legible del límite
+        """
+        partes = []
+        if self.max_cantidad is not None:
+            partes.append(f"{self.max_cantidad:.2f} €")
+        if self.max_operaciones is not None:
+            partes.append(f"{self.max_operaciones} operaciones")
+        return f"{' / '.join(partes)} cada {self.ventana:g} s"
+
+
+# Límites habituales listos para usar en las subclases de CuentaBancaria
+RETIRO_DIARIO = LimiteVelocidad(24 * 3600, max_cantidad=3000.0, operaciones=('retiro',))
+TRANSFERENCIAS_POR_MINUTO = LimiteVelocidad(60, max_operaciones=10, operaciones=('transferencia',))
+
+
+class ControlVelocidad:
+    """
+    Estado de los límites de velocidad de una cuenta concreta.
+    """
+
+    __slots__ = ('por_operacion',)
+
+    # Fuente de tiempo; se puede sustituir para simular el paso del tiempo
+    reloj = staticmethod(time.monotonic)
+
+    def __init__(self, limites):
+        """
+        Crea los contadores para los límites indicados.
+
+        Args:
+            limites (tuple): Límites (LimiteVelocidad) que se aplican a la cuenta
+        """
+        # Agrupamos los contadores por tipo de operación para no filtrar en cada llamada
+        self.por_operacion = {}
+        for limite in limites:
+            contador = ContadorVentana(limite.ventana, limite.num_cubetas)
+            for operacion in limite.operaciones:
+                self.por_operacion.setdefault(operacion, []).append((limite, contador))
+
+    def comprobar(self, operacion, cantidad):
+        """
+        Comprueba los límites sin registrar la operación.
+
+        Args:
+            operacion (str): Tipo de operación ('retiro' o 'transferencia')
+            cantidad (float): Cantidad de la operación
+
+        Returns:
+            str o None: Mensaje de error si se supera algún límite, None en caso contrario
+        """
+        aplicables = self.por_operacion.get(operacion)
+        if not aplicables:
+            return None
+
+        ahora = self.reloj()
+        for limite, contador in aplicables:
+            contador.avanzar(ahora)
+            if (limite.max_cantidad is not None and
+                    contador.total_cantidad + cantidad > limite.max_cantidad):
+                return f"Se ha superado el límite de {limite}."
+            if (limite.max_operaciones is not None and
+                    contador.total_operaciones >= limite.max_operaciones):
+                return f"Se ha superado el límite de {limite}."
+        return None
+
+    def registrar(self, operacion, cantidad):
+        """
+        Registra una operación ya comprobada en todos sus contadores.
+
+        Args:
+            operacion (str): Tipo de operación ('retiro' o 'transferencia')
+            cantidad (float): Cantidad de la operación
+        """
+        aplicables = self.por_operacion.get(operacion, ())
+        if aplicables:
+            ahora = self.reloj()
+            for _, contador in aplicables:
+                contador.avanzar(ahora)
+                contador.registrar(cantidad)
+
+    def consumir(self, operacion, cantidad):
+        """
+        Comprueba los límites y, si se cumplen todos, registra la operación.
+
+        Args:
+            operacion (str): Tipo de operación ('retiro' o 'transferencia')
+            cantidad (float): Cantidad de la operación
+
+        Returns:
+            str o None: Mensaje de error si se supera algún límite, None en caso contrario
+        """
+        error = self.comprobar(operacion, cantidad)
+        if error is None:
+            # Solo registramos cuando todos los límites permiten la operación
+            for _, contador in self.por_operacion.get(operacion, ()):
+                contador.registrar(cantidad)
+        return error
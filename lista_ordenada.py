@@ -0,0 +1,187 @@
+"""
+Lista que se mantiene ordenada al insertar y borrar.
+
+Los elementos se guardan en tramos ordenados de como mucho 2 * CARGA
+elementos, junto con el máximo de cada tramo. Localizar una posición son dos
+búsquedas binarias (sobre los máximos y dentro del tramo) y insertar o borrar
+solo desplaza los elementos de un tramo, así que nunca hay que reordenar la
+lista completa.
+"""
+from bisect import bisect_left, bisect_right, insort
+
+# Tamaño de referencia de cada tramo
+CARGA = 1000
+
+
+class ListaOrdenada:
+    """
+    Colección ordenada con inserción, borrado y recorrido desde cualquier posición.
+    """
+
+    def __init__(self, elementos=()):
+        """
+        Inicializa la lista.
+
+        Args:
+            elementos (iterable, opcional): Elementos iniciales, en cualquier orden
+        """
+        self._tramos = []   # listas ordenadas; el último elemento de una < primero de la siguiente
+        self._maximos = []  # último elemento de cada tramo
+        self._tamano = 0
+        self.actualizar(elementos)
+
+    def __len__(self):
+        """
+        Número de elementos.
+
+        Returns:
+            int: Elementos de la lista
+        """
+        return self._tamano
+
+    def __iter__(self):
+        """
+        Recorre los elementos en orden.
+
+        Yields:
+            object: Elementos de menor a mayor
+        """
+        for tramo in self._tramos:
+            yield from tramo
+
+    def _reconstruir(self, ordenados):
+        """
+        Reparte una lista ya ordenada en tramos.
+        """
+        self._tramos = [ordenados[i:i + CARGA] for i in range(0, len(ordenados), CARGA)]
+        self._maximos = [tramo[-1] for tramo in self._tramos]
+        self._tamano = len(ordenados)
+
+    def actualizar(self, elementos):
+        """
+        Añade muchos elementos de una vez.
+
+        Si se añaden tantos elementos como los que ya hay, se ordena todo de
+        una vez en lugar de insertarlos uno a uno.
+
+        Args:
+            elementos (iterable): Elementos a añadir
+        """
+        nuevos = list(elementos)
+        if not nuevos:
+            return
+        if len(nuevos) >= self._tamano:
+            nuevos.extend(self)
+            nuevos.sort()
+            self._reconstruir(nuevos)
+        else:
+            for elemento in nuevos:
+                self.agregar(elemento)
+
+    def agregar(self, elemento):
+        """
+        Inserta un elemento en su posición.
+
+        Args:
+            elemento (object): Elemento comparable con el resto
+        """
+        if not self._tramos:
+            self._tramos.append([elemento])
+            self._maximos.append(elemento)
+            self._tamano = 1
+            return
+
+        i = bisect_left(self._maximos, elemento)
+        if i == len(self._tramos):
+            # Mayor que todos: va al final del último tramo
+            i -= 1
+            self._tramos[i].append(elemento)
+            self._maximos[i] = elemento
+        else:
+            insort(self._tramos[i], elemento)
+        self._tamano += 1
+
+        tramo = self._tramos[i]
+        if len(tramo) > 2 * CARGA:
+            # Partimos el tramo en dos mitades
+            self._tramos.insert(i + 1, tramo[CARGA:])
+            del tramo[CARGA:]
+            self._maximos.insert(i, tramo[-1])
+
+    def quitar(self, elemento):
+        """
+        Borra un elemento.
+
+        Args:
+            elemento (object): Elemento a borrar
+
+        Returns:
+            bool: True si el elemento estaba en la lista
+        """
+        i = bisect_left(self._maximos, elemento)
+        if i == len(self._tramos):
+            return False
+        tramo = self._tramos[i]
+        j = bisect_left(tramo, elemento)
+        if tramo[j] != elemento:
+            return False
+
+        del tramo[j]
+        self._tamano -= 1
+        if not tramo:
+            del self._tramos[i]
+            del self._maximos[i]
+        elif j == len(tramo):
+            self._maximos[i] = tramo[-1]
+        return True
+
+    def iterar(self, desde=None, inverso=False, inclusivo=True):
+        """
+        Recorre los elementos a partir de una posición.
+
+        Hacia delante se visitan los elementos mayores o iguales que `desde`
+        (mayores si inclusivo es False); hacia atrás, los menores o iguales
+        (menores). La lista no se debe modificar mientras se recorre.
+
+        Args:
+            desde (object, opcional): Posición de partida. Por defecto, el
+                principio (o el final si inverso)
+            inverso (bool, opcional): Recorrer de mayor a menor
+            inclusivo (bool, opcional): Incluir los elementos iguales a desde
+
+        Yields:
+            object: Elementos en orden ascendente (o descendente si inverso)
+        """
+        tramos = self._tramos
+        if not tramos:
+            return
+
+        if not inverso:
+            if desde is None:
+                i, j = 0, 0
+            elif inclusivo:
+                i = bisect_left(self._maximos, desde)
+                if i == len(tramos):
+                    return
+                j = bisect_left(tramos[i], desde)
+            else:
+                i = bisect_right(self._maximos, desde)
+                if i == len(tramos):
+                    return
+                j = bisect_right(tramos[i], desde)
+            yield from tramos[i][j:]
+            for tramo in tramos[i + 1:]:
+                yield from tramo
+            return
+
+        if desde is None:
+            i = len(tramos) - 1
+            j = len(tramos[i])
+        else:
+            # El primer tramo cuyo máximo supera a desde contiene la posición
+            buscar = bisect_right if inclusivo else bisect_left
+            i = min(buscar(self._maximos, desde), len(tramos) - 1)
+            j = buscar(tramos[i], desde)
+        yield from reversed(tramos[i][:j])
+        for tramo in reversed(tramos[:i]):
+            yield from reversed(tramo)
@@ -0,0 +1,336 @@
+"""
+Núcleo compartido de las cuentas bancarias.
+
+Define la clase CuentaBancaria que usan tanto cuenta_bancaria.py como
+sistema_bancario.py.
+"""
+import sys
+
+from limites_velocidad import ControlVelocidad
+
+
+class CuentaBancaria:
+    """
+    Clase que simula una cuenta bancaria con funcionalidades básicas.
+    
+    Usa __slots__ para no reservar un __dict__ por cuenta y solo crea la lista
+    de movimientos al registrar el primero o al consultarla. Las subclases deberían declarar
+    también `__slots__ = ()` para conservar este ahorro de memoria.
+    """
+    
+    __slots__ = ('titular', 'numero_cuenta', 'saldo', 'activa', '_movimientos', '_control')
+    
+    # Límites de velocidad (LimiteVelocidad) aplicados a retiros y transferencias.
+    # Cada tipo de cuenta puede redefinirlos en su subclase.
+    limites = ()
+    
+    def __init__(self, titular, numero_cuenta, saldo_inicial=0.0):
+        """
+        Inicializa una nueva cuenta bancaria.
+        
+        Args:
+            titular (str): Nombre del titular de la cuenta
+            numero_cuenta (str): Número único de la cuenta
+            saldo_inicial (float, opcional): Saldo inicial de la cuenta. Por defecto 0.0
+        """
+        # Internamos el nombre: muchas cuentas comparten titular
+        self.titular = sys.intern(titular) if isinstance(titular, str) else titular
+        self.numero_cuenta = numero_cuenta
+        self.saldo = saldo_inicial
+        self.activa = True
+        self._movimientos = None  # Se crea con el primer movimiento
+        self._control = None  # Se crea con la primera operación limitada
+        
+        # Registramos el depósito inicial si es mayor que cero
+        if saldo_inicial > 0:
+            self._registrar_movimiento({
+                'tipo': 'Depósito inicial',
+                'cantidad': saldo_inicial,
+                'saldo_resultante': saldo_inicial
+            })
+    
+    @property
+    def movimientos(self):
+        """
+        Historial de movimientos de la cuenta.
+        
+        La lista se crea al consultarla por primera vez, así que se puede
+        modificar igual que antes aunque todavía no haya movimientos.
+        
+        Returns:
+            list: Movimientos registrados
+        """
+        if self._movimientos is None:
+            self._movimientos = []
+        return self._movimientos
+    
+    @movimientos.setter
+    def movimientos(self, movimientos):
+        """
+        Sustituye el historial de movimientos de la cuenta.
+        
+        Args:
+            movimientos (list): Nuevo historial
+        """
+        self._movimientos = movimientos
+    
+    def _registrar_movimiento(self, movimiento):
+        """
+        Añade un movimiento al historial, creando la lista si es el primero.
+        
+        Args:
+            movimiento (dict): Datos del movimiento
+        """
+        if self._movimientos is None:
+            self._movimientos = [movimiento]
+        else:
+            self._movimientos.append(movimiento)
+    
+    def depositar(self, cantidad):
+        """
+        Deposita una cantidad en la cuenta.
+        
+        Args:
+            cantidad (float): Cantidad a depositar
+            
+        Returns:
+            bool: True si la operación fue exitosa, False en caso contrario
+        """
+        if not self.activa:
+            print("Error: La cuenta está inactiva.")
+            return False
+            
+        if cantidad <= 0:
+            print("Error: La cantidad a depositar debe ser positiva.")
+            return False
+            
+        self.saldo += cantidad
+        
+        # Registramos la operación en el historial
+        self._registrar_movimiento({
+            'tipo': 'Depósito',
+            'cantidad': cantidad,
+            'saldo_resultante': self.saldo
+        })
+        
+        print(f"Depósito realizado con éxito. Nuevo saldo: {self.saldo:.2f} €")
+        return True
+    
+    def retirar(self, cantidad):
+        """
+        Retira una cantidad de la cuenta.
+        
+        Args:
+            cantidad (float): Cantidad a retirar
+            
+        Returns:
+            bool: True si la operación fue exitosa, False en caso contrario
+        """
+        if not self.activa:
+            print("Error: La cuenta está inactiva.")
+            return False
+            
+        if cantidad <= 0:
+            print("Error: La cantidad a retirar debe ser positiva.")
+            return False
+            
+        if cantidad > self.saldo:
+            print("Error: Fondos insuficientes.")
+            return False
+            
+        if self.limites and not self._consumir_limites('retiro', cantidad):
+            return False
+            
+        self.saldo -= cantidad
+        
+        # Registramos la operación en el historial
+        self._registrar_movimiento({
+            'tipo': 'Retiro',
+            'cantidad': cantidad,
+            'saldo_resultante': self.saldo
+        })
+        
+        print(f"Retiro realizado con éxito. Nuevo saldo: {self.saldo:.2f} €")
+        return True
+    
+    def _consumir_limites(self, operacion, cantidad):
+        """
+        Comprueba los límites de velocidad y registra la operación si se cumplen.
+        
+        Args:
+            operacion (str): Tipo de operación ('retiro' o 'transferencia')
+            cantidad (float): Cantidad de la operación
+            
+        Returns:
+            bool: True si la operación está permitida, False en caso contrario
+        """
+        if self._control is None:
+            self._control = ControlVelocidad(self.limites)
+            
+        error = self._control.consumir(operacion, cantidad)
+        if error:
+            print(f"Error: {error}")
+            return False
+        return True
+    
+    def _comprobar_limites(self, operacion, cantidad):
+        """
+        Comprueba los límites de velocidad sin registrar la operación.
+        
+        Args:
+            operacion (str): Tipo de operación ('retiro' o 'transferencia')
+            cantidad (float): Cantidad de la operación
+            
+        Returns:
+            bool: True si la operación está permitida, False en caso contrario
+        """
+        if self._control is None:
+            self._control = ControlVelocidad(self.limites)
+            
+        error = self._control.comprobar(operacion, cantidad)
+        if error:
+            print(f"Error: {error}")
+            return False
+        return True
+    
+    def consultar_saldo(self):
+        """
+        Consulta el saldo actual de la cuenta.
+        
+        Returns:
+            float: Saldo actual de la cuenta o None si la cuenta está inactiva
+        """
+        if not self.activa:
+            print("Error: La cuenta está inactiva.")
+            return None
+            
+        print(f"Saldo actual: {self.saldo:.2f} €")
+        return self.saldo
+    
+    def transferir(self, cuenta_destino, cantidad):
+        """
+        Transfiere una cantidad a otra cuenta.
+        
+        Args:
+            cuenta_destino (CuentaBancaria): Cuenta a la que transferir el dinero
+            cantidad (float): Cantidad a transferir
+            
+        Returns:
+            bool: True si la operación fue exitosa, False en caso contrario
+        """
+        if not self.activa:
+            print("Error: La cuenta origen está inactiva.")
+            return False
+            
+        if not cuenta_destino.activa:
+            print("Error: La cuenta destino está inactiva.")
+            return False
+            
+        if cantidad <= 0:
+            print("Error: La cantidad a transferir debe ser positiva.")
+            return False
+            
+        if cantidad > self.saldo:
+            print("Error: Fondos insuficientes para realizar la transferencia.")
+            return False
+            
+        if self.limites and not self._consumir_limites('transferencia', cantidad):
+            return False
+            
+        # Realizamos la transferencia
+        self.saldo -= cantidad
+        cuenta_destino.saldo += cantidad
+        
+        # Registramos la operación en ambas cuentas
+        self._registrar_movimiento({
+            'tipo': 'Transferencia enviada',
+            'cantidad': cantidad,
+            'destinatario': cuenta_destino.numero_cuenta,
+            'saldo_resultante': self.saldo
+        })
+        
+        cuenta_destino._registrar_movimiento({
+            'tipo': 'Transferencia recibida',
+            'cantidad': cantidad,
+            'remitente': self.numero_cuenta,
+            'saldo_resultante': cuenta_destino.saldo
+        })
+        
+        print(f"Transferencia realizada con éxito a la cuenta {cuenta_destino.numero_cuenta}.")
+        print(f"Tu nuevo saldo es: {self.saldo:.2f} €")
+        return True
+    
+    def ver_historial(self, ultimos_n=None):
+        """
+        Muestra el historial de movimientos de la cuenta.
+        
+        Args:
+            ultimos_n (int, opcional): Número de últimos movimientos a mostrar.
+                                     Si es None, muestra todos los movimientos.
+        """
+        if not self.activa:
+            print("Error: La cuenta está inactiva.")
+            return
+            
+        if not self.movimientos:
+            print("No hay movimientos en esta cuenta.")
+            return
+            
+        print("\n=== HISTORIAL DE MOVIMIENTOS ===")
+        print(f"Cuenta: {self.numero_cuenta}")
+        print(f"Titular: {self.titular}")
+        print("---------------------------------")
+        
+        # Determinamos cuántos movimientos mostrar
+        movimientos_a_mostrar = self.movimientos
+        if ultimos_n is not None and ultimos_n > 0 and ultimos_n < len(self.movimientos):
+            movimientos_a_mostrar = self.movimientos[-ultimos_n:]
+            print(f"Mostrando los últimos {ultimos_n} movimientos:")
+        else:
+            print("Mostrando todos los movimientos:")
+            
+        # Mostramos los movimientos
+        for i, mov in enumerate(movimientos_a_mostrar, 1):
+            print(f"\nMovimiento #{i}:")
+            print(f"  Tipo: {mov['tipo']}")
+            print(f"  Cantidad: {mov['cantidad']:.2f} €")
+            if 'remitente' in mov:
+                print(f"  Remitente: Cuenta {mov['remitente']}")
+            if 'destinatario' in mov:
+                print(f"  Destinatario: Cuenta {mov['destinatario']}")
+            print(f"  Saldo resultante: {mov['saldo_resultante']:.2f} €")
+    
+    def cerrar_cuenta(self):
+        """
+        Cierra la cuenta bancaria.
+        
+        Returns:
+            float: El saldo retirado al cerrar la cuenta, o None si la operación falló
+        """
+        if not self.activa:
+            print("Error: La cuenta ya está inactiva.")
+            return None
+            
+        saldo_final = self.saldo
+        self.saldo = 0
+        self.activa = False
+        
+        # Registramos el cierre en el historial
+        self._registrar_movimiento({
+            'tipo': 'Cierre de cuenta',
+            'cantidad': saldo_final,
+            'saldo_resultante': 0
+        })
+        
+        print(f"Cuenta cerrada correctamente. Se ha retirado el saldo de {saldo_final:.2f} €")
+        return saldo_final
+    
+    def __str__(self):
+        """
+        Representación en cadena de texto de la cuenta bancaria.
+        
+        Returns:
+            str: Información formateada sobre la cuenta
+        """
+        estado = "Activa" if self.activa else "Inactiva"
+        return f"Cuenta {self.numero_cuenta} - Titular: {self.titular} - Saldo: {self.saldo:.2f} € - Estado: {estado}"
@@ -1,246 +1,323 @@
-class CuentaBancaria:
+import threading
+from collections import namedtuple
+
+from cache_idempotencia import CacheIdempotencia
+from nucleo_cuenta import CuentaBancaria
+
+
+class VistaCuenta(namedtuple('VistaCuenta', 'numero_cuenta titular saldo activa num_movimientos')):
     """
-    Clase que simula una cuenta bancaria con funcionalidades básicas.
+    Estado de una cuenta en el instante de una instantánea.
     """
     
-    def __init__(self, titular, numero_cuenta, saldo_inicial=0.0):
+    __slots__ = ()
+    
+    def __str__(self):
         """
-        Inicializa una nueva cuenta bancaria.
+        Representación en cadena de texto, igual que la de CuentaBancaria.
         
-        Args:
-            titular (str): Nombre del titular de la cuenta
-            numero_cuenta (str): Número único de la cuenta
-            saldo_inicial (float, opcional): Saldo inicial de la cuenta. Por defecto 0.0
-        """
-        self.titular = titular
-        self.numero_cuenta = numero_cuenta
-        self.saldo = saldo_inicial
-        self.activa = True
-        self.movimientos = []
-        
-        # Registramos el depósito inicial si es mayor que cero
-        if saldo_inicial > 0:
-            self.movimientos.append({
-                'tipo': 'Depósito inicial',
-                'cantidad': saldo_inicial,
-                'saldo_resultante': saldo_inicial
-            })
+        Returns:
+            str: Información formateada sobre la cuenta
+        """
+        estado = "Activa" if self.activa else "Inactiva"
+        return f"Cuenta {self.numero_cuenta} - Titular: {self.titular} - Saldo: {self.saldo:.2f} € - Estado: {estado}"
+
+
+class Instantanea:
+    """
+    Vista de solo lectura del banco tal y como estaba en un instante dado.
+    
+    Mientras está abierta, los escritores siguen trabajando y guardan los
+    valores anteriores de las cuentas que modifican, de modo que la lectura
+    ve siempre un estado coherente (por ejemplo, el total no cambia a mitad
+    de un informe). Debe cerrarse al terminar, idealmente usando `with`.
+    """
     
-    def depositar(self, cantidad):
+    def __init__(self, banco, version):
         """
-        Deposita una cantidad en la cuenta.
+        Inicializa la instantánea.
         
         Args:
-            cantidad (float): Cantidad a depositar
-            
-        Returns:
-            bool: True si la operación fue exitosa, False en caso contrario
+            banco (SistemaBancario): Banco del que se toma la instantánea
+            version (int): Última versión confirmada en el momento de tomarla
         """
-        if not self.activa:
-            print("Error: La cuenta está inactiva.")
-            return False
-            
-        if cantidad <= 0:
-            print("Error: La cantidad a depositar debe ser positiva.")
-            return False
-            
-        self.saldo += cantidad
-        
-        # Registramos la operación en el historial
-        self.movimientos.append({
-            'tipo': 'Depósito',
-            'cantidad': cantidad,
-            'saldo_resultante': self.saldo
-        })
-        
-        print(f"Depósito realizado con éxito. Nuevo saldo: {self.saldo:.2f} €")
-        return True
+        self.banco = banco
+        self.version = version
+        # list() sobre un diccionario se ejecuta de una vez, sin ceder el GIL
+        self._numeros = list(banco.cuentas)
+        self._abierta = True
     
-    def retirar(self, cantidad):
+    def _leer(self, numero):
         """
-        Retira una cantidad de la cuenta.
+        Lee el estado de una cuenta en la versión de la instantánea.
         
-        Args:
-            cantidad (float): Cantidad a retirar
-            
         Returns:
-            bool: True si la operación fue exitosa, False en caso contrario
+            VistaCuenta o None: El estado de la cuenta o None si aún no existía
         """
-        if not self.activa:
-            print("Error: La cuenta está inactiva.")
-            return False
-            
-        if cantidad <= 0:
-            print("Error: La cantidad a retirar debe ser positiva.")
-            return False
-            
-        if cantidad > self.saldo:
-            print("Error: Fondos insuficientes.")
-            return False
-            
-        self.saldo -= cantidad
-        
-        # Registramos la operación en el historial
-        self.movimientos.append({
-            'tipo': 'Retiro',
-            'cantidad': cantidad,
-            'saldo_resultante': self.saldo
-        })
-        
-        print(f"Retiro realizado con éxito. Nuevo saldo: {self.saldo:.2f} €")
-        return True
+        banco = self.banco
+        cuenta = banco.cuentas[numero]
+        
+        # Lectura optimista: si la versión no cambió durante la lectura y es
+        # anterior a la instantánea, los valores actuales son los correctos
+        v1 = banco._versiones.get(numero, 0)
+        saldo, activa, num_movimientos = cuenta.saldo, cuenta.activa, len(cuenta.movimientos)
+        v2 = banco._versiones.get(numero, 0)
+        if v1 == v2 and v1 <= self.version:
+            return VistaCuenta(numero, cuenta.titular, saldo, activa, num_movimientos)
+        
+        # Si no, buscamos la versión anterior que guardó el escritor
+        anteriores = banco._anteriores.get(numero, ())
+        for i in range(len(anteriores) - 1, -1, -1):
+            version, saldo, activa, num_movimientos = anteriores[i]
+            if version <= self.version:
+                return VistaCuenta(numero, cuenta.titular, saldo, activa, num_movimientos)
+        return None
     
-    def consultar_saldo(self):
+    def cuentas(self):
         """
-        Consulta el saldo actual de la cuenta.
+        Recorre las cuentas que existían al tomar la instantánea.
         
-        Returns:
-            float: Saldo actual de la cuenta o None si la cuenta está inactiva
+        Yields:
+            VistaCuenta: Estado de cada cuenta
         """
-        if not self.activa:
-            print("Error: La cuenta está inactiva.")
-            return None
-            
-        print(f"Saldo actual: {self.saldo:.2f} €")
-        return self.saldo
+        for numero in self._numeros:
+            vista = self._leer(numero)
+            if vista is not None:
+                yield vista
     
-    def transferir(self, cuenta_destino, cantidad):
+    def buscar_cuenta(self, numero_cuenta):
         """
-        Transfiere una cantidad a otra cuenta.
+        Busca una cuenta en la instantánea.
         
         Args:
-            cuenta_destino (CuentaBancaria): Cuenta a la que transferir el dinero
-            cantidad (float): Cantidad a transferir
+            numero_cuenta (str): Número de la cuenta
             
         Returns:
-            bool: True si la operación fue exitosa, False en caso contrario
+            VistaCuenta o None: El estado de la cuenta o None si no existía
         """
-        if not self.activa:
-            print("Error: La cuenta origen está inactiva.")
-            return False
-            
-        if not cuenta_destino.activa:
-            print("Error: La cuenta destino está inactiva.")
-            return False
-            
-        if cantidad <= 0:
-            print("Error: La cantidad a transferir debe ser positiva.")
-            return False
-            
-        if cantidad > self.saldo:
-            print("Error: Fondos insuficientes para realizar la transferencia.")
-            return False
-            
-        # Realizamos la transferencia
-        self.saldo -= cantidad
-        cuenta_destino.saldo += cantidad
-        
-        # Registramos la operación en ambas cuentas
-        self.movimientos.append({
-            'tipo': 'Transferencia enviada',
-            'cantidad': cantidad,
-            'destinatario': cuenta_destino.numero_cuenta,
-            'saldo_resultante': self.saldo
-        })
-        
-        cuenta_destino.movimientos.append({
-            'tipo': 'Transferencia recibida',
-            'cantidad': cantidad,
-            'remitente': self.numero_cuenta,
-            'saldo_resultante': cuenta_destino.saldo
-        })
-        
-        print(f"Transferencia realizada con éxito a la cuenta {cuenta_destino.numero_cuenta}.")
-        print(f"Tu nuevo saldo es: {self.saldo:.2f} €")
-        return True
+        if numero_cuenta not in self.banco.cuentas:
+            return None
+        return self._leer(numero_cuenta)
     
-    def ver_historial(self, ultimos_n=None):
+    def movimientos(self, numero_cuenta):
         """
-        Muestra el historial de movimientos de la cuenta.
+        Devuelve el historial de una cuenta hasta el instante de la instantánea.
         
         Args:
-            ultimos_n (int, opcional): Número de últimos movimientos a mostrar.
-                                     Si es None, muestra todos los movimientos.
-        """
-        if not self.activa:
-            print("Error: La cuenta está inactiva.")
-            return
+            numero_cuenta (str): Número de la cuenta
             
-        if not self.movimientos:
-            print("No hay movimientos en esta cuenta.")
-            return
-            
-        print("\n=== HISTORIAL DE MOVIMIENTOS ===")
-        print(f"Cuenta: {self.numero_cuenta}")
-        print(f"Titular: {self.titular}")
-        print("---------------------------------")
-        
-        # Determinamos cuántos movimientos mostrar
-        movimientos_a_mostrar = self.movimientos
-        if ultimos_n is not None and ultimos_n > 0 and ultimos_n < len(self.movimientos):
-            movimientos_a_mostrar = self.movimientos[-ultimos_n:]
-            print(f"Mostrando los últimos {ultimos_n} movimientos:")
-        else:
-            print("Mostrando todos los movimientos:")
-            
-        # Mostramos los movimientos
-        for i, mov in enumerate(movimientos_a_mostrar, 1):
-            print(f"\nMovimiento #{i}:")
-            print(f"  Tipo: {mov['tipo']}")
-            print(f"  Cantidad: {mov['cantidad']:.2f} €")
-            if 'remitente' in mov:
-                print(f"  Remitente: Cuenta {mov['remitente']}")
-            if 'destinatario' in mov:
-                print(f"  Destinatario: Cuenta {mov['destinatario']}")
-            print(f"  Saldo resultante: {mov['saldo_resultante']:.2f} €")
+        Returns:
+            list: Movimientos registrados hasta ese momento
+        """
+        vista = self.buscar_cuenta(numero_cuenta)
+        if vista is None:
+            return []
+        # El historial solo crece por el final, así que basta con recortarlo
+        return list(self.banco.cuentas[numero_cuenta].movimientos[:vista.num_movimientos])
     
-    def __str__(self):
+    def saldo_total(self):
         """
-        Representación en cadena de texto de la cuenta bancaria.
+        Suma los saldos de todas las cuentas de la instantánea.
         
         Returns:
-            str: Información formateada sobre la cuenta
+            float: Saldo total del banco en ese instante
         """
-        estado = "Activa" if self.activa else "Inactiva"
-        return f"Cuenta {self.numero_cuenta} - Titular: {self.titular} - Saldo: {self.saldo:.2f} € - Estado: {estado}"
+        return sum(vista.saldo for vista in self.cuentas())
+    
+    def cerrar(self):
+        """
+        Libera la instantánea para que los escritores dejen de guardar versiones antiguas.
+        """
+        if self._abierta:
+            self._abierta = False
+            self.banco._liberar_instantanea(self.version)
+    
+    def __enter__(self):
+        """Permite usar la instantánea con `with`."""
+        return self
+    
+    def __exit__(self, *exc):
+        """Cierra la instantánea al salir del bloque `with`."""
+        self.cerrar()
 
 
 class SistemaBancario:
     """
     Clase que gestiona múltiples cuentas bancarias.
+    
+    Las operaciones de escritura (crear_cuenta, depositar, retirar y
+    realizar_transferencia) se serializan con un cerrojo y numeran cada cambio
+    con una versión. Las lecturas largas (listados, auditorías, exportaciones)
+    usan `instantanea()` y no bloquean a los escritores. Las operaciones
+    hechas directamente sobre una CuentaBancaria no pasan por este control.
     """
     
-    def __init__(self, nombre_banco):
+    def __init__(self, nombre_banco, capacidad_idempotencia=100_000, ttl_idempotencia=24 * 3600):
         """
         Inicializa un nuevo sistema bancario.
         
         Args:
             nombre_banco (str): Nombre del banco
+            capacidad_idempotencia (int, opcional): Máximo de claves de idempotencia recordadas
+            ttl_idempotencia (float, opcional): Segundos que se recuerda cada clave
         """
         self.nombre_banco = nombre_banco
         self.cuentas = {}  # Diccionario para almacenar las cuentas (clave: número de cuenta)
         self.ultimo_numero = 1000  # Número inicial para generar números de cuenta
+        self.idempotencia = CacheIdempotencia(capacidad_idempotencia, ttl_idempotencia)
+        
+        # Control de versiones para las instantáneas
+        self._cerrojo = threading.RLock()  # Serializa a los escritores
+        self._version = 0                  # Última versión confirmada
+        self._versiones = {}               # número de cuenta -> versión de su último cambio
+        self._anteriores = {}              # número de cuenta -> [(versión, saldo, activa, nº movimientos)]
+        self._instantaneas = {}            # versión -> número de instantáneas abiertas
+        
+    def _preparar_escritura(self, *cuentas):
+        """
+        Reserva una nueva versión para las cuentas que se van a modificar.
+        
+        Si hay instantáneas abiertas, guarda antes el estado actual de cada
+        cuenta para que puedan seguir leyéndolo. Debe llamarse con el cerrojo
+        adquirido y, al terminar la escritura, confirmar la versión devuelta
+        asignándola a `self._version`.
+        
+        Args:
+            *cuentas (CuentaBancaria): Cuentas que va a modificar la operación
+            
+        Returns:
+            int: La versión de la escritura
+        """
+        version = self._version + 1
+        if self._instantaneas:
+            for cuenta in cuentas:
+                self._anteriores.setdefault(cuenta.numero_cuenta, []).append((
+                    self._versiones.get(cuenta.numero_cuenta, 0), cuenta.saldo,
+                    cuenta.activa, len(cuenta.movimientos)))
+        for cuenta in cuentas:
+            self._versiones[cuenta.numero_cuenta] = version
+        return version
+    
+    def instantanea(self):
+        """
+        Toma una instantánea coherente del banco sin detener a los escritores.
+        
+        Returns:
+            Instantanea: Vista de solo lectura; hay que cerrarla al terminar
+        """
+        with self._cerrojo:
+            version = self._version
+            self._instantaneas[version] = self._instantaneas.get(version, 0) + 1
+        return Instantanea(self, version)
+    
+    def _liberar_instantanea(self, version):
+        """
+        Da de baja una instantánea y descarta las versiones antiguas si ya no hacen falta.
+        
+        Args:
+            version (int): Versión de la instantánea cerrada
+        """
+        with self._cerrojo:
+            self._instantaneas[version] -= 1
+            if not self._instantaneas[version]:
+                del self._instantaneas[version]
+            if not self._instantaneas:
+                self._anteriores = {}
+            else:
+                self._podar_anteriores(min(self._instantaneas))
+    
+    def _podar_anteriores(self, minima):
+        """
+        Descarta los valores guardados que ya no puede leer ninguna instantánea.
+        
+        De cada cuenta basta con el último valor guardado de una versión no
+        posterior a la instantánea más antigua y los posteriores. Las listas
+        se sustituyen en lugar de modificarse, porque los lectores las
+        recorren sin cerrojo. Debe llamarse con el cerrojo adquirido.
+        
+        Args:
+            minima (int): Versión de la instantánea abierta más antigua
+        """
+        podadas = {}
+        for numero, anteriores in self._anteriores.items():
+            if self._versiones.get(numero, 0) <= minima:
+                continue  # Todas las instantáneas abiertas ven el valor actual
+            primera = len(anteriores) - 1
+            while primera > 0 and anteriores[primera][0] > minima:
+                primera -= 1
+            podadas[numero] = anteriores[primera:] if primera else anteriores
+        self._anteriores = podadas
+        
+    def _ejecutar_una_vez(self, clave, operacion, *args, conflicto=False):
+        """
+        Ejecuta una operación solo si su clave de idempotencia no se ha visto antes.
         
-    def crear_cuenta(self, titular, saldo_inicial=0.0):
+        Args:
+            clave (str): Clave de idempotencia enviada por el cliente
+            operacion (callable): Método a ejecutar (sin clave de idempotencia)
+            *args: Argumentos de la operación
+            conflicto (opcional): Valor de fallo de la operación, que se devuelve
+                                  si la clave ya se usó con otra operación
+            
+        Returns:
+            El resultado original de la operación, o `conflicto` (False por
+            defecto) si la clave ya se usó con una operación o unos argumentos
+            distintos
+        """
+        huella = (operacion.__name__,) + args
+        previo = self.idempotencia.obtener(clave)
+        if previo is not None:
+            huella_previa, resultado = previo
+            if huella_previa != huella:
+                print(f"Error: La clave '{clave}' ya se usó para otra operación.")
+                return conflicto
+            # Reintento: devolvemos el resultado original sin tocar las cuentas
+            return resultado
+        
+        resultado = operacion(*args)
+        self.idempotencia.guardar(clave, (huella, resultado))
+        return resultado
+        
+    def crear_cuenta(self, titular, saldo_inicial=0.0, numero_cuenta=None, clave_idempotencia=None):
         """
         Crea una nueva cuenta bancaria.
         
         Args:
             titular (str): Nombre del titular de la cuenta
             saldo_inicial (float, opcional): Saldo inicial de la cuenta
+            numero_cuenta (str, opcional): Número ya asignado (por ejemplo, por el
+                                           coordinador de un sistema particionado)
+            clave_idempotencia (str, opcional): Clave para que los reintentos no creen otra cuenta
             
         Returns:
-            CuentaBancaria: La cuenta creada
+            CuentaBancaria o None: La cuenta creada o None si el número ya existe
+                                   o la clave ya se usó con otra operación
         """
-        # Generamos un número de cuenta único
-        numero_cuenta = f"{self.nombre_banco[:3].upper()}{self.ultimo_numero}"
-        self.ultimo_numero += 1
-        
-        # Creamos la cuenta
-        nueva_cuenta = CuentaBancaria(titular, numero_cuenta, saldo_inicial)
-        
-        # Almacenamos la cuenta en nuestro diccionario
-        self.cuentas[numero_cuenta] = nueva_cuenta
+        with self._cerrojo:
+            if clave_idempotencia is not None:
+                return self._ejecutar_una_vez(clave_idempotencia, self.crear_cuenta,
+                                              titular, saldo_inicial, numero_cuenta,
+                                              conflicto=None)
+            
+            if numero_cuenta is None:
+                # Generamos un número de cuenta único
+                numero_cuenta = f"{self.nombre_banco[:3].upper()}{self.ultimo_numero}"
+                self.ultimo_numero += 1
+            elif numero_cuenta in self.cuentas:
+                print(f"Error: Ya existe la cuenta {numero_cuenta}.")
+                return None
+            
+            # Creamos la cuenta
+            nueva_cuenta = CuentaBancaria(titular, numero_cuenta, saldo_inicial)
+            
+            # Registramos su versión antes de publicarla: las instantáneas
+            # anteriores no la verán
+            version = self._version + 1
+            self._versiones[numero_cuenta] = version
+            
+            # Almacenamos la cuenta en nuestro diccionario
+            self.cuentas[numero_cuenta] = nueva_cuenta
+            self._version = version
         
         print(f"Cuenta {numero_cuenta} creada con éxito para {titular}.")
         return nueva_cuenta
@@ -264,17 +341,76 @@ class SistemaBancario:
     def listar_cuentas(self):
         """
         Muestra la lista de todas las cuentas en el sistema.
+        
+        Usa una instantánea, así que el listado es coherente aunque otras
+        operaciones sigan modificando el banco mientras se imprime.
         """
         print(f"\n=== CUENTAS DEL BANCO {self.nombre_banco} ===")
         
-        if not self.cuentas:
+        with self.instantanea() as instantanea:
+            hay_cuentas = False
+            for vista in instantanea.cuentas():
+                print(vista)
+                hay_cuentas = True
+        
+        if not hay_cuentas:
             print("No hay cuentas registradas en el sistema.")
-            return
+    
+    def depositar(self, numero_cuenta, cantidad, clave_idempotencia=None):
+        """
+        Deposita una cantidad en una cuenta del banco.
+        
+        Args:
+            numero_cuenta (str): Número de la cuenta
+            cantidad (float): Cantidad a depositar
+            clave_idempotencia (str, opcional): Clave para que los reintentos no se apliquen dos veces
+            
+        Returns:
+            bool: True si la operación fue exitosa, False en caso contrario
+        """
+        with self._cerrojo:
+            if clave_idempotencia is not None:
+                return self._ejecutar_una_vez(clave_idempotencia, self.depositar,
+                                              numero_cuenta, cantidad)
+            
+            cuenta = self.buscar_cuenta(numero_cuenta)
+            if not cuenta:
+                return False
             
-        for numero, cuenta in self.cuentas.items():
-            print(cuenta)
+            version = self._preparar_escritura(cuenta)
+            try:
+                return cuenta.depositar(cantidad)
+            finally:
+                self._version = version
     
-    def realizar_transferencia(self, origen, destino, cantidad):
+    def retirar(self, numero_cuenta, cantidad, clave_idempotencia=None):
+        """
+        Retira una cantidad de una cuenta del banco.
+        
+        Args:
+            numero_cuenta (str): Número de la cuenta
+            cantidad (float): Cantidad a retirar
+            clave_idempotencia (str, opcional): Clave para que los reintentos no se apliquen dos veces
+            
+        Returns:
+            bool: True si la operación fue exitosa, False en caso contrario
+        """
+        with self._cerrojo:
+            if clave_idempotencia is not None:
+                return self._ejecutar_una_vez(clave_idempotencia, self.retirar,
+                                              numero_cuenta, cantidad)
+            
+            cuenta = self.buscar_cuenta(numero_cuenta)
+            if not cuenta:
+                return False
+            
+            version = self._preparar_escritura(cuenta)
+            try:
+                return cuenta.retirar(cantidad)
+            finally:
+                self._version = version
+    
+    def realizar_transferencia(self, origen, destino, cantidad, clave_idempotencia=None):
         """
         Realiza una transferencia entre dos cuentas.
         
@@ -282,20 +418,30 @@ class SistemaBancario:
             origen (str): Número de la cuenta origen
             destino (str): Número de la cuenta destino
             cantidad (float): Cantidad a transferir
+            clave_idempotencia (str, opcional): Clave para que los reintentos no se apliquen dos veces
             
         Returns:
             bool: True si la operación fue exitosa, False en caso contrario
         """
-        # Buscamos las cuentas
-        cuenta_origen = self.buscar_cuenta(origen)
-        cuenta_destino = self.buscar_cuenta(destino)
-        
-        # Verificamos que ambas cuentas existan
-        if not cuenta_origen or not cuenta_destino:
-            return False
+        with self._cerrojo:
+            if clave_idempotencia is not None:
+                return self._ejecutar_una_vez(clave_idempotencia, self.realizar_transferencia,
+                                              origen, destino, cantidad)
             
-        # Realizamos la transferencia
-        return cuenta_origen.transferir(cuenta_destino, cantidad)
+            # Buscamos las cuentas
+            cuenta_origen = self.buscar_cuenta(origen)
+            cuenta_destino = self.buscar_cuenta(destino)
+            
+            # Verificamos que ambas cuentas existan
+            if not cuenta_origen or not cuenta_destino:
+                return False
+            
+            # Realizamos la transferencia
+            version = self._preparar_escritura(cuenta_origen, cuenta_destino)
+            try:
+                return cuenta_origen.transferir(cuenta_destino, cantidad)
+            finally:
+                self._version = version
 
 
 def mostrar_menu():
@@ -354,7 +500,7 @@ def main():
             if cuenta:
                 try:
                     cantidad = float(input("Cantidad a depositar: "))
-                    cuenta.depositar(cantidad)
+                    banco.depositar(numero, cantidad)
                 except ValueError:
                     print("Error: La cantidad debe ser un número.")
         
@@ -365,7 +511,7 @@ def main():
             if cuenta:
                 try:
                     cantidad = float(input("Cantidad a retirar: "))
-                    cuenta.retirar(cantidad)
+                    banco.retirar(numero, cantidad)
                 except ValueError:
                     print("Error: La cantidad debe ser un número.")
         
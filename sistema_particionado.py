@@ -0,0 +1,423 @@
+"""
+Sistema bancario particionado en varios procesos.
+
+Las cuentas se reparten por el hash de su número entre procesos trabajadores,
+cada uno con su propio SistemaBancario local. Las operaciones sobre una sola
+partición se ejecutan allí directamente; las transferencias entre particiones
+usan un protocolo local de confirmación en dos fases (preparar y confirmar o
+abortar), de modo que el dinero nunca se crea ni se pierde.
+"""
+import contextlib
+import multiprocessing
+import os
+import zlib
+
+from sistema_bancario import SistemaBancario
+
+
+def _preparar_debito(banco, reservas, pendientes, tx, origen, cantidad):
+    """
+    Primera fase en la partición de origen: comprueba y reserva los fondos.
+    """
+    cuenta = banco.cuentas.get(origen)
+    if cuenta is None or not cuenta.activa or cantidad <= 0:
+        return False
+
+    reservado = reservas.get(origen, 0.0)
+    if cantidad > cuenta.saldo - reservado:
+        return False
+    # Los límites se comprueban ahora pero solo se consumen si se confirma
+    if cuenta.limites and not cuenta._comprobar_limites('transferencia', cantidad):
+        return False
+
+    # El saldo no cambia hasta la confirmación; solo bloqueamos la cantidad
+    reservas[origen] = reservado + cantidad
+    pendientes[tx] = ('debito', origen)
+    return True
+
+
+def _preparar_credito(banco, pendientes, tx, destino):
+    """
+    Primera fase en la partición de destino: comprueba que puede recibir.
+    """
+    cuenta = banco.cuentas.get(destino)
+    if cuenta is None or not cuenta.activa:
+        return False
+    pendientes[tx] = ('credito', destino)
+    return True
+
+
+def _decidir(banco, reservas, pendientes, tx, confirmar, contraparte, cantidad):
+    """
+    Segunda fase: aplica o descarta la parte de la transferencia preparada.
+    """
+    papel, numero = pendientes.pop(tx)
+    cuenta = banco.cuentas[numero]
+
+    if papel == 'debito':
+        reservas[numero] -= cantidad
+        if not reservas[numero]:
+            del reservas[numero]
+        if confirmar:
+            if cuenta.limites:
+                cuenta._control.registrar('transferencia', cantidad)
+            cuenta.saldo -= cantidad
+            cuenta._registrar_movimiento({
+                'tipo': 'Transferencia enviada',
+                'cantidad': cantidad,
+                'destinatario': contraparte,
+                'saldo_resultante': cuenta.saldo
+            })
+    elif confirmar:
+        cuenta.saldo += cantidad
+        cuenta._registrar_movimiento({
+            'tipo': 'Transferencia recibida',
+            'cantidad': cantidad,
+            'remitente': contraparte,
+            'saldo_resultante': cuenta.saldo
+        })
+    return True
+
+
+def _ejecutar(banco, reservas, pendientes, operacion):
+    """
+    Ejecuta una operación dentro de la partición.
+
+    Returns:
+        El resultado de la operación (normalmente un bool)
+    """
+    tipo = operacion[0]
+
+    # procesar_lote no manda ninguna operación sobre una cuenta con una
+    # transferencia cruzada sin decidir, así que aquí nunca hay fondos reservados
+    if tipo == 'depositar':
+        return banco.depositar(operacion[1], operacion[2])
+    if tipo == 'retirar':
+        return banco.retirar(operacion[1], operacion[2])
+    if tipo == 'transferir':
+        _, origen, destino, cantidad = operacion
+        return (origen in banco.cuentas and destino in banco.cuentas and
+                banco.realizar_transferencia(origen, destino, cantidad))
+
+    if tipo == 'preparar_debito':
+        return _preparar_debito(banco, reservas, pendientes, *operacion[1:])
+    if tipo == 'preparar_credito':
+        return _preparar_credito(banco, pendientes, operacion[1], operacion[2])
+    if tipo == 'decidir':
+        return _decidir(banco, reservas, pendientes, *operacion[1:])
+
+    if tipo == 'crear':
+        return banco.crear_cuenta(operacion[2], operacion[3], numero_cuenta=operacion[1]) is not None
+    if tipo == 'saldo':
+        cuenta = banco.cuentas.get(operacion[1])
+        return None if cuenta is None else cuenta.consultar_saldo()
+    if tipo == 'listar':
+        return [str(cuenta) for cuenta in banco.cuentas.values()]
+    if tipo == 'total':
+        return sum(cuenta.saldo for cuenta in banco.cuentas.values())
+
+    raise ValueError(f"Operación desconocida: {tipo}")
+
+
+def _ejecutar_protegido(banco, reservas, pendientes, operacion):
+    """
+    Ejecuta una operación sin dejar que un error detenga la partición.
+
+    Returns:
+        El resultado de la operación, o False si lanzó una excepción
+    """
+    try:
+        return _ejecutar(banco, reservas, pendientes, operacion)
+    except Exception as error:
+        print(f"Error: No se pudo ejecutar {operacion!r}: {error}")
+        return False
+
+
+def _proceso_particion(conexion, nombre_banco):
+    """
+    Bucle principal de un proceso trabajador: recibe lotes y devuelve resultados.
+    """
+    banco = SistemaBancario(nombre_banco)
+    reservas = {}    # número de cuenta -> cantidad bloqueada por transferencias en curso
+    pendientes = {}  # id de transacción -> (papel, número de cuenta)
+
+    # Las cuentas informan de cada operación por pantalla; en el trabajador lo descartamos
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        while True:
+            lote = conexion.recv()
+            if lote is None:
+                break
+            conexion.send([_ejecutar_protegido(banco, reservas, pendientes, op) for op in lote])
+    conexion.close()
+
+
+class SistemaBancarioParticionado:
+    """
+    Clase que reparte las cuentas de un banco entre varios procesos.
+    """
+
+    def __init__(self, nombre_banco, particiones=None):
+        """
+        Arranca los procesos trabajadores.
+
+        Args:
+            nombre_banco (str): Nombre del banco
+            particiones (int, opcional): Número de procesos. Por defecto, uno por núcleo
+        """
+        self.nombre_banco = nombre_banco
+        self.ultimo_numero = 1000
+        self._siguiente_tx = 0
+        self._conexiones = []
+        self._procesos = []
+
+        for _ in range(particiones or os.cpu_count() or 1):
+            local, remota = multiprocessing.Pipe()
+            proceso = multiprocessing.Process(target=_proceso_particion,
+                                              args=(remota, nombre_banco), daemon=True)
+            proceso.start()
+            remota.close()
+            self._conexiones.append(local)
+            self._procesos.append(proceso)
+
+    @property
+    def particiones(self):
+        """
+        Número de particiones del sistema.
+
+        Returns:
+            int: Número de procesos trabajadores
+        """
+        return len(self._conexiones)
+
+    def particion(self, numero_cuenta):
+        """
+        Calcula la partición a la que pertenece una cuenta.
+
+        Args:
+            numero_cuenta (str): Número de la cuenta
+
+        Returns:
+            int: Índice de la partición
+        """
+        # crc32 es estable entre procesos, a diferencia de hash() sobre cadenas
+        return zlib.crc32(numero_cuenta.encode()) % len(self._conexiones)
+
+    def _enviar(self, lotes):
+        """
+        Envía un lote a cada partición en paralelo y recoge las respuestas.
+
+        Args:
+            lotes (dict): Partición -> lista de operaciones
+
+        Returns:
+            dict: Partición -> lista de resultados
+        """
+        for indice, lote in lotes.items():
+            self._conexiones[indice].send(lote)
+        return {indice: self._conexiones[indice].recv() for indice in lotes}
+
+    def procesar_lote(self, operaciones):
+        """
+        Ejecuta un lote de operaciones repartiéndolo entre las particiones.
+
+        Cada operación es una tupla ('depositar', numero, cantidad),
+        ('retirar', numero, cantidad) o ('transferir', origen, destino, cantidad).
+        El resultado es el mismo que ejecutándolas una a una en orden. El lote
+        se envía por rondas: cada partición recibe sus operaciones en orden y
+        las transferencias entre particiones se preparan en su sitio y se
+        deciden al principio de la ronda siguiente. Una ronda se cierra al
+        llegar una operación sobre una cuenta con una transferencia cruzada
+        todavía sin decidir.
+
+        Args:
+            operaciones (list): Operaciones a ejecutar
+
+        Returns:
+            list: Resultado (bool) de cada operación, en el mismo orden
+        """
+        resultados = [False] * len(operaciones)
+        decisiones = {}   # partición -> decisiones de la ronda anterior
+        ronda = []        # (índice, operación) de la ronda en curso
+        pendientes = set()  # cuentas con una transferencia cruzada en la ronda
+
+        for i, operacion in enumerate(operaciones):
+            cuentas = operacion[1:3] if operacion[0] == 'transferir' else operacion[1:2]
+            if pendientes.intersection(cuentas):
+                decisiones = self._ronda(ronda, decisiones, resultados)
+                ronda, pendientes = [], set()
+            ronda.append((i, operacion))
+            if (operacion[0] == 'transferir' and
+                    self.particion(operacion[1]) != self.particion(operacion[2])):
+                pendientes.update(cuentas)
+
+        decisiones = self._ronda(ronda, decisiones, resultados)
+        if decisiones:
+            self._enviar(decisiones)
+        return resultados
+
+    def _ronda(self, ronda, decisiones, resultados):
+        """
+        Envía una ronda de operaciones precedida de las decisiones de la anterior.
+
+        Args:
+            ronda (list): (índice, operación) en orden
+            decisiones (dict): Partición -> decisiones pendientes de enviar
+            resultados (list): Resultados del lote; se rellenan los de la ronda
+
+        Returns:
+            dict: Partición -> decisiones de las transferencias cruzadas de esta ronda
+        """
+        lotes = {indice: list(lote) for indice, lote in decisiones.items()}
+        # Dónde va cada respuesta: índice del resultado, (transferencia, lado) o None
+        destinos = {indice: [None] * len(lote) for indice, lote in decisiones.items()}
+        cruzadas = []  # (índice, tx, origen, destino, cantidad, p_origen, p_destino)
+
+        for i, operacion in ronda:
+            if operacion[0] == 'transferir':
+                _, origen, destino, cantidad = operacion
+                p_origen = self.particion(origen)
+                p_destino = self.particion(destino)
+                if p_origen != p_destino:
+                    k = len(cruzadas)
+                    cruzadas.append((i, self._siguiente_tx, origen, destino, cantidad,
+                                     p_origen, p_destino))
+                    lotes.setdefault(p_origen, []).append(
+                        ('preparar_debito', self._siguiente_tx, origen, cantidad))
+                    destinos.setdefault(p_origen, []).append((k, 0))
+                    lotes.setdefault(p_destino, []).append(
+                        ('preparar_credito', self._siguiente_tx, destino))
+                    destinos.setdefault(p_destino, []).append((k, 1))
+                    self._siguiente_tx += 1
+                    continue
+            else:
+                p_origen = self.particion(operacion[1])
+            lotes.setdefault(p_origen, []).append(operacion)
+            destinos.setdefault(p_origen, []).append(i)
+
+        votos = [[False, False] for _ in cruzadas]
+        for indice, respuestas in (self._enviar(lotes) if lotes else {}).items():
+            for destino, respuesta in zip(destinos[indice], respuestas):
+                if isinstance(destino, tuple):
+                    votos[destino[0]][destino[1]] = respuesta
+                elif destino is not None:
+                    resultados[destino] = respuesta
+
+        # Se confirma solo si ambas partes votaron que sí
+        siguientes = {}
+        for cruzada, (voto_origen, voto_destino) in zip(cruzadas, votos):
+            i, tx, origen, destino, cantidad, p_origen, p_destino = cruzada
+            confirmar = bool(voto_origen and voto_destino)
+            resultados[i] = confirmar
+            if voto_origen:
+                siguientes.setdefault(p_origen, []).append(
+                    ('decidir', tx, confirmar, destino, cantidad))
+            if voto_destino:
+                siguientes.setdefault(p_destino, []).append(
+                    ('decidir', tx, confirmar, origen, cantidad))
+        return siguientes
+
+    def crear_cuenta(self, titular, saldo_inicial=0.0):
+        """
+        Crea una nueva cuenta en la partición que le corresponde.
+
+        Args:
+            titular (str): Nombre del titular de la cuenta
+            saldo_inicial (float, opcional): Saldo inicial de la cuenta
+
+        Returns:
+            str: Número de la cuenta creada
+        """
+        numero_cuenta = f"{self.nombre_banco[:3].upper()}{self.ultimo_numero}"
+        self.ultimo_numero += 1
+
+        indice = self.particion(numero_cuenta)
+        self._enviar({indice: [('crear', numero_cuenta, titular, saldo_inicial)]})
+        print(f"Cuenta {numero_cuenta} creada con éxito para {titular}.")
+        return numero_cuenta
+
+    def depositar(self, numero_cuenta, cantidad):
+        """
+        Deposita una cantidad en una cuenta.
+
+        Returns:
+            bool: True si la operación fue exitosa, False en caso contrario
+        """
+        return self.procesar_lote([('depositar', numero_cuenta, cantidad)])[0]
+
+    def retirar(self, numero_cuenta, cantidad):
+        """
+        Retira una cantidad de una cuenta.
+
+        Returns:
+            bool: True si la operación fue exitosa, False en caso contrario
+        """
+        return self.procesar_lote([('retirar', numero_cuenta, cantidad)])[0]
+
+    def realizar_transferencia(self, origen, destino, cantidad):
+        """
+        Realiza una transferencia entre dos cuentas, estén o no en la misma partición.
+
+        Args:
+            origen (str): Número de la cuenta origen
+            destino (str): Número de la cuenta destino
+            cantidad (float): Cantidad a transferir
+
+        Returns:
+            bool: True si la operación fue exitosa, False en caso contrario
+        """
+        return self.procesar_lote([('transferir', origen, destino, cantidad)])[0]
+
+    def consultar_saldo(self, numero_cuenta):
+        """
+        Consulta el saldo de una cuenta.
+
+        Returns:
+            float o None: Saldo actual o None si la cuenta no existe o está inactiva
+        """
+        indice = self.particion(numero_cuenta)
+        return self._enviar({indice: [('saldo', numero_cuenta)]})[indice][0]
+
+    def saldo_total(self):
+        """
+        Suma los saldos de todas las cuentas del banco.
+
+        Returns:
+            float: Saldo total
+        """
+        lotes = {indice: [('total',)] for indice in range(self.particiones)}
+        return sum(r[0] for r in self._enviar(lotes).values())
+
+    def listar_cuentas(self):
+        """
+        Muestra la lista de todas las cuentas en el sistema.
+        """
+        print(f"\n=== CUENTAS DEL BANCO {self.nombre_banco} ===")
+
+        lotes = {indice: [('listar',)] for indice in range(self.particiones)}
+        lineas = [linea for r in self._enviar(lotes).values() for linea in r[0]]
+        if not lineas:
+            print("No hay cuentas registradas en el sistema.")
+            return
+
+        for linea in lineas:
+            print(linea)
+
+    def cerrar(self):
+        """
+        Detiene los procesos trabajadores.
+        """
+        for conexion in self._conexiones:
+            conexion.send(None)
+            conexion.close()
+        for proceso in self._procesos:
+            proceso.join()
+        self._conexiones = []
+        self._procesos = []
+
+    def __enter__(self):
+        """Permite usar el sistema con `with`."""
+        return self
+
+    def __exit__(self, *exc):
+        """Detiene los trabajadores al salir del bloque `with`."""
+        self.cerrar()
@@ -0,0 +1,243 @@
+"""
+Índice de teléfonos normalizados en un árbol radix de dígitos.
+
+Permite identificar al titular de una llamada entrante (búsqueda exacta) y
+enumerar los números que empiezan por un prefijo, ambas cosas en un tiempo
+proporcional a la longitud del número y no al tamaño de la agenda.
+"""
+
+DIGITOS = frozenset('0123456789')
+
+
+def normalizar_telefono(texto, prefijo_pais='34'):
+    """
+    Convierte un teléfono escrito libremente a sus dígitos en formato E.164.
+
+    Se eliminan espacios, guiones y paréntesis. Los números que empiezan por
+    '+' o '00' se consideran internacionales; el resto se completa con el
+    prefijo del país.
+
+    Args:
+        texto (str): Teléfono tal y como lo escribió el usuario
+        prefijo_pais (str, opcional): Prefijo que se añade a los números nacionales
+
+    Returns:
+        str o None: Dígitos del número (sin el '+') o None si no contiene dígitos
+    """
+    texto = texto.strip()
+    digitos = ''.join(c for c in texto if c in DIGITOS)
+    if not digitos:
+        return None
+    if texto.startswith('+'):
+        return digitos
+    if digitos.startswith('00'):
+        return digitos[2:]
+    return prefijo_pais + digitos
+
+
+class _Nodo:
+    """
+    Nodo del árbol radix: la etiqueta es el tramo de dígitos de la arista que llega a él.
+    """
+
+    __slots__ = ('etiqueta', 'hijos', 'valores')
+
+    def __init__(self, etiqueta):
+        self.etiqueta = etiqueta
+        self.hijos = None    # primer dígito -> _Nodo (se crea al necesitarlo)
+        self.valores = None  # None, un único valor o un set si hay varios
+
+
+class TrieTelefonos:
+    """
+    Árbol radix (trie comprimido) de números de teléfono.
+
+    Cada número puede tener varios valores asociados, por ejemplo los
+    identificadores de los contactos que comparten teléfono.
+    """
+
+    def __init__(self):
+        """
+        Inicializa un árbol vacío.
+        """
+        self._raiz = _Nodo('')
+        self._tamano = 0
+
+    def __len__(self):
+        """
+        Número de pares (número, valor) guardados.
+
+        Returns:
+            int: Número de entradas
+        """
+        return self._tamano
+
+    def insertar(self, numero, valor):
+        """
+        Asocia un valor a un número normalizado.
+
+        Args:
+            numero (str): Dígitos del número (ver normalizar_telefono)
+            valor (object): Valor a guardar (hashable)
+        """
+        nodo = self._raiz
+        i = 0
+        while i < len(numero):
+            if nodo.hijos is None:
+                nodo.hijos = {}
+            hijo = nodo.hijos.get(numero[i])
+            if hijo is None:
+                # No hay rama: colgamos el resto del número en una sola arista
+                hijo = _Nodo(numero[i:])
+                nodo.hijos[numero[i]] = hijo
+                nodo = hijo
+                break
+
+            etiqueta = hijo.etiqueta
+            comun = 0
+            limite = min(len(etiqueta), len(numero) - i)
+            while comun < limite and etiqueta[comun] == numero[i + comun]:
+                comun += 1
+
+            if comun < len(etiqueta):
+                # Partimos la arista en el punto donde divergen
+                medio = _Nodo(etiqueta[:comun])
+                hijo.etiqueta = etiqueta[comun:]
+                medio.hijos = {hijo.etiqueta[0]: hijo}
+                nodo.hijos[numero[i]] = medio
+                hijo = medio
+            nodo = hijo
+            i += comun
+
+        valores = nodo.valores
+        if valores is None:
+            nodo.valores = valor
+        elif isinstance(valores, set):
+            if valor in valores:
+                return
+            valores.add(valor)
+        elif valores == valor:
+            return
+        else:
+            nodo.valores = {valores, valor}
+        self._tamano += 1
+
+    def eliminar(self, numero, valor):
+        """
+        Quita la asociación entre un número y un valor.
+
+        Args:
+            numero (str): Dígitos del número
+            valor (object): Valor a quitar
+
+        Returns:
+            bool: True si existía la asociación
+        """
+        camino = []  # (padre, nodo)
+        nodo = self._raiz
+        i = 0
+        while i < len(numero):
+            hijo = nodo.hijos.get(numero[i]) if nodo.hijos else None
+            if hijo is None or not numero.startswith(hijo.etiqueta, i):
+                return False
+            camino.append((nodo, hijo))
+            nodo = hijo
+            i += len(hijo.etiqueta)
+
+        valores = nodo.valores
+        if isinstance(valores, set):
+            if valor not in valores:
+                return False
+            valores.discard(valor)
+            if len(valores) == 1:
+                nodo.valores = valores.pop()
+        elif valores is not None and valores == valor:
+            nodo.valores = None
+        else:
+            return False
+        self._tamano -= 1
+
+        # Podamos los nodos vacíos y fusionamos los que quedan con un solo hijo
+        while camino:
+            padre, nodo = camino.pop()
+            if nodo.valores is not None:
+                break
+            if not nodo.hijos:
+                del padre.hijos[nodo.etiqueta[0]]
+                if not padre.hijos:
+                    padre.hijos = None
+                continue
+            if len(nodo.hijos) == 1:
+                (unico,) = nodo.hijos.values()
+                unico.etiqueta = nodo.etiqueta + unico.etiqueta
+                padre.hijos[unico.etiqueta[0]] = unico
+            break
+        return True
+
+    def buscar(self, numero):
+        """
+        Devuelve los valores asociados exactamente a un número.
+
+        Args:
+            numero (str): Dígitos del número
+
+        Returns:
+            list: Valores asociados (vacía si el número no está)
+        """
+        nodo = self._raiz
+        i = 0
+        while i < len(numero):
+            hijo = nodo.hijos.get(numero[i]) if nodo.hijos else None
+            if hijo is None or not numero.startswith(hijo.etiqueta, i):
+                return []
+            nodo = hijo
+            i += len(hijo.etiqueta)
+        return self._valores(nodo)
+
+    @staticmethod
+    def _valores(nodo):
+        """
+        Lista los valores de un nodo.
+        """
+        if nodo.valores is None:
+            return []
+        if isinstance(nodo.valores, set):
+            return sorted(nodo.valores)
+        return [nodo.valores]
+
+    def con_prefijo(self, prefijo):
+        """
+        Recorre de forma perezosa los números que empiezan por un prefijo.
+
+        Args:
+            prefijo (str): Dígitos iniciales
+
+        Yields:
+            tuple: (número, valor) en orden numérico
+        """
+        nodo = self._raiz
+        recorrido = ''
+        i = 0
+        while i < len(prefijo):
+            hijo = nodo.hijos.get(prefijo[i]) if nodo.hijos else None
+            if hijo is None:
+                return
+            etiqueta = hijo.etiqueta
+            resto = prefijo[i:i + len(etiqueta)]
+            # El prefijo puede acabar a mitad de una arista
+            if not etiqueta.startswith(resto):
+                return
+            recorrido += etiqueta
+            nodo = hijo
+            i += len(etiqueta)
+
+        pila = [(nodo, recorrido)]
+        while pila:
+            nodo, numero = pila.pop()
+            for valor in self._valores(nodo):
+                yield numero, valor
+            if nodo.hijos:
+                # Apilamos en orden inverso para visitar primero el dígito menor
+                for digito in sorted(nodo.hijos, reverse=True):
+                    hijo = nodo.hijos[digito]
+                    pila.append((hijo, numero + hijo.etiqueta))